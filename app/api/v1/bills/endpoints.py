@@ -52,6 +52,8 @@ async def upload_bill(
         ]
         bill_data["findings"] = [_serialize_finding(f) for f in bill.findings]
         bill_data["status"] = bill.status.value
+        if len(result["bills"]) > 1:
+            bill_data["split_bill_ids"] = [b.id for b in result["bills"]]
 
         return StandardResponse(success=True, data=bill_data)
     except PermissionError as e:
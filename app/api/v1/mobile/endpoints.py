@@ -2,7 +2,8 @@
 Mobile app API endpoints
 These endpoints are designed to match the mobile app's data structure exactly
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract
 from datetime import datetime, timedelta
@@ -23,6 +24,8 @@ from app.schemas.mobile import (
 )
 from app.schemas.common import StandardResponse
 from app.services.bill_service import BillService
+from app.storage import get_storage_adapter
+from app.utils.render_cache import FORMATS, PREVIEW_DPI, THUMBNAIL_DPI, render_page
 import uuid
 
 router = APIRouter()
@@ -150,7 +153,11 @@ async def upload_bill_mobile(
             data=BillUploadResponse(
                 success=True,
                 billId=str(result["bill"].id),
-                message="Bill uploaded successfully. Analysis will begin shortly."
+                message=(
+                    f"Found {len(result['bills'])} statements; each was added as its own bill."
+                    if len(result["bills"]) > 1
+                    else "Bill uploaded successfully. Analysis will begin shortly."
+                )
             )
         )
     except Exception as e:
@@ -499,3 +506,66 @@ async def get_recommended_actions(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+
+async def _bill_page_image(bill_id: str, page: int, dpi: int, current_user: User, db: Session) -> Response:
+    try:
+        bill = db.query(Bill).filter(
+            Bill.id == int(bill_id),
+            Bill.patient_id == current_user.id
+        ).first()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid bill ID"
+        )
+    if not bill:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bill not found"
+        )
+    try:
+        file_path = await run_in_threadpool(get_storage_adapter().get_local_path, bill.file_path)
+        data = await run_in_threadpool(render_page, file_path, page - 1, dpi, "jpeg", bill.file_hash)
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    return Response(
+        content=data,
+        media_type=FORMATS["jpeg"],
+        headers={"Cache-Control": "private, max-age=86400"},
+    )
+
+
+@router.get("/bills/{bill_id}/pages/{page}/thumbnail")
+async def get_bill_page_thumbnail(
+    bill_id: str,
+    page: int = 1,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Small JPEG of a bill page (1-based) for bill lists"""
+    return await _bill_page_image(bill_id, page, THUMBNAIL_DPI, current_user, db)
+
+
+@router.get("/bills/{bill_id}/pages/{page}/preview")
+async def get_bill_page_preview(
+    bill_id: str,
+    page: int = 1,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Screen-sized JPEG of a bill page (1-based) for the bill detail view"""
+    return await _bill_page_image(bill_id, page, PREVIEW_DPI, current_user, db)
@@ -0,0 +1,13 @@
+from app.codesets.cpt_index import CPTIndex, CPTEntry, build_cpt_index, get_cpt_index
+from app.codesets.ncci import NCCITable, PTPEdit, build_ncci_table, get_ncci_table
+from app.codesets.mue import MUETable, build_mue_table, get_mue_table
+from app.codesets.icd10 import ICD10Index, build_icd10_index, get_icd10_index
+from app.codesets.fee_schedule import FeeSchedule, build_fee_schedule, get_fee_schedule
+
+__all__ = [
+    "CPTIndex", "CPTEntry", "build_cpt_index", "get_cpt_index",
+    "NCCITable", "PTPEdit", "build_ncci_table", "get_ncci_table",
+    "MUETable", "build_mue_table", "get_mue_table",
+    "ICD10Index", "build_icd10_index", "get_icd10_index",
+    "FeeSchedule", "build_fee_schedule", "get_fee_schedule",
+]
@@ -0,0 +1,88 @@
+"""
+Columnar NumPy table files, memory-mapped read-only.
+
+Layout: 8-byte magic, a little-endian uint32 header length, a JSON header
+describing each column (dtype, offset, length) plus free-form metadata, then
+the column data, each column 64-byte aligned. Opening a file maps it once and
+wraps each column with ``np.frombuffer`` -- nothing is copied or parsed.
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+_ALIGN = 64
+_CODE_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_CODE_VALUE = {ch: i for i, ch in enumerate(_CODE_ALPHABET)}
+
+
+def encode_code(code: str) -> int:
+    """Pack a 5-character CPT/HCPCS code into a base-36 integer (< 2**26); -1 if malformed."""
+    code = code.strip().upper()
+    if len(code) != 5:
+        return -1
+    value = 0
+    for ch in code:
+        digit = _CODE_VALUE.get(ch)
+        if digit is None:
+            return -1
+        value = value * 36 + digit
+    return value
+
+
+def decode_code(value: int) -> str:
+    chars = []
+    for _ in range(5):
+        value, digit = divmod(int(value), 36)
+        chars.append(_CODE_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def write_columns(path: str, magic: bytes, columns: Dict[str, np.ndarray], meta: Optional[dict] = None):
+    """Atomically write equal-length columns to ``path``."""
+    specs = []
+    offset = 0
+    for name, arr in columns.items():
+        arr = np.ascontiguousarray(arr)
+        columns[name] = arr
+        specs.append({"name": name, "dtype": arr.dtype.str, "offset": offset, "length": int(arr.shape[0])})
+        offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+    header = json.dumps({"columns": specs, "meta": meta or {}}).encode("utf-8")
+    data_start = -(-(len(magic) + 4 + len(header)) // _ALIGN) * _ALIGN
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(magic + struct.pack("<I", len(header)) + header)
+        for spec in specs:
+            f.seek(data_start + spec["offset"])
+            f.write(columns[spec["name"]].tobytes())
+        # Pad so the last column's aligned extent exists on disk
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def open_columns(path: str, magic: bytes) -> Tuple[Dict[str, np.ndarray], dict]:
+    """Map ``path`` and return ({column name: read-only array}, metadata)."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:len(magic)] != magic:
+        mm.close()
+        raise ValueError(f"{path}: bad magic, expected {magic!r}")
+    (header_len,) = struct.unpack_from("<I", mm, len(magic))
+    header_start = len(magic) + 4
+    header = json.loads(mm[header_start:header_start + header_len])
+    data_start = -(-(header_start + header_len) // _ALIGN) * _ALIGN
+    columns = {
+        spec["name"]: np.frombuffer(
+            mm, dtype=np.dtype(spec["dtype"]), count=spec["length"], offset=data_start + spec["offset"],
+        )
+        for spec in header["columns"]
+    }
+    return columns, header.get("meta", {})
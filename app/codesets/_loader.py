@@ -0,0 +1,77 @@
+"""Process-wide, lazily opened code tables living under CODESET_DIR."""
+
+import os
+import threading
+import time
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class TableLoader(Generic[T]):
+    """
+    Opens ``CODESET_DIR/filename`` once per process; a missing file means
+    'not configured'.
+
+    The file is re-stat'ed at most every CODESET_RELOAD_INTERVAL seconds. When
+    a new build has been renamed into place (new inode/mtime) it is opened and
+    swapped in with a single reference assignment, so in-flight lookups keep
+    using the old mapping and new ones see the update without a restart.
+    """
+
+    def __init__(self, name: str, filename: str, opener: Callable[[str], T]):
+        self.name = name
+        self.filename = filename
+        self._opener = opener
+        self._lock = threading.Lock()
+        self._table: Optional[T] = None
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._attempted = False
+
+    @property
+    def path(self) -> str:
+        return os.path.join(settings.CODESET_DIR, self.filename)
+
+    def get(self) -> Optional[T]:
+        interval = settings.CODESET_RELOAD_INTERVAL
+        if self._attempted and (interval <= 0 or time.monotonic() - self._checked_at < interval):
+            return self._table
+        with self._lock:
+            if self._attempted and (interval <= 0 or time.monotonic() - self._checked_at < interval):
+                return self._table
+            self._refresh()
+            return self._table
+
+    def reload(self) -> Optional[T]:
+        """Re-check the file now, regardless of the reload interval."""
+        with self._lock:
+            self._refresh()
+            return self._table
+
+    def _refresh(self):
+        first = not self._attempted
+        self._attempted = True
+        self._checked_at = time.monotonic()
+        path = self.path
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if first:
+                print(f"[Codesets] {self.name} table not found at {path}, using built-in rules", flush=True)
+            return
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return
+        try:
+            table = self._opener(path)
+        except Exception as exc:
+            print(f"[Codesets] Failed to load {self.name} table {path}: {exc}", flush=True)
+            return
+        action = "Reloaded" if self._table is not None else "Loaded"
+        # Old mappings are released by GC once no lookup references them
+        self._table = table
+        self._signature = signature
+        print(f"[Codesets] {action} {self.name} table from {path}", flush=True)
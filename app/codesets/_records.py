@@ -0,0 +1,115 @@
+"""
+Fixed-width sorted record files, memory-mapped read-only.
+
+Layout: a 24-byte header (magic, record count, record size, key size,
+reserved) followed by ``count`` records of ``record_size`` bytes, sorted by
+their first ``key_size`` bytes. Lookups are a bisect over the mapped keys, so
+opening a file costs nothing beyond the mmap and every worker on the box
+shares the same page-cache pages.
+"""
+
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from typing import Iterable, Optional, Tuple
+
+HEADER = struct.Struct("<8sIIII")
+
+
+class _KeyView:
+    """Sequence of record keys backed by the mmap (what bisect searches)."""
+
+    def __init__(self, records: "FixedWidthRecords"):
+        self._r = records
+
+    def __len__(self) -> int:
+        return self._r.count
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._r.key(i)
+
+
+class FixedWidthRecords:
+    def __init__(self, path: str, magic: bytes):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        file_magic, self.count, self.record_size, self.key_size, _ = HEADER.unpack_from(self._mm, 0)
+        if file_magic != magic:
+            self._mm.close()
+            raise ValueError(f"{path}: bad magic {file_magic!r}, expected {magic!r}")
+        expected = HEADER.size + self.count * self.record_size
+        if len(self._mm) < expected:
+            self._mm.close()
+            raise ValueError(f"{path}: truncated ({len(self._mm)} < {expected} bytes)")
+        self._keys = _KeyView(self)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def key(self, i: int) -> bytes:
+        off = HEADER.size + i * self.record_size
+        return self._mm[off:off + self.key_size]
+
+    def record(self, i: int) -> bytes:
+        off = HEADER.size + i * self.record_size
+        return self._mm[off:off + self.record_size]
+
+    def find(self, key: bytes) -> Optional[int]:
+        """Index of the record whose key equals ``key``, or None."""
+        i = bisect_left(self._keys, key)
+        if i < self.count and self.key(i) == key:
+            return i
+        return None
+
+    def prefix_range(self, prefix: bytes) -> Tuple[int, int]:
+        """Half-open index range of records whose key starts with ``prefix``."""
+        lo = bisect_left(self._keys, prefix)
+        if not prefix:
+            return lo, self.count
+        # Keys are ASCII, so bumping the last byte gives the first key past the prefix
+        upper = prefix[:-1] + bytes([prefix[-1] + 1])
+        return lo, bisect_left(self._keys, upper, lo)
+
+    def close(self):
+        self._mm.close()
+
+
+def write_records(path: str, magic: bytes, key_size: int, records: Iterable[bytes]):
+    """Sort, de-duplicate by key and atomically write ``records`` to ``path``."""
+    by_key = {}
+    record_size = None
+    for rec in records:
+        if record_size is None:
+            record_size = len(rec)
+        elif len(rec) != record_size:
+            raise ValueError("All records must have the same size")
+        by_key[rec[:key_size]] = rec
+    ordered = [by_key[k] for k in sorted(by_key)]
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(magic, len(ordered), record_size or 0, key_size, 0))
+        for rec in ordered:
+            f.write(rec)
+    os.replace(tmp_path, path)
+    return len(ordered)
+
+
+def date_key(value) -> int:
+    """YYYYMMDD integer for a date / 'YYYY-MM-DD' / 'YYYYMMDD' / 'MM/DD/YYYY'; 0 when blank."""
+    if value is None:
+        return 0
+    if hasattr(value, "year"):
+        return value.year * 10000 + value.month * 100 + value.day
+    text = str(value).strip()
+    if not text or not text[0].isdigit():
+        return 0  # blank or a CMS placeholder such as "*"
+    if "/" in text:
+        month, day, year = text.split("/")
+        return int(year) * 10000 + int(month) * 100 + int(day)
+    return int(text.replace("-", ""))
@@ -0,0 +1,43 @@
+"""
+Build the binary code tables from the published CSV files.
+
+    python -m app.codesets.build cpt path/to/cpt_hcpcs.csv
+
+Output goes to CODESET_DIR unless --out is given. Files are written to a
+temporary name and renamed into place, so running workers never see a
+half-written table and pick up the new build within
+CODESET_RELOAD_INTERVAL seconds (e.g. after a quarterly NCCI update).
+"""
+
+import argparse
+import os
+import time
+
+from app.core.config import settings
+from app.codesets import cpt_index, fee_schedule, icd10, mue, ncci
+
+BUILDERS = {
+    "cpt": (cpt_index.build_cpt_index, cpt_index.FILENAME),
+    "ncci": (ncci.build_ncci_table, ncci.FILENAME),
+    "mue": (mue.build_mue_table, mue.FILENAME),
+    "icd10": (icd10.build_icd10_index, icd10.FILENAME),
+    "fees": (fee_schedule.build_fee_schedule, fee_schedule.FILENAME),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("table", choices=sorted(BUILDERS))
+    parser.add_argument("source", help="CMS source file to convert")
+    parser.add_argument("--out", help="output path (default: CODESET_DIR/<table file>)")
+    args = parser.parse_args(argv)
+
+    build, filename = BUILDERS[args.table]
+    out_path = args.out or os.path.join(settings.CODESET_DIR, filename)
+    start = time.perf_counter()
+    count = build(args.source, out_path)
+    print(f"[Codesets] Wrote {count} {args.table} records to {out_path} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
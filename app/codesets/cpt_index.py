@@ -0,0 +1,100 @@
+"""
+CPT/HCPCS code list with effective and termination dates.
+
+Built once from the CMS/AMA CSV into a compact sorted binary file
+(16 bytes per code) that is memory-mapped and searched with bisect, so
+startup never parses CSVs and every worker shares the same pages.
+"""
+
+import csv
+import struct
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from app.codesets._loader import TableLoader
+from app.codesets._records import FixedWidthRecords, date_key, write_records
+
+MAGIC = b"ACVCPT01"
+FILENAME = "cpt_hcpcs.bin"
+# code (5 ASCII bytes), padding, effective YYYYMMDD, termination YYYYMMDD (0 = open-ended)
+RECORD = struct.Struct("<5s3xII")
+
+VALID = "VALID"
+UNKNOWN = "UNKNOWN"
+EXPIRED = "EXPIRED"
+NOT_YET_EFFECTIVE = "NOT_YET_EFFECTIVE"
+
+
+def _int_to_date(value: int) -> Optional[date]:
+    if not value:
+        return None
+    return date(value // 10000, value // 100 % 100, value % 100)
+
+
+@dataclass
+class CPTEntry:
+    code: str
+    effective: Optional[date]
+    terminated: Optional[date]
+
+
+class CPTIndex:
+    """O(log n) lookups over the memory-mapped code list."""
+
+    def __init__(self, path: str):
+        self._records = FixedWidthRecords(path, MAGIC)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def lookup(self, code: str) -> Optional[CPTEntry]:
+        key = code.strip().upper().encode("ascii", "ignore")
+        if len(key) != 5:
+            return None
+        i = self._records.find(key)
+        if i is None:
+            return None
+        raw, effective, terminated = RECORD.unpack(self._records.record(i))
+        return CPTEntry(raw.decode("ascii"), _int_to_date(effective), _int_to_date(terminated))
+
+    def status(self, code: str, on: Optional[date] = None) -> str:
+        """VALID, UNKNOWN, EXPIRED or NOT_YET_EFFECTIVE as of ``on`` (default today)."""
+        entry = self.lookup(code)
+        if entry is None:
+            return UNKNOWN
+        on = on or date.today()
+        if entry.terminated and entry.terminated < on:
+            return EXPIRED
+        if entry.effective and entry.effective > on:
+            return NOT_YET_EFFECTIVE
+        return VALID
+
+
+def build_cpt_index(csv_path: str, out_path: str) -> int:
+    """
+    Convert a CSV with ``code``, ``effective_date`` and optional
+    ``termination_date`` columns into the binary index. Returns the code count.
+    """
+    def records():
+        with open(csv_path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                row = {k.strip().lower(): (v or "") for k, v in row.items() if k}
+                code = (row.get("code") or row.get("hcpcs") or row.get("cpt") or "").strip().upper()
+                if len(code) != 5:
+                    continue
+                yield RECORD.pack(
+                    code.encode("ascii"),
+                    date_key(row.get("effective_date")),
+                    date_key(row.get("termination_date")),
+                )
+
+    return write_records(out_path, MAGIC, 5, records())
+
+
+_loader = TableLoader("CPT/HCPCS", FILENAME, CPTIndex)
+
+
+def get_cpt_index() -> Optional[CPTIndex]:
+    """Process-wide index, or None when no code list has been installed."""
+    return _loader.get()
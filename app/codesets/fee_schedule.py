@@ -0,0 +1,110 @@
+"""
+Medicare Physician Fee Schedule style reference prices.
+
+Prices are keyed by (CPT, locality, facility flag) packed into one sorted
+uint64 column -- ``code << 20 | locality << 1 | facility`` -- next to a
+float32 price column in a memory-mapped columnar file. Locality names are
+kept in the file metadata. All line items of a bill are priced with one
+``np.searchsorted``; codes without a locality-specific price fall back to
+the national rate.
+"""
+
+import csv
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.codesets._columnar import encode_code, open_columns, write_columns
+from app.codesets._loader import TableLoader
+
+MAGIC = b"ACVPFS01"
+FILENAME = "fee_schedule.col"
+NATIONAL = "NATIONAL"
+
+
+def _pack(codes: np.ndarray, locality: int, facility: bool) -> np.ndarray:
+    return (codes.astype(np.uint64) << np.uint64(20)) | np.uint64(locality << 1) | np.uint64(int(facility))
+
+
+class FeeSchedule:
+    def __init__(self, path: str):
+        columns, self.meta = open_columns(path, MAGIC)
+        self.keys = columns["key"]
+        self.prices = columns["price"]
+        self.localities: Dict[str, int] = {name: i for i, name in enumerate(self.meta.get("localities", []))}
+
+    def __len__(self) -> int:
+        return int(self.keys.shape[0])
+
+    def _lookup(self, keys: np.ndarray) -> np.ndarray:
+        pos = np.searchsorted(self.keys, keys)
+        pos[pos >= len(self)] = 0
+        found = self.keys[pos] == keys
+        return np.where(found, self.prices[pos], np.nan)
+
+    def reference_prices(self, codes: List[str], locality: str = "", facility: bool = False) -> np.ndarray:
+        """Reference price per code (NaN where unknown), as one vectorized lookup."""
+        if not codes or not len(self):
+            return np.full(len(codes), np.nan)
+        enc = np.array([max(encode_code(c), 0) for c in codes], dtype=np.uint64)
+        known = np.array([encode_code(c) >= 0 for c in codes])
+
+        national = self.localities.get(NATIONAL)
+        local = self.localities.get(locality.strip().upper()) if locality else None
+        prices = np.full(len(codes), np.nan)
+        if local is not None:
+            prices = self._lookup(_pack(enc, local, facility))
+        if national is not None:
+            missing = np.isnan(prices)
+            if missing.any():
+                prices[missing] = self._lookup(_pack(enc[missing], national, facility))
+        prices[~known] = np.nan
+        return prices
+
+
+def build_fee_schedule(csv_path: str, out_path: str) -> int:
+    """
+    Convert a CSV with ``code``, ``locality`` (blank = national),
+    ``non_facility_price`` and ``facility_price`` columns. Returns the number
+    of prices written.
+    """
+    localities: Dict[str, int] = {}
+    keys, prices = [], []
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+            code = encode_code(row.get("code", "") or row.get("hcpcs", ""))
+            if code < 0:
+                continue
+            locality = (row.get("locality") or NATIONAL).upper()
+            loc_id = localities.setdefault(locality, len(localities))
+            if loc_id >= 1 << 19:
+                raise ValueError("Too many localities for the packed key")
+            for facility, column in ((False, "non_facility_price"), (True, "facility_price")):
+                value = row.get(column, "").replace("$", "").replace(",", "")
+                if not value:
+                    continue
+                keys.append((code << 20) | (loc_id << 1) | int(facility))
+                prices.append(float(value))
+
+    key_arr = np.array(keys, dtype=np.uint64)
+    order = np.argsort(key_arr, kind="stable")
+    key_arr = key_arr[order]
+    price_arr = np.array(prices, dtype=np.float32)[order]
+    # Last row wins for duplicate keys
+    last = np.ones(len(key_arr), dtype=bool)
+    if len(key_arr):
+        last[:-1] = key_arr[1:] != key_arr[:-1]
+
+    names = sorted(localities, key=localities.get)
+    write_columns(out_path, MAGIC, {"key": key_arr[last], "price": price_arr[last]},
+                  meta={"source": csv_path, "localities": names})
+    return int(last.sum())
+
+
+_loader = TableLoader("fee schedule", FILENAME, FeeSchedule)
+
+
+def get_fee_schedule() -> Optional[FeeSchedule]:
+    """Process-wide fee schedule, or None when not installed."""
+    return _loader.get()
@@ -0,0 +1,89 @@
+"""
+ICD-10-CM code set with billable flags.
+
+Codes are stored without the dot, space-padded to 7 bytes plus a billable
+flag byte (8 bytes per code, ~0.6 MB for the full set), sorted and
+memory-mapped. Exact lookups and "is this a category with more specific
+children" prefix queries are both a bisect over the mapped keys.
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from app.codesets._loader import TableLoader
+from app.codesets._records import FixedWidthRecords, write_records
+
+MAGIC = b"ACVICD01"
+FILENAME = "icd10cm.bin"
+KEY_SIZE = 7
+
+BILLABLE = "BILLABLE"
+NOT_BILLABLE = "NOT_BILLABLE"   # valid category/subcategory that needs more specificity
+UNKNOWN = "UNKNOWN"
+
+
+def _key(code: str) -> bytes:
+    return code.strip().upper().replace(".", "").encode("ascii", "ignore")
+
+
+class ICD10Index:
+    def __init__(self, path: str):
+        self._records = FixedWidthRecords(path, MAGIC)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def status(self, code: str) -> str:
+        key = _key(code)
+        if not 3 <= len(key) <= KEY_SIZE:
+            return UNKNOWN
+        padded = key.ljust(KEY_SIZE)
+        i = self._records.find(padded)
+        if i is not None and self._records.record(i)[KEY_SIZE] == 1:
+            return BILLABLE
+        lo, hi = self._records.prefix_range(key)
+        # Any longer code under this prefix means the submitted code is a header
+        if i is not None or hi - lo > 0:
+            return NOT_BILLABLE
+        return UNKNOWN
+
+
+def _parse_source(path: str) -> Iterator[Tuple[str, int]]:
+    """
+    Yield (code, billable) from a CMS order file (``order code flag desc``),
+    a CMS codes file (``code desc``, all billable) or a ``code,billable`` CSV.
+    A line is CSV only when the field before its first comma is a bare code:
+    CMS descriptions contain commas too ("Cholera, unspecified").
+    """
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            head, sep, _ = line.partition(",")
+            if sep and head.strip() and len(head.split()) == 1:
+                parts = [p.strip().strip('"') for p in line.split(",")]
+                flag = parts[1] if len(parts) > 1 else "1"
+                if flag.isdigit():
+                    yield parts[0], int(flag)
+                continue
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].isdigit() and parts[2] in ("0", "1"):
+                yield parts[1], int(parts[2])
+            elif parts:
+                yield parts[0], 1
+
+
+def build_icd10_index(source_path: str, out_path: str) -> int:
+    """Build the binary ICD-10-CM index. Returns the number of codes written."""
+    def records():
+        for code, billable in _parse_source(source_path):
+            key = _key(code)
+            if 3 <= len(key) <= KEY_SIZE and key[:1].isalpha():
+                yield key.ljust(KEY_SIZE) + bytes([billable])
+
+    return write_records(out_path, MAGIC, KEY_SIZE, records())
+
+
+_loader = TableLoader("ICD-10-CM", FILENAME, ICD10Index)
+
+
+def get_icd10_index() -> Optional[ICD10Index]:
+    """Process-wide ICD-10-CM index, or None when not installed."""
+    return _loader.get()
@@ -0,0 +1,78 @@
+"""
+Medically Unlikely Edits (MUE): maximum units of service per code per day.
+
+Stored as two memory-mapped columns -- base-36 encoded codes (sorted) and
+their max units -- plus the MUE adjudication indicator, so resolving every
+distinct code on a bill is one ``np.searchsorted``.
+"""
+
+import csv
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.codesets._columnar import encode_code, open_columns, write_columns
+from app.codesets._loader import TableLoader
+
+MAGIC = b"ACVMUE01"
+FILENAME = "mue.col"
+
+
+class MUETable:
+    def __init__(self, path: str):
+        columns, self.meta = open_columns(path, MAGIC)
+        self.codes = columns["code"]
+        self.max_units = columns["max_units"]
+        self.indicator = columns["indicator"]
+
+    def __len__(self) -> int:
+        return int(self.codes.shape[0])
+
+    def limits(self, codes: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """{code: (max_units, adjudication_indicator)} for the codes that have an MUE."""
+        codes = [c for c in codes if encode_code(c) >= 0]
+        if not codes or not len(self):
+            return {}
+        enc = np.array([encode_code(c) for c in codes], dtype=np.uint32)
+        pos = np.searchsorted(self.codes, enc)
+        pos[pos >= len(self)] = 0
+        hit = self.codes[pos] == enc
+        return {
+            code: (int(self.max_units[p]), int(self.indicator[p]))
+            for code, p, h in zip(codes, pos, hit) if h
+        }
+
+
+def build_mue_table(csv_path: str, out_path: str) -> int:
+    """
+    Convert a CMS MUE file (columns: HCPCS/CPT code, MUE values, MUE
+    adjudication indicator) into the packed table. Returns the code count.
+    """
+    rows: Dict[int, Tuple[int, int]] = {}
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if len(row) < 2:
+                continue
+            code = encode_code(row[0])
+            units = row[1].strip()
+            if code < 0 or not units.isdigit():
+                continue  # header / notes rows
+            indicator = row[2].strip()[:1] if len(row) > 2 else ""
+            rows[code] = (int(units), int(indicator) if indicator.isdigit() else 0)
+
+    ordered = sorted(rows)
+    write_columns(out_path, MAGIC, {
+        "code": np.array(ordered, dtype=np.uint32),
+        "max_units": np.array([rows[c][0] for c in ordered], dtype=np.int32),
+        "indicator": np.array([rows[c][1] for c in ordered], dtype=np.uint8),
+    }, meta={"source": csv_path})
+    return len(ordered)
+
+
+_loader = TableLoader("MUE", FILENAME, MUETable)
+
+
+def get_mue_table() -> Optional[MUETable]:
+    """Process-wide MUE table, or None when not installed."""
+    return _loader.get()
@@ -0,0 +1,144 @@
+"""
+NCCI procedure-to-procedure (PTP) edit table.
+
+CMS publishes over a million column1/column2 pairs per quarter. They are
+stored as packed 64-bit keys (``column1 << 32 | column2``, each code base-36
+encoded) in a sorted column next to the modifier indicator and the
+effective/deletion dates, so every ordered code pair on a bill is checked
+with a single ``np.searchsorted`` against the memory-mapped keys.
+"""
+
+import csv
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.codesets._columnar import decode_code, encode_code, open_columns, write_columns
+from app.codesets._loader import TableLoader
+from app.codesets._records import date_key
+
+MAGIC = b"ACVNCCI1"
+FILENAME = "ncci_ptp.col"
+
+MODIFIER_NOT_ALLOWED = 0
+MODIFIER_ALLOWED = 1
+MODIFIER_NOT_APPLICABLE = 9
+
+
+@dataclass
+class PTPEdit:
+    column1: str
+    column2: str
+    modifier_indicator: int
+
+
+class NCCITable:
+    def __init__(self, path: str):
+        columns, self.meta = open_columns(path, MAGIC)
+        self.keys = columns["key"]
+        self.modifier = columns["modifier"]
+        self.effective = columns["effective"]
+        self.deleted = columns["deleted"]
+
+    def __len__(self) -> int:
+        return int(self.keys.shape[0])
+
+    def find_edits(self, codes: Iterable[str], on: Optional[date] = None) -> List[PTPEdit]:
+        """All active edits among the ordered pairs of ``codes`` as of ``on`` (default today)."""
+        unique = sorted({c for c in codes if encode_code(c) >= 0})
+        if len(unique) < 2 or not len(self):
+            return []
+        enc = np.array([encode_code(c) for c in unique], dtype=np.uint64)
+        n = len(enc)
+        col1 = np.repeat(enc, n)
+        col2 = np.tile(enc, n)
+        off_diagonal = col1 != col2
+        col1, col2 = col1[off_diagonal], col2[off_diagonal]
+
+        active, modifier = self.match_pairs(col1, col2, on)
+        return [
+            PTPEdit(decode_code(c1), decode_code(c2), int(m))
+            for c1, c2, m in zip(col1[active], col2[active], modifier[active])
+        ]
+
+    def match_pairs(
+        self, col1: np.ndarray, col2: np.ndarray, on: Optional[date] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized lookup of encoded (column1, column2) pairs. Returns a mask
+        of pairs with an active edit as of ``on`` and the modifier indicator
+        per pair (meaningful where the mask is set).
+        """
+        if not len(col1) or not len(self):
+            return np.zeros(len(col1), dtype=bool), np.zeros(len(col1), dtype=np.uint8)
+        wanted = (col1.astype(np.uint64) << np.uint64(32)) | col2.astype(np.uint64)
+        pos = np.searchsorted(self.keys, wanted)
+        pos[pos >= len(self)] = 0
+        hit = self.keys[pos] == wanted
+
+        today = date_key(on or date.today())
+        modifier = self.modifier[pos]
+        deleted = self.deleted[pos]
+        active = hit & (self.effective[pos] <= today) & ((deleted == 0) | (deleted > today))
+        active &= modifier != MODIFIER_NOT_APPLICABLE
+        return active, modifier
+
+
+def _column(row: dict, *prefixes: str) -> str:
+    for key, value in row.items():
+        if key and any(key.startswith(p) for p in prefixes):
+            return (value or "").strip()
+    return ""
+
+
+def build_ncci_table(csv_path: str, out_path: str) -> int:
+    """
+    Convert a CMS PTP edit file (tab- or comma-separated) into the packed table.
+    Where a pair appears more than once, the row with the latest effective
+    date wins. Returns the number of pairs written.
+    """
+    keys, modifiers, effectives, deletions = [], [], [], []
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
+        reader = csv.DictReader(f, dialect=dialect)
+        reader.fieldnames = [(name or "").strip().lower().replace("_", " ") for name in reader.fieldnames]
+        for row in reader:
+            c1 = encode_code(_column(row, "column 1", "column1"))
+            c2 = encode_code(_column(row, "column 2", "column2"))
+            if c1 < 0 or c2 < 0:
+                continue
+            indicator = _column(row, "modifier")
+            keys.append((c1 << 32) | c2)
+            modifiers.append(int(indicator[:1]) if indicator[:1].isdigit() else MODIFIER_NOT_ALLOWED)
+            effectives.append(date_key(_column(row, "effective")))
+            deletions.append(date_key(_column(row, "deletion")))
+
+    key_arr = np.array(keys, dtype=np.uint64)
+    eff_arr = np.array(effectives, dtype=np.int32)
+    # Sort by key, then effective date, and keep the last row of each key run
+    order = np.lexsort((eff_arr, key_arr))
+    key_arr = key_arr[order]
+    last = np.ones(len(key_arr), dtype=bool)
+    if len(key_arr):
+        last[:-1] = key_arr[1:] != key_arr[:-1]
+    picked = order[last]
+
+    write_columns(out_path, MAGIC, {
+        "key": key_arr[last],
+        "modifier": np.array(modifiers, dtype=np.uint8)[picked],
+        "effective": eff_arr[picked],
+        "deleted": np.array(deletions, dtype=np.int32)[picked],
+    }, meta={"source": csv_path})
+    return int(last.sum())
+
+
+_loader = TableLoader("NCCI PTP", FILENAME, NCCITable)
+
+
+def get_ncci_table() -> Optional[NCCITable]:
+    """Process-wide PTP table (hot-reloaded when a new build is renamed into place)."""
+    return _loader.get()
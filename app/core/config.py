@@ -36,12 +36,37 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE_MB: int = 10
     UPLOAD_DIR: str = "./uploads"
     STORAGE_TYPE: str = "local"  # local or s3
+    RENDER_CACHE_MAX_MB: int = 512   # rendered page images under UPLOAD_DIR/.renders; 0 disables
+
+    # PDF text extraction
+    PDF_TEXT_WORKERS: int = 0                # process pool size; 0 = min(4, CPU count)
+    PDF_TEXT_PARALLEL_MIN_PAGES: int = 16    # smaller PDFs are extracted inline
+    PAGE_TRIAGE_ENABLED: bool = True         # send only line-item/summary pages to Stage 1
+    VISION_MAX_PAGES: int = 5                # upper bound on page images per vision request
+    VISION_MAX_BYTES: int = 16_000_000       # encoded image budget per request (base64 adds a third)
+    TABLE_EXTRACT_ENABLED: bool = True       # read line items from the PDF layout when possible
+    TABLE_EXTRACT_MIN_CONFIDENCE: float = 0.85  # below this Stage 1 extracts the items itself
+    LAYOUT_TEMPLATES_ENABLED: bool = True    # reuse column mappings learned per statement layout
+    LAYOUT_TEMPLATE_PROVEN_HITS: int = 5     # successful hits after which a template may pass the confidence gate
+    BILL_SPLIT_ENABLED: bool = True          # one bill per statement in multi-statement PDFs
+    ANALYSIS_MAX_CONCURRENCY: int = 4        # bills analyzed at once per process (split uploads)
+
+    # Local OCR for photographed bills (Tesseract); good OCR skips the vision path
+    OCR_ENABLED: bool = False
+    TESSERACT_CMD: str = "tesseract"
+    OCR_LANG: str = "eng"
+    OCR_MIN_CONFIDENCE: float = 75.0   # mean word confidence (0-100) to trust the text
+    OCR_MIN_CHARS: int = 200
+    OCR_TIMEOUT: int = 30
     
     # AWS S3 (optional)
     AWS_ACCESS_KEY_ID: Optional[str] = None
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: str = "us-east-1"
     S3_BUCKET_NAME: Optional[str] = None
+    S3_PREFIX: str = "uploads"
+    S3_ENDPOINT_URL: Optional[str] = None     # MinIO / other S3-compatible stores
+    STORAGE_CACHE_MAX_MB: int = 2048          # local read-through cache of S3 files
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -58,10 +83,45 @@ class Settings(BaseSettings):
     # Local NLP models (BioBERT + PyCTAKES)
     BIOBERT_MODEL: str = "dmis-lab/biobert-base-cased-v1.2"
     CODE_VALIDATION_ENABLED: bool = True
+    CTAKES_POOL_SIZE: int = 1  # PyCTAKES pipelines kept per process (one per concurrent Stage 2)
+
+    # Prebuilt code tables (python -m app.codesets.build); missing files fall back to built-in rules
+    CODESET_DIR: str = "./data/codesets"
+    CODESET_RELOAD_INTERVAL: int = 60  # seconds between checks for a rebuilt table; 0 disables hot reload
+    FEE_SCHEDULE_LOCALITY: str = ""    # fee schedule locality id; blank = national rates
+    FEE_SCHEDULE_FACILITY: bool = False
+    FEE_SCHEDULE_OVERCHARGE_MULTIPLE: float = 3.0  # flag charges above this multiple of the reference price
+
+    # NER result cache (in-process LRU + on-disk SQLite shared by workers)
+    NER_CACHE_ENABLED: bool = True
+    NER_CACHE_MEMORY_ENTRIES: int = 512
+    NER_CACHE_PATH: str = "./cache/ner_cache.sqlite3"  # empty string disables the disk tier
+    NER_CACHE_DISK_ENTRIES: int = 50000
+    NER_CACHE_TTL_SECONDS: int = 30 * 24 * 3600  # entries older than this are recomputed; 0 = never expire
+
+    # Local inference CPU scheduling (torch thread pools + concurrency gate)
+    INFERENCE_CPU_CORES: int = 0          # 0 = detect; set to cores/workers when running several workers per box
+    INFERENCE_INTRA_OP_THREADS: int = 1
+    INFERENCE_INTER_OP_THREADS: int = 1
+    INFERENCE_MAX_CONCURRENCY: int = 0    # 0 = cores // intra-op threads
+    INFERENCE_QUEUE_TIMEOUT: float = 30.0  # seconds; on timeout NER is skipped (regex-only)
+
+    # Consensus merge
+    CONSENSUS_SIMILARITY_THRESHOLD: float = 0.5  # min token-set similarity to match issues that share no code
+    FINDING_DEDUP_ENABLED: bool = True
+    FINDING_DEDUP_THRESHOLD: float = 0.35  # TF-IDF cosine above which findings from different models merge
+    FINDING_DEDUP_UNCODED_THRESHOLD: float = 0.6  # stricter bar when only one of the two findings names codes
     
     # Medical pipeline feature flag
     MEDICAL_PIPELINE_ENABLED: bool = False
     MEDICAL_MODEL_TIMEOUT: int = 30
+    MEDGEMMA_BATCH_WINDOW_MS: int = 0   # >0: combine concurrent bills' Stage 3 requests into one predict call
+    MEDGEMMA_BATCH_MAX_SIZE: int = 8
+    MEDGEMMA_EXCERPT_TOKEN_BUDGET: int = 1000   # bill text sent to MedGemma, as windows around issue codes
+    # Stage 3 triage: only uncertain, high-value or Stage-2-disputed issues go to MedGemma
+    MEDGEMMA_TRIAGE_ENABLED: bool = True
+    MEDGEMMA_TRIAGE_MIN_CONFIDENCE: float = 0.85   # below this Claude confidence, always send
+    MEDGEMMA_TRIAGE_MIN_SAVINGS: float = 250.0     # at or above these estimated savings, always send
     
     # App
     DEBUG: bool = True
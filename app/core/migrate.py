@@ -29,3 +29,26 @@ def migrate_findings_review_columns():
             except Exception as e:
                 conn.rollback()
                 print(f"[Migration] Failed: {stmt[:60]}... Error: {e}", flush=True)
+
+
+def migrate_bill_columns():
+    """Add the upload content hash and service date to bills and Stage 1 routing details to analysis_jobs if missing."""
+    if "postgresql" not in str(engine.url):
+        return  # Skip for SQLite etc.
+    stmts = [
+        "ALTER TABLE bills ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64)",
+        "CREATE INDEX IF NOT EXISTS ix_bills_file_hash ON bills (file_hash)",
+        "ALTER TABLE bills ADD COLUMN IF NOT EXISTS service_date DATE",
+        "ALTER TABLE analysis_jobs ADD COLUMN IF NOT EXISTS extraction_route VARCHAR(20)",
+        "ALTER TABLE analysis_jobs ADD COLUMN IF NOT EXISTS ocr_confidence DOUBLE PRECISION",
+        "ALTER TABLE analysis_jobs ADD COLUMN IF NOT EXISTS ocr_ms INTEGER",
+    ]
+    with engine.connect() as conn:
+        for stmt in stmts:
+            try:
+                conn.execute(text(stmt))
+                conn.commit()
+                print(f"[Migration] OK: {stmt[:60]}...", flush=True)
+            except Exception as e:
+                conn.rollback()
+                print(f"[Migration] Failed: {stmt[:60]}... Error: {e}", flush=True)
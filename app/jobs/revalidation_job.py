@@ -0,0 +1,578 @@
+"""
+Bulk Stage 2 re-validation of completed bills, without any LLM calls.
+
+Run it after the code tables or validation rules change:
+
+    python scripts/revalidate_bills.py [--dry-run] [--prune]
+
+COMPLETED bills are paged by id a few thousand at a time; each page's line
+items are streamed out of the database with ``yield_per`` and packed into
+columnar NumPy arrays. The table-driven checks (CPT/HCPCS validity as of
+each bill's date of service, duplicate codes, MUE units, NCCI pairs, fee
+schedule) run vectorized over the whole batch: one lookup per distinct code
+or code pair in the batch, not one per bill. The other
+rules in ``code_rules`` are cheap per-bill checks and run through the rule
+set with the vectorized rules skipped. ICD checks are not re-run, because
+BioBERT entities are not stored.
+
+Findings that come from Stage 2 alone (validated_by == "PyCTAKES") are then
+diffed against the stored ones:
+
+- new findings are bulk-inserted;
+- changed findings are updated in place;
+- findings that are no longer produced are reported, and deleted with
+  ``prune``.
+
+Findings that a reviewer has already accepted, rejected or escalated are
+never modified.
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.bill import Bill, BillStatus
+from app.models.finding import Finding, FindingType
+from app.models.line_item import LineItem
+from app.services.rule_engine import split_code_modifiers
+
+VECTORIZED_RULES = {
+    "cpt_validity",
+    "duplicate_codes",
+    "mue_units",
+    "ncci_ptp_edits",
+    "fee_schedule_overcharge",
+}
+
+_CLEAN_BILL_PREFIX = "Bill reviewed by AI — no significant billing errors detected."
+
+
+@dataclass
+class RevalidationReport:
+    bills: int = 0
+    line_items: int = 0
+    issues: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    stale: int = 0
+    pruned: int = 0
+    reviewed_kept: int = 0
+    cleared_clean: int = 0
+    deduped: int = 0
+    seconds: float = 0.0
+    inserted_by_type: Counter = field(default_factory=Counter)
+    stale_by_type: Counter = field(default_factory=Counter)
+
+    @property
+    def bills_per_second(self) -> float:
+        return self.bills / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.bills} bills, {self.line_items} line items in {self.seconds:.1f}s "
+            f"({self.bills_per_second:,.0f} bills/s)",
+            f"{self.issues} Stage 2 issues: {self.inserted} new, {self.updated} changed, "
+            f"{self.unchanged} unchanged, {self.stale} no longer reported "
+            f"({self.pruned} pruned), {self.reviewed_kept} reviewed findings left as is, "
+            f"{self.cleared_clean} 'no errors' findings removed, "
+            f"{self.deduped} folded into existing findings",
+        ]
+        if self.inserted_by_type:
+            lines.append("new by type: " + ", ".join(f"{k}={v}" for k, v in self.inserted_by_type.most_common()))
+        if self.stale_by_type:
+            lines.append("stale by type: " + ", ".join(f"{k}={v}" for k, v in self.stale_by_type.most_common()))
+        return "\n".join(lines)
+
+
+class _Batch:
+    """Line items of a run of bills, appended row by row, then packed into arrays."""
+
+    def __init__(self):
+        self.bill_ids: List[int] = []
+        self.service_dates: List[Optional[date]] = []   # per bill, filled after the items are loaded
+        self.item_ids: List[int] = []
+        self.bill_index: List[int] = []
+        self.codes: List[str] = []
+        self.modifiers: List[str] = []      # modifiers split off "99213-25" style codes
+        self.descriptions: List[str] = []
+        self.quantity: List[float] = []
+        self.unit_price: List[float] = []
+        self.total_price: List[float] = []
+
+    def add(self, row):
+        if not self.bill_ids or self.bill_ids[-1] != row.bill_id:
+            self.bill_ids.append(row.bill_id)
+        self.item_ids.append(row.id)
+        self.bill_index.append(len(self.bill_ids) - 1)
+        code, modifiers = split_code_modifiers(str(row.code or "").strip().upper())
+        self.codes.append(code)
+        self.modifiers.append(" ".join(sorted(modifiers)))
+        self.descriptions.append(str(row.description or ""))
+        self.quantity.append(row.quantity or 0.0)
+        self.unit_price.append(row.unit_price or 0.0)
+        self.total_price.append(row.total_price or 0.0)
+
+    def __len__(self) -> int:
+        return len(self.bill_ids)
+
+
+class _Columns:
+    """Columnar view of a batch plus its (bill, code) groups."""
+
+    def __init__(self, batch: _Batch):
+        self.n_bills = len(batch.bill_ids)
+        self.service_dates = batch.service_dates
+        self.bill = np.asarray(batch.bill_index, dtype=np.int64)
+        qty = np.asarray(batch.quantity, dtype=np.float64)
+        self.qty = np.where(qty != 0, qty, 1.0)
+        unit = np.asarray(batch.unit_price, dtype=np.float64)
+        total = np.asarray(batch.total_price, dtype=np.float64)
+        self.billed = np.where(total != 0, total, unit * self.qty)
+
+        # Distinct codes of the batch and their properties
+        self.code_values, self.code = np.unique(np.asarray(batch.codes, dtype=str), return_inverse=True)
+        self.code = self.code.astype(np.int64)
+        lengths = np.char.str_len(self.code_values)
+        self.code_len5 = lengths == 5
+        self.code_is_cpt = self.code_len5 & np.char.isdigit(self.code_values)
+        from app.services.code_validation_service import CPT_HCPCS_RE
+
+        self.code_in_index = np.array(
+            [bool(CPT_HCPCS_RE.match(c)) for c in self.code_values.tolist()], dtype=bool,
+        )
+        self.code_counted = (lengths > 0) & (self.code_values != "SUMMARY")
+
+        # One group per (bill, code), sorted by bill then code
+        n_codes = max(len(self.code_values), 1)
+        keys = self.bill * n_codes + self.code
+        group_keys, first, self.group_of_item, self.group_count = np.unique(
+            keys, return_index=True, return_inverse=True, return_counts=True,
+        )
+        self.group_bill = group_keys // n_codes
+        self.group_code = group_keys % n_codes
+        self.group_first = first
+        self.group_units = np.bincount(self.group_of_item, weights=self.qty, minlength=len(group_keys))
+        self.group_billed = np.bincount(self.group_of_item, weights=self.billed, minlength=len(group_keys))
+
+
+def _vectorized_issues(cols: _Columns) -> Dict[int, Dict[str, list]]:
+    """Run the table-driven rules over the whole batch; {bill_index: {rule: [issues]}}."""
+    from app.codesets import get_cpt_index, get_fee_schedule, get_mue_table
+    from app.services.code_validation_service import (
+        CPT_RANGES,
+        cpt_range_issue,
+        cpt_status_issue,
+        duplicate_code_issue,
+        mue_issue,
+        overcharge_issue,
+    )
+
+    found: Dict[int, Dict[str, list]] = {}
+
+    def add(bill: int, rule: str, issue):
+        found.setdefault(bill, {}).setdefault(rule, []).append(issue)
+
+    values = cols.code_values
+    names = values.tolist()
+    bills, codes = cols.group_bill, cols.group_code
+    # Groups in first-appearance order, as the rules walk line items
+    appearance = np.argsort(cols.group_first, kind="stable")
+
+    # CPT validity: one status per distinct (code, date of service)
+    cpt_groups = np.flatnonzero(cols.code_is_cpt[codes])
+    index = get_cpt_index()
+    if index is not None:
+        from app.codesets import cpt_index
+        status = {}
+        for g in np.flatnonzero(cols.code_in_index[codes]):
+            key = (int(codes[g]), cols.service_dates[int(bills[g])])
+            if key not in status:
+                status[key] = index.status(names[key[0]], key[1])
+            if status[key] != cpt_index.VALID:
+                add(int(bills[g]), "cpt_validity", cpt_status_issue(names[codes[g]], status[key], index))
+    elif len(cpt_groups):
+        nums = np.zeros(len(values), dtype=np.int64)
+        nums[cols.code_is_cpt] = values[cols.code_is_cpt].astype(np.int64)
+        ranges = np.asarray(list(CPT_RANGES), dtype=np.int64)
+        in_range = ((nums[:, None] >= ranges[:, 0]) & (nums[:, None] <= ranges[:, 1])).any(axis=1)
+        for g in cpt_groups[~in_range[codes[cpt_groups]]]:
+            add(int(bills[g]), "cpt_validity", cpt_range_issue(names[codes[g]]))
+
+    # Duplicate codes
+    duplicated = cols.code_counted[codes] & (cols.group_count > 1)
+    for g in appearance[duplicated[appearance]]:
+        add(int(bills[g]), "duplicate_codes", duplicate_code_issue(names[codes[g]], int(cols.group_count[g])))
+
+    # MUE units: one limit per distinct code
+    mue = get_mue_table()
+    if mue is not None:
+        limits = mue.limits(values[cols.code_len5].tolist())
+        max_units = np.full(len(values), np.inf)
+        for c in np.flatnonzero(cols.code_len5):
+            if names[c] in limits:
+                max_units[c] = limits[names[c]][0]
+        exceeded = cols.code_len5[codes] & (cols.group_units > max_units[codes])
+        for g in appearance[exceeded[appearance]]:
+            add(int(bills[g]), "mue_units", mue_issue(
+                names[codes[g]], float(cols.group_units[g]), int(max_units[codes[g]]), float(cols.group_billed[g]),
+            ))
+
+    # Fee schedule: every priced line item of the batch in one lookup
+    schedule = get_fee_schedule()
+    if schedule is not None:
+        items = np.flatnonzero(cols.code_len5[cols.code] & (cols.billed > 0))
+        if len(items):
+            references = schedule.reference_prices(
+                values[cols.code[items]].tolist(),
+                locality=settings.FEE_SCHEDULE_LOCALITY,
+                facility=settings.FEE_SCHEDULE_FACILITY,
+            )
+            multiple = settings.FEE_SCHEDULE_OVERCHARGE_MULTIPLE
+            expected = np.round(references * multiple * cols.qty[items], 2)
+            flagged = (references > 0) & (cols.billed[items] > expected)
+            for i, reference in zip(items[flagged], references[flagged].tolist()):
+                issue = overcharge_issue(
+                    names[cols.code[i]], float(cols.qty[i]), float(cols.billed[i]), reference, multiple,
+                )
+                if issue is not None:
+                    add(int(cols.bill[i]), "fee_schedule_overcharge", issue)
+    return found
+
+
+def _ncci_issues(cols: _Columns, modifiers: List[Dict[str, set]], found: Dict[int, Dict[str, list]]):
+    """All within-bill ordered CPT pairs of the batch against the PTP table in one lookup."""
+    from app.codesets import get_ncci_table
+    from app.codesets._columnar import encode_code
+    from app.codesets.ncci import MODIFIER_ALLOWED
+    from app.services.code_validation_service import DISTINCT_SERVICE_MODIFIERS, ncci_issue
+
+    table = get_ncci_table()
+    if table is None:
+        return
+    names = cols.code_values.tolist()
+    groups = np.flatnonzero(cols.code_is_cpt[cols.group_code])
+    if len(groups) < 2:
+        return
+
+    # Cross product of each bill's CPT groups (groups are sorted by bill, then code)
+    bill_of = cols.group_bill[groups]
+    _, start, size = np.unique(bill_of, return_index=True, return_counts=True)
+    group_start = np.repeat(start, size)
+    group_size = np.repeat(size, size)
+    left = np.repeat(np.arange(len(groups)), group_size)
+    offset = np.arange(len(left)) - np.repeat(np.cumsum(group_size) - group_size, group_size)
+    right = np.repeat(group_start, group_size) + offset
+    off_diagonal = left != right
+    left, right = groups[left[off_diagonal]], groups[right[off_diagonal]]
+
+    encoded = np.array([max(encode_code(v), 0) for v in names], dtype=np.uint64)
+    active, modifier = table.match_pairs(encoded[cols.group_code[left]], encoded[cols.group_code[right]])
+    if not active.any():
+        return
+
+    for lg, rg, m in zip(left[active], right[active], modifier[active].tolist()):
+        bill = int(cols.group_bill[lg])
+        column1, column2 = names[cols.group_code[lg]], names[cols.group_code[rg]]
+        rules = found.setdefault(bill, {})
+        flagged = {tuple(sorted(i.code.split(", "))) for i in rules.get("mutually_exclusive", [])}
+        if tuple(sorted((column1, column2))) in flagged:
+            continue
+        if m == MODIFIER_ALLOWED and modifiers[bill].get(column2, set()) & DISTINCT_SERVICE_MODIFIERS:
+            continue
+        rules.setdefault("ncci_ptp_edits", []).append(
+            ncci_issue(column1, column2, m, float(cols.group_billed[rg]))
+        )
+
+
+def _per_bill_issues(batch: _Batch, found: Dict[int, Dict[str, list]]) -> List[Dict[str, set]]:
+    """Run the non-vectorized rules bill by bill; returns each bill's modifiers by code."""
+    from app.services.biobert_service import ExtractionResult
+    from app.services.code_validation_service import ValidationResult, code_rules
+    from app.services.rule_engine import RuleContext
+
+    modifiers: List[Dict[str, set]] = []
+    start = 0
+    for bill in range(len(batch.bill_ids)):
+        end = start
+        while end < len(batch.bill_index) and batch.bill_index[end] == bill:
+            end += 1
+        line_items = [
+            {
+                "code": batch.codes[i],
+                "modifiers": batch.modifiers[i],
+                "description": batch.descriptions[i],
+                "quantity": batch.quantity[i],
+                "unit_price": batch.unit_price[i],
+                "total_price": batch.total_price[i],
+            }
+            for i in range(start, end)
+        ]
+        ctx = RuleContext(
+            gpt_result={"line_items": line_items}, entities=ExtractionResult(), result=ValidationResult(),
+        )
+        code_rules.run(ctx, skip=VECTORIZED_RULES)
+        rules = found.setdefault(bill, {})
+        for name, issues in ctx.issues_by_rule.items():
+            if issues:
+                rules.setdefault(name, []).extend(issues)
+        modifiers.append(ctx.modifiers_by_code)
+        start = end
+    return modifiers
+
+
+def _affected(explanation: str) -> str:
+    head, sep, tail = explanation.rpartition(" (Affected: ")
+    return tail.rstrip(")") if sep else ""
+
+
+def _stored_issue(f) -> dict:
+    """A stored finding as a detected-issue dict, for the matcher and the dedup pass."""
+    head, sep, _ = f.explanation.rpartition(" (Affected: ")
+    affected = _affected(f.explanation)
+    return {
+        "description": head if sep else f.explanation,
+        "affected_items": affected.split(", ") if affected else [],
+        "validated_by": f.validated_by or "GPT",
+    }
+
+
+def _finding_rows(bill_id: int, issues: List[dict], item_ids_by_code: Dict[str, int], first_item: Optional[int]):
+    from app.services.analysis_service import _map_category_to_finding_type, _map_severity
+
+    rows = []
+    for issue in issues:
+        description = str(issue.get("description", ""))
+        affected = ", ".join(str(a) for a in issue.get("affected_items", []))
+        explanation = f"{description} (Affected: {affected})" if affected else description
+        first_code = affected.split(", ")[0]
+        rows.append({
+            "bill_id": bill_id,
+            "type": _map_category_to_finding_type(str(issue.get("category", "Coding")), description),
+            "severity": _map_severity(str(issue.get("severity", "Medium"))),
+            "confidence": round(max(0.0, min(1.0, float(issue.get("confidence", 0.8) or 0.8))), 2),
+            "estimated_savings": round(float(issue.get("estimated_savings", 0) or 0), 2),
+            "explanation": explanation,
+            "recommended_action": str(issue.get("recommended_action", "")),
+            "line_item_id": item_ids_by_code.get(first_code, first_item),
+            "model_agreement": issue.get("model_agreement"),
+            "validated_by": issue.get("validated_by"),
+        })
+    return rows
+
+
+def _diff_bill(existing: list, rows: List[dict], prune: bool, report: RevalidationReport):
+    """Returns (inserts, updates, delete_ids) for one bill; counts go to ``report``."""
+    stored = [f for f in existing if f.validated_by == "PyCTAKES"]
+    by_explanation = {f.explanation: f for f in stored}
+    matched = set()
+    inserts, updates, deletes = [], [], []
+    unmatched_rows = []
+    for row in rows:
+        f = by_explanation.get(row["explanation"])
+        if f is not None and f.id not in matched:
+            matched.add(f.id)
+            _compare(f, row, updates, report)
+        else:
+            unmatched_rows.append(row)
+
+    # Same finding type on the same code(s), but reworded or re-priced
+    by_identity: Dict[Tuple, list] = {}
+    for f in stored:
+        if f.id not in matched:
+            by_identity.setdefault((f.type, _affected(f.explanation)), []).append(f)
+    for row in unmatched_rows:
+        candidates = by_identity.get((row["type"], _affected(row["explanation"])))
+        if candidates:
+            f = candidates.pop(0)
+            matched.add(f.id)
+            _compare(f, row, updates, report)
+        else:
+            inserts.append(row)
+            report.inserted_by_type[row["type"].value] += 1
+
+    for f in stored:
+        if f.id in matched:
+            continue
+        report.stale += 1
+        report.stale_by_type[f.type.value if hasattr(f.type, "value") else str(f.type)] += 1
+        if prune and (f.review_status or "PENDING") == "PENDING":
+            report.pruned += 1
+            deletes.append(f.id)
+
+    # A bill that now has Stage 2 findings is no longer "clean"
+    if inserts:
+        for f in existing:
+            if (f.validated_by is None and f.type == FindingType.OTHER
+                    and f.explanation.startswith(_CLEAN_BILL_PREFIX)
+                    and (f.review_status or "PENDING") == "PENDING"):
+                report.cleared_clean += 1
+                deletes.append(f.id)
+    return inserts, updates, deletes
+
+
+def _compare(f, row: dict, updates: List[dict], report: RevalidationReport):
+    if (f.review_status or "PENDING") != "PENDING":
+        report.reviewed_kept += 1
+        return
+    same = (
+        f.explanation == row["explanation"]
+        and f.type == row["type"]
+        and f.severity == row["severity"]
+        and abs(f.estimated_savings - row["estimated_savings"]) < 0.005
+        and abs(f.confidence - row["confidence"]) < 0.005
+    )
+    if same:
+        report.unchanged += 1
+        return
+    update = {k: row[k] for k in ("type", "severity", "confidence", "estimated_savings",
+                                  "explanation", "recommended_action", "line_item_id")}
+    update["id"] = f.id
+    updates.append(update)
+
+
+def _process_batch(db, batch: _Batch, dry_run: bool, prune: bool, report: RevalidationReport):
+    from app.services.consensus import code_validation_issues
+    from app.services.code_validation_service import code_rules
+    from app.services.finding_dedup import dedup_findings
+
+    cols = _Columns(batch)
+    found = _vectorized_issues(cols)
+    modifiers = _per_bill_issues(batch, found)
+    _ncci_issues(cols, modifiers, found)
+
+    existing: Dict[int, list] = {}
+    for f in (
+        db.query(Finding.id, Finding.bill_id, Finding.type, Finding.severity, Finding.confidence,
+                 Finding.estimated_savings, Finding.explanation, Finding.validated_by, Finding.review_status)
+        .filter(Finding.bill_id.in_(batch.bill_ids))
+    ):
+        existing.setdefault(f.bill_id, []).append(f)
+
+    inserts, updates, deletes = [], [], []
+    item_start = 0
+    for bill, bill_id in enumerate(batch.bill_ids):
+        item_ids_by_code: Dict[str, int] = {}
+        first_item = None
+        while item_start < len(batch.bill_index) and batch.bill_index[item_start] == bill:
+            if first_item is None:
+                first_item = batch.item_ids[item_start]
+            item_ids_by_code.setdefault(batch.codes[item_start], batch.item_ids[item_start])
+            item_start += 1
+
+        rules = found.get(bill, {})
+        issues = [i for name in code_rules.rule_names for i in rules.get(name, [])]
+        report.issues += len(issues)
+        bill_findings = existing.get(bill_id, [])
+        gpt_issues = [_stored_issue(f) for f in bill_findings if f.validated_by != "PyCTAKES"]
+        candidates = code_validation_issues(issues, gpt_issues)
+        if settings.FINDING_DEDUP_ENABLED and candidates and gpt_issues:
+            # Same pass as consensus: a Stage 2 issue folded into a stored finding stays folded
+            kept, _ = dedup_findings(gpt_issues + candidates)
+            kept_ids = {id(i) for i in kept}
+            # Merges among the stored findings themselves are not this job's to count
+            folded = [i for i in candidates if id(i) not in kept_ids]
+            if folded:
+                report.deduped += len(folded)
+                candidates = [i for i in candidates if id(i) in kept_ids]
+        rows = _finding_rows(bill_id, candidates, item_ids_by_code, first_item)
+        ins, upd, dels = _diff_bill(bill_findings, rows, prune, report)
+        inserts.extend(ins)
+        updates.extend(upd)
+        deletes.extend(dels)
+
+    report.inserted += len(inserts)
+    report.updated += len(updates)
+    if dry_run:
+        return
+    if inserts:
+        db.bulk_insert_mappings(Finding, inserts)
+    if updates:
+        db.bulk_update_mappings(Finding, updates)
+    if deletes:
+        db.query(Finding).filter(Finding.id.in_(deletes)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _bill_id_pages(db, bill_ids: Optional[Iterable[int]], page_size: int):
+    """COMPLETED bill ids in ascending pages (keyset pagination, no open cursor between pages)."""
+    wanted = sorted(set(bill_ids)) if bill_ids is not None else None
+    last_id = 0
+    while True:
+        query = db.query(Bill.id).filter(Bill.status == BillStatus.COMPLETED, Bill.id > last_id)
+        if wanted is not None:
+            query = query.filter(Bill.id.in_(wanted))
+        page = [row.id for row in query.order_by(Bill.id).limit(page_size)]
+        if not page:
+            return
+        yield page
+        last_id = page[-1]
+
+
+def _load_batch(db, bill_ids: List[int], chunk_rows: int) -> _Batch:
+    """Stream the line items of ``bill_ids`` into a columnar batch."""
+    from app.services.code_validation_service import bill_service_date
+
+    batch = _Batch()
+    rows = (
+        db.query(
+            LineItem.id, LineItem.bill_id, LineItem.code, LineItem.description,
+            LineItem.quantity, LineItem.unit_price, LineItem.total_price,
+        )
+        .filter(LineItem.bill_id.in_(bill_ids))
+        .order_by(LineItem.bill_id, LineItem.id)
+        .yield_per(chunk_rows)
+    )
+    for row in rows:
+        batch.add(row)
+    # Code status is checked as of each bill's date of service (upload date when unknown)
+    dates = {
+        row.id: bill_service_date(row.service_date, row.uploaded_at)
+        for row in db.query(Bill.id, Bill.service_date, Bill.uploaded_at).filter(Bill.id.in_(batch.bill_ids))
+    }
+    batch.service_dates = [dates.get(bill_id) for bill_id in batch.bill_ids]
+    return batch
+
+
+def revalidate_completed_bills(
+    batch_bills: int = 2000,
+    dry_run: bool = False,
+    prune: bool = False,
+    bill_ids: Optional[Iterable[int]] = None,
+    chunk_rows: int = 10000,
+) -> RevalidationReport:
+    """Re-run Stage 2 over every COMPLETED bill (or ``bill_ids``) and sync its findings."""
+    report = RevalidationReport()
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        for batch_no, page in enumerate(_bill_id_pages(db, bill_ids, batch_bills), start=1):
+            t0 = time.perf_counter()
+            batch = _load_batch(db, page, chunk_rows)
+            if len(batch):
+                _process_batch(db, batch, dry_run, prune, report)
+            # Bills without line items are checked too; they just produce no issues
+            report.bills += len(page)
+            report.line_items += len(batch.item_ids)
+            elapsed = time.perf_counter() - t0
+            print(
+                f"[Revalidate] Batch {batch_no}: {len(page)} bills, {len(batch.item_ids)} line items "
+                f"in {elapsed:.2f}s ({len(page) / elapsed if elapsed else 0:,.0f} bills/s)",
+                flush=True,
+            )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    report.seconds = time.perf_counter() - started
+    mode = " (dry run, nothing written)" if dry_run else ""
+    print(f"[Revalidate] Done{mode}:\n{report.summary()}", flush=True)
+    return report
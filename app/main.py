@@ -1,7 +1,6 @@
 from fastapi import FastAPI, Request, status, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.core.database import engine, Base
 from app.api.v1.auth import auth_router
@@ -59,11 +58,16 @@ async def on_startup():
         )
     else:
         try:
-            from app.core.migrate import migrate_findings_review_columns
+            from app.core.migrate import migrate_findings_review_columns, migrate_bill_columns
             migrate_findings_review_columns()
+            migrate_bill_columns()
         except Exception as e:
             print(f"[Startup] Migration skipped: {e}", flush=True)
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    if settings.CODE_VALIDATION_ENABLED:
+        # Build the PyCTAKES pipeline in the background so no bill pays for it
+        from app.services.ctakes_pipeline import warm_up_ctakes
+        asyncio.get_running_loop().run_in_executor(None, warm_up_ctakes)
     if settings.ENVIRONMENT == "production":
         asyncio.create_task(_keep_alive())
 
@@ -77,8 +81,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for uploads
-app.mount("/files", StaticFiles(directory=settings.UPLOAD_DIR), name="files")
+@app.get("/files/{key}")
+async def get_file(key: str):
+    """Serve an uploaded bill file from storage (any node can serve any file)."""
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.responses import FileResponse
+    from app.storage import get_storage_adapter
+    from app.storage.base import check_key
+
+    try:
+        path = await run_in_threadpool(get_storage_adapter().get_local_path, check_key(key))
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    return FileResponse(path)
 
 # Include routers
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
@@ -153,6 +168,19 @@ async def pipeline_status():
         and settings.GCP_PROJECT_ID
         and settings.MEDGEMMA_ENDPOINT_ID
     )
+    from app.services.ner_cache import get_ner_cache
+    from app.services.inference_scheduler import get_inference_scheduler
+    from app.services.code_validation_service import code_rules
+    from app.services.ctakes_pipeline import get_ctakes_pool
+    from app.services.medical_model_service import get_prediction_batcher
+    from app.services.stage3_triage import triage_stats
+    from app.services.layout_templates import template_stats
+    from app.utils.ocr import tesseract_available
+    from app.utils.render_cache import get_render_cache
+    ner_cache = get_ner_cache()
+    ctakes_pool = get_ctakes_pool()
+    medgemma_batcher = get_prediction_batcher()
+    render_cache = get_render_cache()
     return {
         "success": True,
         "data": {
@@ -166,6 +194,15 @@ async def pipeline_status():
                 "GCP_PROJECT_ID_set": bool(settings.GCP_PROJECT_ID),
                 "MEDGEMMA_ENDPOINT_ID_set": bool(settings.MEDGEMMA_ENDPOINT_ID),
             },
+            "ner_cache": ner_cache.stats() if ner_cache else "disabled",
+            "inference": get_inference_scheduler().stats(),
+            "validation_rules": code_rules.stats(),
+            "ctakes": ctakes_pool.stats() if ctakes_pool else "not installed",
+            "medgemma_batching": medgemma_batcher.stats() if medgemma_batcher else "disabled",
+            "medgemma_triage": triage_stats(),
+            "layout_templates": template_stats(),
+            "render_cache": render_cache.stats() if render_cache else "disabled",
+            "ocr": ("enabled" if tesseract_available() else "tesseract not found") if settings.OCR_ENABLED else "disabled",
         },
     }
 
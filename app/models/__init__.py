@@ -4,6 +4,7 @@ from app.models.bill import Bill
 from app.models.analysis_job import AnalysisJob
 from app.models.finding import Finding
 from app.models.line_item import LineItem
+from app.models.layout_template import LayoutTemplate
 
-__all__ = ["User", "Organization", "Bill", "AnalysisJob", "Finding", "LineItem"]
+__all__ = ["User", "Organization", "Bill", "AnalysisJob", "Finding", "LineItem", "LayoutTemplate"]
 
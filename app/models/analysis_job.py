@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -19,6 +19,9 @@ class AnalysisJob(Base):
     bill_id = Column(Integer, ForeignKey("bills.id"), unique=True, nullable=False)
     status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
     error_message = Column(Text, nullable=True)
+    extraction_route = Column(String(20), nullable=True)  # text | table | ocr | vision
+    ocr_confidence = Column(Float, nullable=True)         # mean word confidence 0-100
+    ocr_ms = Column(Integer, nullable=True)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
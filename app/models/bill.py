@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -21,7 +21,9 @@ class Bill(Base):
     file_path = Column(String, nullable=False)
     file_name = Column(String, nullable=False)
     file_type = Column(String, nullable=False)  # pdf, jpg, png
+    file_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded bytes
     total_amount = Column(Float, nullable=True)
+    service_date = Column(Date, nullable=True)  # earliest date of service, as read by Stage 1
     status = Column(Enum(BillStatus), default=BillStatus.PENDING, nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     analyzed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class LayoutTemplate(Base):
+    """Column mapping learned for one statement layout (see app.utils.table_extract)."""
+    __tablename__ = "layout_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String(40), unique=True, index=True, nullable=False)  # SHA-1 of page size + header row
+    header = Column(Text, nullable=False)          # header row text, for humans
+    columns = Column(Text, nullable=False)         # JSON TableLayout
+    hits = Column(Integer, default=0, nullable=False)
+    failures = Column(Integer, default=0, nullable=False)   # hits that came out below the confidence threshold
+    avg_ms = Column(Float, nullable=True)          # mean extraction time on hits
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
@@ -2,11 +2,13 @@ from app.repositories.user_repository import UserRepository
 from app.repositories.bill_repository import BillRepository
 from app.repositories.organization_repository import OrganizationRepository
 from app.repositories.analysis_job_repository import AnalysisJobRepository
+from app.repositories.layout_template_repository import LayoutTemplateRepository
 
 __all__ = [
     "UserRepository",
     "BillRepository",
     "OrganizationRepository",
-    "AnalysisJobRepository"
+    "AnalysisJobRepository",
+    "LayoutTemplateRepository"
 ]
 
@@ -25,7 +25,8 @@ class BillRepository:
         file_path: str,
         file_name: str,
         file_type: str,
-        organization_id: Optional[int] = None
+        organization_id: Optional[int] = None,
+        file_hash: Optional[str] = None,
     ) -> Bill:
         bill = Bill(
             patient_id=patient_id,
@@ -33,6 +34,7 @@ class BillRepository:
             file_path=file_path,
             file_name=file_name,
             file_type=file_type,
+            file_hash=file_hash,
             status=BillStatus.PENDING
         )
         self.db.add(bill)
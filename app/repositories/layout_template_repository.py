@@ -0,0 +1,43 @@
+import json
+from sqlalchemy.orm import Session
+from typing import Optional, List
+from datetime import datetime
+from app.models.layout_template import LayoutTemplate
+
+
+class LayoutTemplateRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_fingerprint(self, fingerprint: str) -> Optional[LayoutTemplate]:
+        return self.db.query(LayoutTemplate).filter(LayoutTemplate.fingerprint == fingerprint).first()
+
+    def get_most_used(self, limit: int = 20) -> List[LayoutTemplate]:
+        return self.db.query(LayoutTemplate).order_by(LayoutTemplate.hits.desc()).limit(limit).all()
+
+    def create(self, fingerprint: str, header: str, columns: dict) -> LayoutTemplate:
+        template = LayoutTemplate(
+            fingerprint=fingerprint,
+            header=header,
+            columns=json.dumps(columns),
+        )
+        self.db.add(template)
+        self.db.commit()
+        self.db.refresh(template)
+        return template
+
+    def record_use(self, template: LayoutTemplate, ok: bool, ms: float) -> LayoutTemplate:
+        uses = template.hits + template.failures
+        template.avg_ms = ms if template.avg_ms is None else (template.avg_ms * uses + ms) / (uses + 1)
+        if ok:
+            template.hits += 1
+        else:
+            template.failures += 1
+        template.last_used_at = datetime.utcnow()
+        self.db.commit()
+        self.db.refresh(template)
+        return template
+
+    def delete(self, template: LayoutTemplate):
+        self.db.delete(template)
+        self.db.commit()
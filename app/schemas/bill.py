@@ -28,6 +28,7 @@ class BillResponse(BaseModel):
     created_at: datetime
     line_items: List[LineItemResponse] = []
     findings: List[FindingResponse] = []
+    split_bill_ids: List[int] = []   # upload only: all bills created when the PDF held several statements
 
     class Config:
         from_attributes = True
@@ -10,6 +10,7 @@ from app.repositories.analysis_job_repository import AnalysisJobRepository
 from app.models.bill import BillStatus
 from app.models.finding import Finding, FindingType, FindingSeverity
 from app.models.line_item import LineItem
+from app.utils.table_extract import code_with_modifier
 
 
 # ── Category → FindingType mapping ────────────────────────────────
@@ -143,25 +144,100 @@ class AnalysisService:
     def _analyze_with_ai(self, bill_id: int, bill) -> dict:
         """Analyze bill using Claude with comprehensive error detection prompt."""
         from app.services.anthropic_service import AnthropicService
-        from app.utils.file_upload import extract_text_from_file, get_file_as_base64_images
+        from app.utils.file_upload import extract_text_from_file, get_file_images
+
+        from app.storage import get_storage_adapter
 
         ai_service = AnthropicService()
         ai_result: Dict[str, Any] = {}
+        file_path = get_storage_adapter().get_local_path(bill.file_path)
 
         # Strategy 1: Try text extraction from PDF
         bill_text = ""
-        try:
-            bill_text = extract_text_from_file(bill.file_path)
-        except Exception as e:
-            print(f"[Analysis] Bill {bill_id}: Text extraction failed: {e}", flush=True)
+        triage = None
+        if bill.file_type == "pdf" and settings.PAGE_TRIAGE_ENABLED:
+            try:
+                from app.utils.page_triage import triage_pdf
+
+                triage = triage_pdf(file_path)
+                bill_text = triage.text
+                print(
+                    f"[Analysis] Bill {bill_id}: Page triage — keeping {len(triage.kept)}/{len(triage.pages)} pages "
+                    f"({triage.summary()}), {len(bill_text)}/{triage.total_chars} chars",
+                    flush=True,
+                )
+            except Exception as e:
+                print(f"[Analysis] Bill {bill_id}: Page triage failed, using all pages: {e}", flush=True)
+                triage = None
+        if triage is None:
+            try:
+                bill_text = extract_text_from_file(file_path)
+            except Exception as e:
+                print(f"[Analysis] Bill {bill_id}: Text extraction failed: {e}", flush=True)
+
+        route = "text"
+        job = bill.analysis_job
+        if (not bill_text or len(bill_text.strip()) < 50) and bill.file_type in ("jpg", "png"):
+            # Photographed bill: try local OCR before paying for vision
+            from app.utils.ocr import ocr_image
+
+            ocr = ocr_image(file_path)
+            if ocr is not None:
+                route = "ocr" if ocr.good_enough() else "vision"
+                print(
+                    f"[Analysis] Bill {bill_id}: OCR {ocr.words} words, confidence {ocr.confidence:.0f}, "
+                    f"{len(ocr.text)} chars in {ocr.total_ms:.0f} ms "
+                    f"(preprocess {ocr.preprocess_ms:.0f} ms) -> {route}",
+                    flush=True,
+                )
+                if job is not None:
+                    job.ocr_confidence = ocr.confidence
+                    job.ocr_ms = int(ocr.total_ms)
+                if route == "ocr":
+                    bill_text = ocr.text
+
+        table = None
+        if triage is not None and settings.TABLE_EXTRACT_ENABLED and bill_text and len(bill_text.strip()) >= 50:
+            try:
+                from app.utils.table_extract import extract_line_items
+
+                if settings.LAYOUT_TEMPLATES_ENABLED:
+                    from app.services.layout_templates import LayoutTemplateStore
 
-        if bill_text and len(bill_text.strip()) >= 50:
-            print(f"[Analysis] Bill {bill_id}: Stage 1 GPT (text) — {len(bill_text)} chars", flush=True)
+                    table = LayoutTemplateStore().extract(file_path, pages=triage.kept)
+                else:
+                    table = extract_line_items(file_path, pages=triage.kept)
+                print(
+                    f"[Analysis] Bill {bill_id}: Table extraction — {len(table.line_items)} items, "
+                    f"confidence {table.confidence:.2f} in {table.ms:.0f} ms ({'; '.join(table.notes)})",
+                    flush=True,
+                )
+                if table.confidence < settings.TABLE_EXTRACT_MIN_CONFIDENCE:
+                    table = None
+            except Exception as e:
+                print(f"[Analysis] Bill {bill_id}: Table extraction failed: {e}", flush=True)
+                table = None
+
+        if table is not None:
+            from app.utils.table_extract import format_table
+
+            route = "table"
+            print(f"[Analysis] Bill {bill_id}: Stage 1 GPT (issues only) — {len(table.line_items)} extracted items", flush=True)
+            ai_result = ai_service.analyze_bill_table(format_table(table.line_items), table.other_text)
+            ai_result["line_items"] = table.line_items
+        elif bill_text and len(bill_text.strip()) >= 50:
+            print(f"[Analysis] Bill {bill_id}: Stage 1 GPT ({route}) — {len(bill_text)} chars", flush=True)
             ai_result = ai_service.analyze_bill_text(bill_text)
         else:
-            # Strategy 2: Use vision (renders PDF/image to base64 and sends to GPT-4o)
+            route = "vision"
+            # Strategy 2: Use vision (renders PDF/image pages and sends them to Claude)
             print(f"[Analysis] Bill {bill_id}: Stage 1 GPT (vision) — text too short ({len(bill_text)} chars)", flush=True)
-            images = get_file_as_base64_images(bill.file_path, max_pages=3)
+            images = get_file_images(
+                file_path,
+                max_pages=3,
+                file_hash=bill.file_hash,
+                pages=triage.vision_pages() if triage is not None else None,
+            )
             if not images:
                 raise ValueError("Could not convert file to images for vision analysis")
             ai_result = ai_service.analyze_bill_images(images)
@@ -169,6 +245,14 @@ class AnalysisService:
             bill_text = self._build_text_from_ai_result(ai_result)
             print(f"[Analysis] Bill {bill_id}: Rebuilt {len(bill_text)} chars from Claude for Stage 2", flush=True)
 
+        if job is not None:
+            job.extraction_route = route
+        if ai_result.get("service_date"):
+            from app.services.code_validation_service import bill_service_date
+
+            # Re-validation checks code status as of this date, not the day it runs
+            bill.service_date = bill_service_date(ai_result["service_date"]) or bill.service_date
+
         print(
             f"[Analysis] Bill {bill_id}: Stage 1 done — "
             f"{len(ai_result.get('detected_issues', []))} issues, "
@@ -184,7 +268,7 @@ class AnalysisService:
             try:
                 print(f"[Analysis] Bill {bill_id}: Running local NLP validation...", flush=True)
                 from app.services.biobert_service import BioBERTService
-                from app.services.code_validation_service import CodeValidationService
+                from app.services.code_validation_service import CodeValidationService, bill_service_date
 
                 biobert = BioBERTService()
                 entities = biobert.extract_entities(bill_text)
@@ -196,7 +280,9 @@ class AnalysisService:
                 )
 
                 validator = CodeValidationService()
-                code_validation = validator.validate(ai_result, entities)
+                code_validation = validator.validate(
+                    ai_result, entities, service_date=bill_service_date(bill.service_date, bill.uploaded_at),
+                )
                 stage2_ran = True
                 print(
                     f"[Analysis] Bill {bill_id}: Stage 2 done — "
@@ -215,24 +301,37 @@ class AnalysisService:
         stage3_ran = False
         if settings.MEDICAL_PIPELINE_ENABLED and settings.GCP_PROJECT_ID and settings.MEDGEMMA_ENDPOINT_ID:
             try:
-                print(f"[Analysis] Bill {bill_id}: Stage 3 MedGemma...", flush=True)
-                from app.services.medical_model_service import MedicalModelService
-                from app.services.biobert_service import ExtractionResult
-                from app.services.code_validation_service import ValidationResult as CodeValResult
-
-                med_service = MedicalModelService()
-                medgemma_out = med_service.validate_clinical(
-                    ai_result,
-                    bill_text,
-                    entities or ExtractionResult(),
-                    code_validation or CodeValResult(),
-                )
-                stage3_ran = bool(medgemma_out)
+                from app.services.stage3_triage import plan_stage3
+
+                plan = plan_stage3(ai_result, code_validation)
+                plan.mark_skipped(ai_result)
                 print(
-                    f"[Analysis] Bill {bill_id}: Stage 3 done — "
-                    f"{'succeeded' if medgemma_out else 'no results'}",
+                    f"[Analysis] Bill {bill_id}: Stage 3 triage — sending {len(plan.send)}/{plan.total} issues "
+                    f"(skip ratio {plan.skip_ratio:.0%}), {plan.new_code_issues} new code issues",
                     flush=True,
                 )
+                if plan.call_needed:
+                    print(f"[Analysis] Bill {bill_id}: Stage 3 MedGemma...", flush=True)
+                    from app.services.medical_model_service import MedicalModelService
+                    from app.services.biobert_service import ExtractionResult
+                    from app.services.code_validation_service import ValidationResult as CodeValResult
+
+                    med_service = MedicalModelService()
+                    medgemma_out = med_service.validate_clinical(
+                        ai_result,
+                        bill_text,
+                        entities or ExtractionResult(),
+                        code_validation or CodeValResult(),
+                        issue_indices=plan.send,
+                    )
+                    stage3_ran = bool(medgemma_out)
+                    print(
+                        f"[Analysis] Bill {bill_id}: Stage 3 done — "
+                        f"{'succeeded' if medgemma_out else 'no results'}",
+                        flush=True,
+                    )
+                else:
+                    print(f"[Analysis] Bill {bill_id}: Stage 3 SKIPPED (triage: nothing uncertain or high-value)", flush=True)
             except Exception as e:
                 print(f"[Analysis] Bill {bill_id}: Stage 3 FAILED (non-fatal): {e}", flush=True)
                 traceback.print_exc()
@@ -277,7 +376,7 @@ class AnalysisService:
             parts.append(ai_result["summary"])
         for item in ai_result.get("line_items", []):
             desc = item.get("description", "")
-            code = item.get("code", "")
+            code = code_with_modifier(item)
             price = item.get("total_price", item.get("unit_price", 0))
             parts.append(f"{desc} {code} {price}".strip())
         for issue in ai_result.get("detected_issues", []):
@@ -312,7 +411,7 @@ class AnalysisService:
                 li = LineItem(
                     bill_id=bill_id,
                     description=str(item_data.get("description", "Medical Service")),
-                    code=str(item_data.get("code", "") or ""),
+                    code=code_with_modifier(item_data),
                     quantity=quantity,
                     unit_price=unit_price,
                     total_price=total_price,
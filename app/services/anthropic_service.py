@@ -1,8 +1,8 @@
 import json
-import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Sequence, Union
 import anthropic
 from app.core.config import settings
+from app.utils.bill_image import BillImage, image_content_blocks
 
 
 # ── Acuvera Medical Billing Error Detection System Prompt ────────────────
@@ -132,6 +132,7 @@ OUTPUT_SCHEMA = """{
   "summary": "2–3 sentence plain-language overview: what this bill is for, total amount, and the main issues or that it looks clean",
   "risk_score": 0,
   "total_amount": 0.0,
+  "service_date": "Earliest date of service on the bill as YYYY-MM-DD, or empty string if none is shown",
   "line_items": [
     {
       "description": "Service or procedure name exactly as shown on the bill",
@@ -163,6 +164,12 @@ OUTPUT_SCHEMA = """{
 }"""
 
 
+# Same schema without line_items, for bills whose table was already extracted locally
+ISSUES_ONLY_SCHEMA = OUTPUT_SCHEMA.replace(
+    OUTPUT_SCHEMA[OUTPUT_SCHEMA.index('  "line_items"'):OUTPUT_SCHEMA.index('  "detected_issues"')], ""
+)
+
+
 class AnthropicService:
     """Service for interacting with Anthropic Claude API using Acuvera's detection prompt."""
 
@@ -200,33 +207,48 @@ class AnthropicService:
         except Exception as e:
             raise Exception(f"Anthropic text analysis error: {str(e)}")
 
+    def analyze_bill_table(self, table: str, context: str) -> Dict[str, Any]:
+        """
+        Issue detection over line items that were already extracted from the
+        bill layout. Claude does not re-type the table, so the response is
+        much shorter; ``line_items`` in the result is left for the caller.
+        """
+        prompt = (
+            "The line items of this medical bill have already been extracted and are listed below, "
+            "one numbered row each. Do NOT repeat them. "
+            "Perform the full error-detection analysis as instructed, referring to items by row number and code.\n\n"
+            "Write each finding in DETAIL so a patient can understand exactly what was billed, "
+            "what the issue is, and what to do next. Include specific amounts and line references.\n\n"
+            f"Return ONLY a JSON object matching this exact structure (do not include markdown formatting or backticks):\n{ISSUES_ONLY_SCHEMA}\n\n"
+            f"Line items:\n{table}\n\n"
+            f"Other bill text (header, totals, payments):\n{context}"
+        )
+
+        try:
+            response = self.client.messages.create(
+                model=self.model,
+                system=SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.15,
+                max_tokens=4096,
+            )
+            return self._parse_response(response.content[0].text)
+        except Exception as e:
+            raise Exception(f"Anthropic table analysis error: {str(e)}")
+
     # ── Vision-based analysis (scanned PDFs, images) ──────────────
 
-    def analyze_bill_images(self, image_data_uris: List[str]) -> Dict[str, Any]:
+    def analyze_bill_images(self, images: Sequence[Union[BillImage, str]]) -> Dict[str, Any]:
         """
         Analyze medical bill images using Claude 3.5 Sonnet vision capability.
 
         Args:
-            image_data_uris: List of base64 data-URI strings
-                e.g. ["data:image/jpeg;base64,iVBOR..."]
+            images: BillImage page images (legacy base64 data-URI strings,
+                e.g. "data:image/jpeg;base64,iVBOR...", are still accepted)
         """
-        content: list = []
-
-        for uri in image_data_uris:
-            # Parse the data URI to get media type and base64 data
-            # Format: data:image/jpeg;base64,...
-            match = re.match(r"data:(image/[^;]+);base64,(.+)", uri)
-            if match:
-                media_type = match.group(1)
-                base64_data = match.group(2)
-                content.append({
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": media_type,
-                        "data": base64_data,
-                    }
-                })
+        content: list = image_content_blocks(images)
 
         content.append({
             "type": "text",
@@ -1,7 +1,17 @@
+import os
+import shutil
+import tempfile
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.storage import get_storage_adapter
 from app.repositories.bill_repository import BillRepository
 from app.repositories.analysis_job_repository import AnalysisJobRepository
 from app.models.bill import BillStatus
@@ -10,6 +20,36 @@ from app.utils.file_upload import validate_file, save_uploaded_file
 from app.services.analysis_service import AnalysisService
 
 
+_analysis_pool: Optional[ThreadPoolExecutor] = None
+_analysis_pool_lock = threading.Lock()
+
+
+def _get_analysis_pool() -> ThreadPoolExecutor:
+    """Process-wide pool that bounds concurrent analyses at ANALYSIS_MAX_CONCURRENCY."""
+    global _analysis_pool
+    if _analysis_pool is None:
+        with _analysis_pool_lock:
+            if _analysis_pool is None:
+                _analysis_pool = ThreadPoolExecutor(
+                    max_workers=max(1, settings.ANALYSIS_MAX_CONCURRENCY),
+                    thread_name_prefix="analysis",
+                )
+    return _analysis_pool
+
+
+def _analyze_in_own_session(bill_id: int):
+    """Worker-thread analysis; sessions are not shared across threads."""
+    db = SessionLocal()
+    try:
+        AnalysisService(db).analyze_bill(bill_id)
+        print(f"[BillService] Analysis completed for bill {bill_id}", flush=True)
+    except Exception as e:
+        print(f"[BillService] Analysis failed for bill {bill_id}: {e}", flush=True)
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
 class BillService:
     def __init__(self, db: Session):
         self.db = db
@@ -25,21 +65,28 @@ class BillService:
         """Upload a bill AND run analysis in the same request."""
         # 1. Validate and save file
         file_type, file_ext = validate_file(file)
-        file_path, file_name = await save_uploaded_file(file, file_type)
+        file_path, file_name, file_hash = await save_uploaded_file(file, file_type)
+
+        # 2. Several statements in one PDF: one bill per statement
+        if file_type == "pdf" and settings.BILL_SPLIT_ENABLED:
+            split = await self._split_and_analyze(file_path, file_name, patient_id, organization_id)
+            if split is not None:
+                return split
 
-        # 2. Create bill record
+        # 3. Create bill record
         bill = self.bill_repo.create(
             patient_id=patient_id,
             file_path=file_path,
             file_name=file_name,
             file_type=file_type,
             organization_id=organization_id,
+            file_hash=file_hash,
         )
 
-        # 3. Create analysis job record
+        # 4. Create analysis job record
         job = self.job_repo.create(bill_id=bill.id)
 
-        # 4. Run analysis synchronously (same DB session, same thread)
+        # 5. Run analysis synchronously (same DB session, same thread)
         print(f"[BillService] Running analysis for bill {bill.id}...", flush=True)
         try:
             analysis_service = AnalysisService(self.db)
@@ -50,9 +97,76 @@ class BillService:
             traceback.print_exc()
             # analyze_bill already marks bill as FAILED internally
 
-        # 5. Refresh to get latest state
+        # 6. Refresh to get latest state
         self.db.refresh(bill)
-        return {"bill": bill, "job_id": job.id}
+        return {"bill": bill, "job_id": job.id, "bills": [bill]}
+
+    async def _split_and_analyze(
+        self,
+        file_key: str,
+        file_name: str,
+        patient_id: int,
+        organization_id: Optional[int],
+    ) -> Optional[dict]:
+        """
+        Split a multi-statement PDF into one Bill + AnalysisJob per statement
+        and queue their analyses on the analysis pool; returns once the bills
+        exist, and clients poll each bill's status. Returns None (the caller
+        handles the file as one bill) when the PDF holds a single statement or
+        splitting fails.
+        """
+        from app.utils.bill_splitter import split_statements, write_segments
+
+        storage = get_storage_adapter()
+        work_dir = Path(tempfile.mkdtemp(prefix=".split-", dir=settings.UPLOAD_DIR))
+        keys: List[str] = []
+        try:
+            local_path = await run_in_threadpool(storage.get_local_path, file_key)
+            segments = await run_in_threadpool(split_statements, local_path)
+            if len(segments) < 2:
+                return None
+            written = await run_in_threadpool(write_segments, local_path, segments, work_dir)
+            for segment_path, _ in written:
+                keys.append(await run_in_threadpool(storage.store, segment_path, Path(segment_path).name, True))
+        except Exception as e:
+            print(f"[BillService] Statement split failed, analyzing as one bill: {e}", flush=True)
+            for key in keys:
+                try:
+                    await run_in_threadpool(storage.delete, key)
+                except Exception:
+                    pass
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        print(
+            f"[BillService] {file_name}: {len(segments)} statements "
+            f"({', '.join(f'p{s.pages[0] + 1}-{s.pages[-1] + 1}' for s in segments)})",
+            flush=True,
+        )
+        stem, ext = os.path.splitext(file_name)
+        bills, jobs = [], []
+        for n, (key, (_, segment_hash)) in enumerate(zip(keys, written), 1):
+            bill = self.bill_repo.create(
+                patient_id=patient_id,
+                file_path=key,
+                file_name=f"{stem} ({n} of {len(segments)}){ext}",
+                file_type="pdf",
+                organization_id=organization_id,
+                file_hash=segment_hash,
+            )
+            bills.append(bill)
+            jobs.append(self.job_repo.create(bill_id=bill.id))
+        try:
+            await run_in_threadpool(storage.delete, file_key)   # every page now lives in a segment file
+        except Exception as e:
+            print(f"[BillService] Could not delete combined upload {file_key}: {e}", flush=True)
+
+        pool = _get_analysis_pool()
+        for bill in bills:
+            pool.submit(_analyze_in_own_session, bill.id)
+        print(f"[BillService] Queued analysis for bills {', '.join(str(b.id) for b in bills)}", flush=True)
+        return {"bill": bills[0], "job_id": jobs[0].id, "bills": bills}
 
     async def upload_bill(
         self,
@@ -4,6 +4,7 @@ BioBERT-based medical Named Entity Recognition.
 Runs locally on the server (no API keys). Extracts medical entities,
 procedure codes, drug names, conditions, and provider info from bill text.
 Uses a singleton to load the model once and reuse across requests.
+Results are memoized per normalized text (see ner_cache).
 """
 
 import re
@@ -35,7 +36,7 @@ class ExtractionResult:
 # ── Regex patterns for deterministic code extraction ───────────────
 
 CPT_PATTERN = re.compile(r"\b(\d{5})\b")
-ICD10_PATTERN = re.compile(r"\b([A-TV-Z]\d{2}(?:\.\d{1,4})?)\b")
+ICD10_PATTERN = re.compile(r"\b([A-TV-Z]\d{2}(?:\.[0-9A-Z]{1,4})?)\b")
 HCPCS_PATTERN = re.compile(r"\b([A-V]\d{4})\b")
 NPI_PATTERN = re.compile(r"\b(\d{10})\b")
 MODIFIER_PATTERN = re.compile(r"\b(\d{2}|[A-Z]{2})\b")
@@ -66,6 +67,8 @@ class _BioBERTSingleton:
             if self._loaded:
                 return
             try:
+                from app.services.inference_scheduler import configure_torch_threads
+                configure_torch_threads()
                 from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline as hf_pipeline
                 print(f"[BioBERT] Loading model {settings.BIOBERT_MODEL}...", flush=True)
                 tokenizer = AutoTokenizer.from_pretrained(settings.BIOBERT_MODEL)
@@ -89,18 +92,36 @@ class BioBERTService:
     """Extract medical entities from bill text using BioBERT + regex."""
 
     def extract_entities(self, text: str) -> ExtractionResult:
+        from app.services.ner_cache import get_ner_cache, make_key, normalize_text
+
+        singleton = _BioBERTSingleton.get()
+        singleton.load()
+
+        # Regex-only results must not be served once the model is available
+        model_id = settings.BIOBERT_MODEL if singleton.pipeline is not None else "regex-only"
+        cache = get_ner_cache()
+        key = None
+        if cache is not None:
+            # Normalized text only keys the cache; extraction runs on the text as given.
+            # A hit from a differently spaced copy has the same entities, with its offsets.
+            key = make_key(model_id, normalize_text(text))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
         result = ExtractionResult()
 
         # Always run deterministic regex extraction
         self._extract_codes(text, result)
 
         # Run BioBERT NER if available
-        singleton = _BioBERTSingleton.get()
-        singleton.load()
-
+        ner_ok = True
         if singleton.pipeline is not None:
-            self._extract_with_biobert(text, result, singleton.pipeline)
+            ner_ok = self._extract_with_biobert(text, result, singleton.pipeline)
 
+        # Don't memoize a result whose NER pass failed; the next call should retry
+        if cache is not None and ner_ok:
+            cache.put(key, result)
         return result
 
     def _extract_codes(self, text: str, result: ExtractionResult):
@@ -147,12 +168,17 @@ class BioBERTService:
         result.hcpcs_codes = sorted(set(result.hcpcs_codes))
         result.npi_numbers = sorted(set(result.npi_numbers))
 
-    def _extract_with_biobert(self, text: str, result: ExtractionResult, pipeline):
-        """Run BioBERT NER pipeline for medical entity extraction."""
+    def _extract_with_biobert(self, text: str, result: ExtractionResult, pipeline) -> bool:
+        """Run BioBERT NER pipeline for medical entity extraction. Returns False on failure."""
+        from app.services.inference_scheduler import get_inference_scheduler
+
         try:
             # Truncate to avoid OOM on very long bills
             truncated = text[:4096]
-            ner_results = pipeline(truncated)
+            with get_inference_scheduler().slot() as wait:
+                ner_results = pipeline(truncated)
+            if wait > 1.0:
+                print(f"[BioBERT] Waited {wait:.2f}s for an inference slot", flush=True)
             for ent in ner_results:
                 label = ent.get("entity_group", "MISC")
                 word = ent.get("word", "").strip()
@@ -165,8 +191,10 @@ class BioBERTService:
                     start=ent.get("start", 0), end=ent.get("end", 0),
                     score=score,
                 ))
+            return True
         except Exception as exc:
             print(f"[BioBERT] NER inference failed: {exc}", flush=True)
+            return False
 
     @staticmethod
     def _map_biobert_label(label: str) -> str:
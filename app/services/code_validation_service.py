@@ -3,26 +3,37 @@ Deterministic CPT/ICD code validation using PyCTAKES + rule-based checks.
 
 This is the accuracy backbone of the pipeline — no hallucination risk
 because all checks are rule-based lookups and pattern matching.
+
+Each check is a rule registered on ``code_rules`` (see rule_engine); the
+rule set evaluates them all in a single pass over the line items. Payer-
+specific rules can be added by registering more rules on ``code_rules``.
 """
 
 import re
 from dataclasses import dataclass, field
+from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 
+from app.core.config import settings
 from app.services.biobert_service import ExtractionResult
+from app.services.ctakes_pipeline import bill_clinical_text, ctakes_available, get_ctakes_pool
+from app.services.rule_engine import ParsedItem, RuleContext, RuleSet
 
 
 @dataclass
 class CodeIssue:
     code: str
     issue_type: str       # INVALID_CODE, EXPIRED_CODE, DESCRIPTION_MISMATCH,
-                          # MUTUALLY_EXCLUSIVE, MISSING_MODIFIER, UNBUNDLING
+                          # MUTUALLY_EXCLUSIVE, MISSING_MODIFIER, UNBUNDLING,
+                          # UNITS_EXCEEDED, NOT_BILLABLE, OVERCHARGE
     severity: str         # Low, Medium, High
     description: str
     confidence: float     # Always high for rule-based (0.85-0.95)
     estimated_savings: float = 0.0
     recommended_action: str = ""
     source: str = "PyCTAKES"
+    billed_amount: Optional[float] = None
+    expected_amount: Optional[float] = None
 
 
 @dataclass
@@ -67,6 +78,12 @@ MUTUALLY_EXCLUSIVE = [
     ("99222", "99223"),
 ]
 
+# CPT (5 digits) or HCPCS Level II (letter + 4 digits), as listed in the CPT/HCPCS index
+CPT_HCPCS_RE = re.compile(r"^(\d{5}|[A-V]\d{4})$")
+
+# Modifiers that mark a distinct procedural service, allowing an NCCI pair with indicator 1
+DISTINCT_SERVICE_MODIFIERS = {"59", "XE", "XS", "XP", "XU"}
+
 # Codes that commonly require modifiers
 MODIFIER_REQUIRED_PATTERNS = {
     # If E/M code on same day as procedure, needs modifier 25
@@ -78,200 +95,471 @@ MODIFIER_REQUIRED_PATTERNS = {
 }
 
 
+def bill_service_date(stated: Any, uploaded_at: Optional[datetime] = None) -> Optional[date]:
+    """
+    Date to check code status against: the date of service read from the
+    bill (YYYY-MM-DD or MM/DD/YYYY), else the upload date, else None (today).
+    """
+    if isinstance(stated, datetime):
+        return stated.date()
+    if isinstance(stated, date):
+        return stated
+    text = str(stated or "").strip()
+    for fmt, width in (("%Y-%m-%d", 10), ("%m/%d/%Y", 10)):
+        try:
+            return datetime.strptime(text[:width], fmt).date()
+        except ValueError:
+            continue
+    return uploaded_at.date() if uploaded_at is not None else None
+
+
+# ── Issue builders (shared with the bulk re-validation job) ─────
+
+def cpt_range_issue(code: str) -> CodeIssue:
+    return CodeIssue(
+        code=code,
+        issue_type="INVALID_CODE",
+        severity="High",
+        description=f"CPT code {code} does not fall within any recognized code range. "
+                    f"This may be an invalid or retired code.",
+        confidence=0.92,
+        recommended_action=f"Verify CPT code {code} against the current AMA CPT codebook. "
+                           f"If invalid, request a corrected bill with the proper code.",
+    )
+
+
+def cpt_status_issue(code: str, status: int, index) -> CodeIssue:
+    """Issue for a code the CPT index reports as EXPIRED, NOT_YET_EFFECTIVE or UNKNOWN."""
+    from app.codesets import cpt_index
+
+    if status == cpt_index.EXPIRED:
+        entry = index.lookup(code)
+        return CodeIssue(
+            code=code,
+            issue_type="EXPIRED_CODE",
+            severity="High",
+            description=f"CPT code {code} was terminated on {entry.terminated.isoformat()} "
+                        f"and is no longer valid for billing.",
+            confidence=0.95,
+            recommended_action=f"Ask the provider to rebill with the current replacement for "
+                               f"CPT {code}; claims with terminated codes are routinely denied.",
+        )
+    if status == cpt_index.NOT_YET_EFFECTIVE:
+        entry = index.lookup(code)
+        return CodeIssue(
+            code=code,
+            issue_type="INVALID_CODE",
+            severity="High",
+            description=f"CPT code {code} is not effective until {entry.effective.isoformat()}.",
+            confidence=0.93,
+            recommended_action=f"Verify the date of service and the code used for CPT {code}.",
+        )
+    return CodeIssue(
+        code=code,
+        issue_type="INVALID_CODE",
+        severity="High",
+        description=f"CPT code {code} does not exist in the current CPT/HCPCS code set. "
+                    f"This may be an invalid or mistyped code.",
+        confidence=0.95,
+        recommended_action=f"Verify CPT code {code} against the current AMA CPT codebook. "
+                           f"If invalid, request a corrected bill with the proper code.",
+    )
+
+
+def ncci_issue(column1: str, column2: str, modifier_indicator: int, column2_billed: float) -> CodeIssue:
+    from app.codesets.ncci import MODIFIER_ALLOWED
+
+    savings = round(column2_billed, 2)
+    if modifier_indicator == MODIFIER_ALLOWED:
+        return CodeIssue(
+            code=f"{column1}, {column2}",
+            issue_type="MISSING_MODIFIER",
+            severity="Medium",
+            description=f"NCCI edits bundle CPT {column2} into {column1}. Both may only "
+                        f"be billed when a distinct-service modifier (59 or XE/XS/XP/XU) is "
+                        f"documented, and none was found on the {column2} line.",
+            confidence=0.88,
+            estimated_savings=savings,
+            recommended_action=f"Ask the provider whether {column2} was a separate, distinct "
+                               f"service. If not, request removal of the {column2} charge.",
+        )
+    return CodeIssue(
+        code=f"{column1}, {column2}",
+        issue_type="UNBUNDLING",
+        severity="High",
+        description=f"Under NCCI procedure-to-procedure edits, CPT {column2} is a "
+                    f"component of {column1} and cannot be billed separately, even "
+                    f"with a modifier.",
+        confidence=0.95,
+        estimated_savings=savings,
+        recommended_action=f"Request removal of the {column2} charge; it is included "
+                           f"in the payment for {column1}.",
+    )
+
+
+def duplicate_code_issue(code: str, count: int) -> CodeIssue:
+    return CodeIssue(
+        code=code,
+        issue_type="UNBUNDLING",
+        severity="High",
+        description=f"CPT code {code} appears {count} times on this bill. "
+                    f"Unless each instance represents a distinct service with "
+                    f"proper documentation, this may be a duplicate charge.",
+        confidence=0.90,
+        estimated_savings=100.0,
+        recommended_action=f"Verify whether {code} was legitimately performed "
+                           f"{count} times. If duplicate, request removal.",
+    )
+
+
+def mue_issue(code: str, total_units: float, max_units: int, billed: float) -> CodeIssue:
+    excess = total_units - max_units
+    unit_price = billed / total_units if total_units else 0.0
+    return CodeIssue(
+        code=code,
+        issue_type="UNITS_EXCEEDED",
+        severity="High",
+        description=f"CPT {code} was billed for {total_units:g} units, but the Medicare "
+                    f"Medically Unlikely Edit allows at most {max_units} per day. "
+                    f"{excess:g} unit(s) at ${unit_price:,.2f} each exceed the limit.",
+        confidence=0.9,
+        estimated_savings=round(excess * unit_price, 2),
+        recommended_action=f"Ask the provider to document why {total_units:g} units of {code} "
+                           f"were medically necessary, or to remove the {excess:g} excess unit(s).",
+    )
+
+
+def overcharge_issue(
+    code: str, qty: float, billed: float, reference: float, multiple: float,
+) -> Optional[CodeIssue]:
+    """
+    OVERCHARGE issue when ``billed`` exceeds ``multiple`` x the reference price,
+    else None. ``expected_amount`` is the reference price for the units billed;
+    the savings estimate only counts the amount above the threshold.
+    """
+    expected = round(reference * qty, 2)
+    threshold = round(reference * multiple * qty, 2)
+    if billed <= threshold:
+        return None
+    return CodeIssue(
+        code=code,
+        issue_type="OVERCHARGE",
+        severity="High" if billed > 2 * threshold else "Medium",
+        description=f"CPT {code} was billed at ${billed:,.2f} for {qty:g} unit(s). The Medicare "
+                    f"fee schedule rate is ${reference:,.2f} per unit (${expected:,.2f} in total), so "
+                    f"this charge is {billed / (reference * qty):.1f}x the reference price. More than "
+                    f"{multiple:g}x (${threshold:,.2f}) is considered excessive; the estimated "
+                    f"savings count only the ${billed - threshold:,.2f} above that.",
+        confidence=0.85,
+        estimated_savings=round(billed - threshold, 2),
+        recommended_action=f"Ask the provider for a price adjustment on {code}, citing the Medicare "
+                           f"rate of ${reference:,.2f}. Ask about self-pay or financial-assistance "
+                           f"pricing if you are uninsured.",
+        billed_amount=round(billed, 2),
+        expected_amount=expected,
+    )
+
+
+# ── Validation rules ───────────────────────────────────────────
+
+code_rules = RuleSet("code_validation")
+
+
+@code_rules.bill_rule("cpt_validity", where=lambda ctx: bool(ctx.codes))
+def check_code_validity(ctx: RuleContext) -> List[CodeIssue]:
+    """Check CPT codes against the installed code list, else the built-in ranges."""
+    from app.codesets import get_cpt_index
+
+    index = get_cpt_index()
+    if index is not None:
+        return _check_code_validity_indexed(ctx, index)
+
+    issues = []
+    for code in ctx.codes:
+        if not re.match(r"^\d{5}$", code):
+            continue
+        num = int(code)
+        valid = False
+        for (lo, hi) in CPT_RANGES:
+            if lo <= num <= hi:
+                valid = True
+                break
+        if valid:
+            ctx.result.validated_codes.append(code)
+        else:
+            ctx.result.invalid_codes.append(code)
+            issues.append(cpt_range_issue(code))
+    return issues
+
+
+def _check_code_validity_indexed(ctx: RuleContext, index) -> List[CodeIssue]:
+    """Exact lookup against the full CPT/HCPCS list, as of the bill's date of service."""
+    from app.codesets import cpt_index
+
+    issues = []
+    for code in ctx.codes:
+        if not CPT_HCPCS_RE.match(code):
+            continue
+        status = index.status(code, ctx.service_date)
+        if status == cpt_index.VALID:
+            ctx.result.validated_codes.append(code)
+            continue
+
+        ctx.result.invalid_codes.append(code)
+        issues.append(cpt_status_issue(code, status, index))
+    return issues
+
+
+@code_rules.item_rule("em_description_mismatch", where=lambda item: item.code in EM_LEVELS)
+def check_description_mismatch(ctx: RuleContext, item: ParsedItem) -> Optional[CodeIssue]:
+    """Check if an E/M code level matches its description."""
+    code, desc = item.code, item.description_lower
+    level_name, complexity = EM_LEVELS[code]
+
+    # Check if description mentions a DIFFERENT level
+    for other_code, (other_level, _) in EM_LEVELS.items():
+        if other_code == code:
+            continue
+        if other_level.lower() in desc and level_name.lower() not in desc:
+            return CodeIssue(
+                code=code,
+                issue_type="DESCRIPTION_MISMATCH",
+                severity="High",
+                description=f"CPT {code} ({level_name}, {complexity}) was billed, but the "
+                            f"description mentions '{other_level}'. This suggests possible "
+                            f"upcoding or a coding error.",
+                confidence=0.88,
+                estimated_savings=50.0,
+                recommended_action=f"Compare the documentation to determine whether {code} "
+                                   f"or {other_code} is the correct level of service.",
+            )
+    return None
+
+
+@code_rules.bill_rule("mutually_exclusive", where=lambda ctx: len(ctx.code_set) > 1)
+def check_mutually_exclusive(ctx: RuleContext) -> List[CodeIssue]:
+    """Check for mutually exclusive code pairs."""
+    issues = []
+    checked = set()
+    for a, b in MUTUALLY_EXCLUSIVE:
+        pair = (min(a, b), max(a, b))
+        if pair in checked:
+            continue
+        if a in ctx.code_set and b in ctx.code_set:
+            checked.add(pair)
+            issues.append(CodeIssue(
+                code=f"{a}, {b}",
+                issue_type="MUTUALLY_EXCLUSIVE",
+                severity="High",
+                description=f"CPT codes {a} and {b} are mutually exclusive and should not "
+                            f"both appear on the same claim. Only one level of E/M service "
+                            f"can be billed per provider per date of service.",
+                confidence=0.95,
+                estimated_savings=100.0,
+                recommended_action=f"Remove one of the codes ({a} or {b}). The provider should "
+                                   f"bill only the code that matches the documented level of service.",
+            ))
+    return issues
+
+
+@code_rules.bill_rule("ncci_ptp_edits", where=lambda ctx: len(ctx.code_set) > 1)
+def check_ncci_edits(ctx: RuleContext) -> List[CodeIssue]:
+    """Check every code pair against the NCCI PTP table in one vectorized lookup."""
+    from app.codesets import get_ncci_table
+    from app.codesets.ncci import MODIFIER_ALLOWED
+
+    table = get_ncci_table()
+    if table is None:
+        return []
+    edits = table.find_edits(ctx.codes)
+    if not edits:
+        return []
+
+    already_flagged = {
+        tuple(sorted(i.code.split(", "))) for i in ctx.issues_by_rule.get("mutually_exclusive", [])
+    }
+    issues = []
+    for edit in edits:
+        if tuple(sorted((edit.column1, edit.column2))) in already_flagged:
+            continue
+        # The modifier belongs on the column 2 line; a -59 elsewhere on the bill does not count
+        if (edit.modifier_indicator == MODIFIER_ALLOWED
+                and ctx.modifiers_by_code.get(edit.column2, set()) & DISTINCT_SERVICE_MODIFIERS):
+            continue
+        issues.append(ncci_issue(edit.column1, edit.column2, edit.modifier_indicator,
+                                 ctx.billed_by_code.get(edit.column2, 0.0)))
+    return issues
+
+
+@code_rules.bill_rule("em_with_procedure_modifier_25", where=lambda ctx: len(ctx.code_set) > 1)
+def check_modifier_requirements(ctx: RuleContext) -> Optional[CodeIssue]:
+    """Check if procedures billed same-day as E/M are missing modifier 25."""
+    em_codes = [c for c in ctx.codes if c.isdigit() and 99201 <= int(c) <= 99215]
+    proc_codes = [c for c in ctx.codes if c.isdigit() and 10000 <= int(c) <= 69999]
+    if not (em_codes and proc_codes):
+        return None
+
+    # Modifier 25 on an E/M line (code, modifier field or description), or anywhere in the text
+    descriptions = ctx.descriptions_text
+    if any("25" in ctx.modifiers_by_code.get(c, ()) for c in em_codes):
+        return None
+    if "modifier 25" in descriptions or "-25" in descriptions:
+        return None
+    return CodeIssue(
+        code=em_codes[0],
+        issue_type="MISSING_MODIFIER",
+        severity="Medium",
+        description=f"E/M code {em_codes[0]} was billed on the same claim as procedure "
+                    f"code(s) {', '.join(proc_codes[:3])} without modifier 25. This is "
+                    f"a common denial trigger.",
+        confidence=0.87,
+        estimated_savings=75.0,
+        recommended_action="Add modifier 25 to the E/M code to indicate a separately "
+                           "identifiable evaluation and management service.",
+    )
+
+
+@code_rules.bill_rule("duplicate_codes", where=lambda ctx: bool(ctx.count_by_code))
+def check_duplicate_codes(ctx: RuleContext) -> List[CodeIssue]:
+    """Check for duplicate CPT codes across line items."""
+    issues = []
+    for code, count in ctx.count_by_code.items():
+        if count > 1:
+            issues.append(duplicate_code_issue(code, count))
+    return issues
+
+
+@code_rules.bill_rule("mue_units", where=lambda ctx: bool(ctx.units_by_code))
+def check_mue_units(ctx: RuleContext) -> List[CodeIssue]:
+    """Flag codes whose total units on the bill exceed the CMS Medically Unlikely Edit."""
+    from app.codesets import get_mue_table
+
+    table = get_mue_table()
+    if table is None:
+        return []
+
+    issues = []
+    for code, (max_units, _indicator) in table.limits(ctx.units_by_code).items():
+        total_units = ctx.units_by_code[code]
+        if total_units <= max_units:
+            continue
+        issues.append(mue_issue(code, total_units, max_units, ctx.billed_by_code[code]))
+    return issues
+
+
+@code_rules.bill_rule("fee_schedule_overcharge", where=lambda ctx: bool(ctx.billed_by_code))
+def check_fee_schedule(ctx: RuleContext) -> List[CodeIssue]:
+    """Price every line item against the fee schedule and flag charges far above it."""
+    from app.codesets import get_fee_schedule
+
+    schedule = get_fee_schedule()
+    if schedule is None:
+        return []
+
+    items = [item for item in ctx.items if len(item.code) == 5 and item.billed > 0]
+    if not items:
+        return []
+
+    references = schedule.reference_prices(
+        [item.code for item in items],
+        locality=settings.FEE_SCHEDULE_LOCALITY,
+        facility=settings.FEE_SCHEDULE_FACILITY,
+    )
+    multiple = settings.FEE_SCHEDULE_OVERCHARGE_MULTIPLE
+    issues = []
+    for item, reference in zip(items, references.tolist()):
+        if reference != reference or reference <= 0:  # NaN: no reference price
+            continue
+        issue = overcharge_issue(item.code, item.quantity, item.billed, reference, multiple)
+        if issue is not None:
+            issues.append(issue)
+    return issues
+
+
+@code_rules.bill_rule("icd_validity", where=lambda ctx: bool(getattr(ctx.entities, "icd_codes", None)))
+def check_icd_validity(ctx: RuleContext) -> List[CodeIssue]:
+    """ICD-10 format validation, plus code-set membership when the ICD-10-CM index is installed."""
+    from app.codesets import get_icd10_index
+    from app.codesets import icd10
+
+    index = get_icd10_index()
+    issues = []
+    for code in ctx.entities.icd_codes:
+        # Up to four characters after the dot: S00.00XA (7th-character extensions)
+        if not re.match(r"^[A-TV-Z]\d{2}(\.[0-9A-Z]{1,4})?$", code):
+            issues.append(CodeIssue(
+                code=code,
+                issue_type="INVALID_CODE",
+                severity="Medium",
+                description=f"ICD-10 code '{code}' does not match the expected format. "
+                            f"Valid ICD-10 codes start with a letter (A-T, V-Z) followed by digits.",
+                confidence=0.93,
+                recommended_action=f"Verify the diagnosis code '{code}' is correct and properly formatted.",
+            ))
+            continue
+        if index is None:
+            continue
+
+        status = index.status(code)
+        if status == icd10.NOT_BILLABLE:
+            issues.append(CodeIssue(
+                code=code,
+                issue_type="NOT_BILLABLE",
+                severity="Medium",
+                description=f"ICD-10-CM code '{code}' is a category, not a billable diagnosis code. "
+                            f"Claims need a more specific code, so this line is at risk of denial.",
+                confidence=0.93,
+                recommended_action=f"Ask the provider to resubmit with the fully specified diagnosis "
+                                   f"code under '{code}'.",
+            ))
+        elif status == icd10.UNKNOWN:
+            issues.append(CodeIssue(
+                code=code,
+                issue_type="INVALID_CODE",
+                severity="Medium",
+                description=f"ICD-10 code '{code}' is well formed but does not exist in the "
+                            f"current ICD-10-CM code set.",
+                confidence=0.93,
+                recommended_action=f"Verify the diagnosis code '{code}' against the current ICD-10-CM "
+                                   f"code set and request a corrected bill if it is wrong.",
+            ))
+    return issues
+
+
 class CodeValidationService:
     """Deterministic CPT/ICD code validation."""
 
     def __init__(self):
-        self._ctakes_available = False
-        try:
-            import pyctakes  # noqa: F401
-            self._ctakes_available = True
-        except ImportError:
-            print("[CodeValidation] pyctakes not installed, using built-in rules only", flush=True)
+        self._ctakes_available = ctakes_available()
 
     def validate(
         self,
         gpt_result: Dict[str, Any],
         entities: ExtractionResult,
+        service_date: Optional[date] = None,
     ) -> ValidationResult:
         """
-        Validate codes found by GPT and BioBERT against known rules.
+        Validate codes found by GPT and BioBERT against known rules. Code
+        status (terminated, not yet effective) is checked as of
+        ``service_date`` (see bill_service_date), default today.
 
         Returns deterministic, high-confidence issues.
         """
         result = ValidationResult()
 
-        # Collect all codes from GPT line items and BioBERT extraction
-        gpt_codes = self._extract_gpt_codes(gpt_result)
-        all_codes = sorted(set(gpt_codes + entities.cpt_codes + entities.hcpcs_codes))
-
-        # Run each validation check
-        self._check_code_validity(all_codes, result)
-        self._check_description_mismatches(gpt_result, result)
-        self._check_mutually_exclusive(all_codes, result)
-        self._check_modifier_requirements(all_codes, gpt_result, result)
-        self._check_duplicate_codes(gpt_result, result)
-        self._check_icd_validity(entities.icd_codes, result)
+        # All rules in one pass over the line items (codes from GPT + BioBERT)
+        ctx = RuleContext(gpt_result=gpt_result, entities=entities, result=result, service_date=service_date)
+        result.issues.extend(code_rules.run(ctx))
 
         if self._ctakes_available:
             self._run_ctakes_validation(gpt_result, entities, result)
 
         return result
 
-    def _extract_gpt_codes(self, gpt_result: Dict[str, Any]) -> List[str]:
-        """Pull CPT/HCPCS codes from GPT's line items."""
-        codes = []
-        for item in gpt_result.get("line_items", []):
-            code = str(item.get("code", "")).strip()
-            if code and code != "SUMMARY" and re.match(r"^\d{5}$", code):
-                codes.append(code)
-        return codes
-
-    def _check_code_validity(self, codes: List[str], result: ValidationResult):
-        """Check if CPT codes fall within valid ranges."""
-        for code in codes:
-            if not re.match(r"^\d{5}$", code):
-                continue
-            num = int(code)
-            valid = False
-            for (lo, hi) in CPT_RANGES:
-                if lo <= num <= hi:
-                    valid = True
-                    break
-            if valid:
-                result.validated_codes.append(code)
-            else:
-                result.invalid_codes.append(code)
-                result.issues.append(CodeIssue(
-                    code=code,
-                    issue_type="INVALID_CODE",
-                    severity="High",
-                    description=f"CPT code {code} does not fall within any recognized code range. "
-                                f"This may be an invalid or retired code.",
-                    confidence=0.92,
-                    recommended_action=f"Verify CPT code {code} against the current AMA CPT codebook. "
-                                       f"If invalid, request a corrected bill with the proper code.",
-                ))
-
-    def _check_description_mismatches(self, gpt_result: Dict[str, Any], result: ValidationResult):
-        """Check if E/M code levels match their descriptions."""
-        for item in gpt_result.get("line_items", []):
-            code = str(item.get("code", "")).strip()
-            desc = str(item.get("description", "")).lower()
-
-            if code not in EM_LEVELS:
-                continue
-
-            level_name, complexity = EM_LEVELS[code]
-
-            # Check if description mentions a DIFFERENT level
-            for other_code, (other_level, _) in EM_LEVELS.items():
-                if other_code == code:
-                    continue
-                if other_level.lower() in desc and level_name.lower() not in desc:
-                    result.issues.append(CodeIssue(
-                        code=code,
-                        issue_type="DESCRIPTION_MISMATCH",
-                        severity="High",
-                        description=f"CPT {code} ({level_name}, {complexity}) was billed, but the "
-                                    f"description mentions '{other_level}'. This suggests possible "
-                                    f"upcoding or a coding error.",
-                        confidence=0.88,
-                        estimated_savings=50.0,
-                        recommended_action=f"Compare the documentation to determine whether {code} "
-                                           f"or {other_code} is the correct level of service.",
-                    ))
-                    break
-
-    def _check_mutually_exclusive(self, codes: List[str], result: ValidationResult):
-        """Check for mutually exclusive code pairs."""
-        code_set = set(codes)
-        checked = set()
-        for a, b in MUTUALLY_EXCLUSIVE:
-            pair = (min(a, b), max(a, b))
-            if pair in checked:
-                continue
-            if a in code_set and b in code_set:
-                checked.add(pair)
-                result.issues.append(CodeIssue(
-                    code=f"{a}, {b}",
-                    issue_type="MUTUALLY_EXCLUSIVE",
-                    severity="High",
-                    description=f"CPT codes {a} and {b} are mutually exclusive and should not "
-                                f"both appear on the same claim. Only one level of E/M service "
-                                f"can be billed per provider per date of service.",
-                    confidence=0.95,
-                    estimated_savings=100.0,
-                    recommended_action=f"Remove one of the codes ({a} or {b}). The provider should "
-                                       f"bill only the code that matches the documented level of service.",
-                ))
-
-    def _check_modifier_requirements(
-        self, codes: List[str], gpt_result: Dict[str, Any], result: ValidationResult,
-    ):
-        """Check if procedures billed same-day as E/M are missing modifier 25."""
-        code_set = set(codes)
-        em_codes = [c for c in code_set if c.isdigit() and 99201 <= int(c) <= 99215]
-        proc_codes = [c for c in code_set if c.isdigit() and 10000 <= int(c) <= 69999]
-
-        if em_codes and proc_codes:
-            # Check if any line item description mentions modifier 25
-            descriptions = " ".join(
-                str(item.get("description", ""))
-                for item in gpt_result.get("line_items", [])
-            ).lower()
-
-            if "modifier 25" not in descriptions and "-25" not in descriptions:
-                result.issues.append(CodeIssue(
-                    code=em_codes[0],
-                    issue_type="MISSING_MODIFIER",
-                    severity="Medium",
-                    description=f"E/M code {em_codes[0]} was billed on the same claim as procedure "
-                                f"code(s) {', '.join(proc_codes[:3])} without modifier 25. This is "
-                                f"a common denial trigger.",
-                    confidence=0.87,
-                    estimated_savings=75.0,
-                    recommended_action="Add modifier 25 to the E/M code to indicate a separately "
-                                       "identifiable evaluation and management service.",
-                ))
-
-    def _check_duplicate_codes(self, gpt_result: Dict[str, Any], result: ValidationResult):
-        """Check for duplicate CPT codes across line items."""
-        seen: Dict[str, int] = {}
-        for item in gpt_result.get("line_items", []):
-            code = str(item.get("code", "")).strip()
-            if not code or code == "SUMMARY":
-                continue
-            seen[code] = seen.get(code, 0) + 1
-
-        for code, count in seen.items():
-            if count > 1:
-                result.issues.append(CodeIssue(
-                    code=code,
-                    issue_type="UNBUNDLING",
-                    severity="High",
-                    description=f"CPT code {code} appears {count} times on this bill. "
-                                f"Unless each instance represents a distinct service with "
-                                f"proper documentation, this may be a duplicate charge.",
-                    confidence=0.90,
-                    estimated_savings=100.0,
-                    recommended_action=f"Verify whether {code} was legitimately performed "
-                                       f"{count} times. If duplicate, request removal.",
-                ))
-
-    def _check_icd_validity(self, icd_codes: List[str], result: ValidationResult):
-        """Basic ICD-10 format validation."""
-        for code in icd_codes:
-            if not re.match(r"^[A-TV-Z]\d{2}(\.\d{1,4})?$", code):
-                result.issues.append(CodeIssue(
-                    code=code,
-                    issue_type="INVALID_CODE",
-                    severity="Medium",
-                    description=f"ICD-10 code '{code}' does not match the expected format. "
-                                f"Valid ICD-10 codes start with a letter (A-T, V-Z) followed by digits.",
-                    confidence=0.93,
-                    recommended_action=f"Verify the diagnosis code '{code}' is correct and properly formatted.",
-                ))
+    @staticmethod
+    def rule_stats() -> Dict[str, Dict[str, object]]:
+        """Per-rule call/hit counts and timings since process start."""
+        return code_rules.stats()
 
     def _run_ctakes_validation(
         self,
@@ -280,28 +568,19 @@ class CodeValidationService:
         result: ValidationResult,
     ):
         """Run PyCTAKES clinical NLP pipeline for additional UMLS-based validation."""
+        clinical_text = bill_clinical_text(gpt_result)
+        if not clinical_text:
+            return
         try:
-            from pyctakes import ClinicalPipeline
-            pipeline = ClinicalPipeline()
-
-            bill_text_parts = []
-            for item in gpt_result.get("line_items", []):
-                desc = item.get("description", "")
-                code = item.get("code", "")
-                if desc:
-                    bill_text_parts.append(f"{desc} ({code})" if code else desc)
-
-            if not bill_text_parts:
-                return
-
-            clinical_text = ". ".join(bill_text_parts)
-            ctakes_result = pipeline.process(clinical_text)
-
-            for annotation in getattr(ctakes_result, "annotations", []):
-                cui = getattr(annotation, "cui", None)
-                preferred = getattr(annotation, "preferred_text", "")
-                if cui and preferred:
-                    result.validated_codes.append(f"UMLS:{cui}")
-
+            result.validated_codes.extend(get_ctakes_pool().process(clinical_text))
         except Exception as exc:
             print(f"[CodeValidation] PyCTAKES processing failed: {exc}", flush=True)
+
+    def ctakes_codes_batch(self, gpt_results: List[Dict[str, Any]]) -> List[List[str]]:
+        """
+        UMLS concept codes for the line items of many bills in one pipeline
+        checkout (bulk re-validation). Empty lists when pyctakes is missing.
+        """
+        if not self._ctakes_available:
+            return [[] for _ in gpt_results]
+        return get_ctakes_pool().process_many([bill_clinical_text(r) for r in gpt_results])
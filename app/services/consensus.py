@@ -8,12 +8,174 @@ Merges three sources:
 
 Adjusts confidence scores based on cross-model agreement and tags each
 finding with model_agreement / validated_by metadata.
+
+GPT and PyCTAKES issues are matched through an ``IssueMatcher`` built once
+per merge: every issue's normalized codes, issue-type hints and description
+tokens are computed up front and indexed by code and type, so each lookup
+only touches issues that share a code (or a type, for issues without codes).
+Near-duplicates that survive matching are collapsed by finding_dedup.
 """
 
-from typing import Any, Dict, List, Optional
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
 
+from app.core.config import settings
 from app.services.code_validation_service import CodeIssue, ValidationResult
 
+# CPT (incl. category II/III like 0001F), HCPCS (A0425) and dotted ICD-10 codes; never part
+# of an amount ("$12,345.00", "10250.75") or a longer number
+_CODE_RE = re.compile(r"(?<![$\d.,])\b(\d{4}[0-9A-Z]|[A-Z]\d{4}|[A-TV-Z]\d{2}\.\d{1,4})\b(?![.,]\d)")
+# Five bare digits in free text may be a ZIP code or account fragment; they only count as a
+# code shortly after a code word ("CPT 99213", "codes 99213 and 99214")
+_CODE_CONTEXT_RE = re.compile(r"\b(?:CPT|HCPCS|CODES?|PROCEDURES?)\b")
+_CODE_CONTEXT_CHARS = 40
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in is it its may of on or "
+    "that the this to was were which with".split()
+)
+
+# Phrases in a GPT description -> the PyCTAKES issue type it corresponds to
+_TYPE_KEYWORDS = (
+    ("duplicate", "UNBUNDLING"),
+    ("billed twice", "UNBUNDLING"),
+    ("unbundl", "UNBUNDLING"),
+    ("mutually exclusive", "MUTUALLY_EXCLUSIVE"),
+    ("modifier", "MISSING_MODIFIER"),
+    ("upcod", "DESCRIPTION_MISMATCH"),
+    ("mismatch", "DESCRIPTION_MISMATCH"),
+    ("overcharg", "OVERCHARGE"),
+    ("typical range", "OVERCHARGE"),
+    ("medically unlikely", "UNITS_EXCEEDED"),
+    ("units", "UNITS_EXCEEDED"),
+    ("invalid", "INVALID_CODE"),
+    ("does not exist", "INVALID_CODE"),
+    ("terminated", "EXPIRED_CODE"),
+    ("expired", "EXPIRED_CODE"),
+    ("billable", "NOT_BILLABLE"),
+)
+
+
+@dataclass(frozen=True)
+class _IssueKey:
+    codes: FrozenSet[str]
+    types: FrozenSet[str]
+    tokens: FrozenSet[str]
+
+
+def _tokens(text: str) -> FrozenSet[str]:
+    return frozenset(t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS)
+
+
+def token_set_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Shared tokens over the smaller token set (1.0 when one contains the other)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def _text_codes(text: str) -> List[str]:
+    codes = []
+    for m in _CODE_RE.finditer(text):
+        code = m.group(1)
+        if code.isdigit() and not _CODE_CONTEXT_RE.search(text, max(0, m.start() - _CODE_CONTEXT_CHARS), m.start()):
+            continue
+        codes.append(code)
+    return codes
+
+
+def issue_codes(issue: Dict) -> FrozenSet[str]:
+    """
+    Normalized billing codes named in a detected issue's affected items or
+    description. Affected items list codes, so any code-shaped token there
+    counts; in the description a bare five-digit number needs a code word
+    before it.
+    """
+    description = str(issue.get("description", "") or "").upper()
+    affected = " ".join(str(a) for a in issue.get("affected_items", []) or []).upper()
+    return frozenset(_CODE_RE.findall(affected)) | frozenset(_text_codes(description))
+
+
+def _gpt_key(issue: Dict) -> _IssueKey:
+    description = str(issue.get("description", "") or "")
+    lower = description.lower()
+    return _IssueKey(
+        codes=issue_codes(issue),
+        types=frozenset(t for keyword, t in _TYPE_KEYWORDS if keyword in lower),
+        tokens=_tokens(description),
+    )
+
+
+def _code_issue_key(ci: CodeIssue) -> _IssueKey:
+    return _IssueKey(
+        codes=frozenset(c.strip().upper() for c in ci.code.split(",") if c.strip()),
+        types=frozenset((ci.issue_type,)),
+        tokens=_tokens(ci.description),
+    )
+
+
+class IssueMatcher:
+    """
+    Matches GPT issues against PyCTAKES code issues.
+
+    - A GPT issue is supported by PyCTAKES when they name a common code or,
+      for GPT issues without codes, when a code issue of a type the GPT
+      description hints at is similar enough (token-set similarity).
+    - A code issue duplicates a GPT issue when the GPT issue names all of
+      its codes and hints at the same issue type (or, when the GPT wording
+      hints at no type, is similar enough).
+
+    Decisions depend only on the inputs, never on dict or set iteration order.
+    """
+
+    def __init__(self, gpt_issues: List[Dict], code_issues: List[CodeIssue], threshold: Optional[float] = None):
+        self.threshold = settings.CONSENSUS_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.gpt_keys = [_gpt_key(issue) for issue in gpt_issues]
+        self.code_keys = [_code_issue_key(ci) for ci in code_issues]
+
+        self._code_issues_by_code: Dict[str, List[int]] = {}
+        self._code_issues_by_type: Dict[str, List[int]] = {}
+        for j, key in enumerate(self.code_keys):
+            for code in key.codes:
+                self._code_issues_by_code.setdefault(code, []).append(j)
+            for t in key.types:
+                self._code_issues_by_type.setdefault(t, []).append(j)
+
+        self._gpt_by_code: Dict[str, List[int]] = {}
+        for i, key in enumerate(self.gpt_keys):
+            for code in key.codes:
+                self._gpt_by_code.setdefault(code, []).append(i)
+
+    def supported_by_code_issue(self, gpt_index: int) -> bool:
+        key = self.gpt_keys[gpt_index]
+        if key.codes:
+            return any(code in self._code_issues_by_code for code in key.codes)
+        for t in sorted(key.types):
+            for j in self._code_issues_by_type.get(t, []):
+                if token_set_similarity(key.tokens, self.code_keys[j].tokens) >= self.threshold:
+                    return True
+        return False
+
+    def duplicates_gpt(self, code_index: int) -> bool:
+        key = self.code_keys[code_index]
+        if not key.codes:
+            return False
+        candidates = None
+        for code in key.codes:
+            found = set(self._gpt_by_code.get(code, ()))
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return False
+        for i in sorted(candidates):
+            gpt = self.gpt_keys[i]
+            if gpt.types:
+                if key.types & gpt.types:
+                    return True
+            elif token_set_similarity(key.tokens, gpt.tokens) >= self.threshold:
+                return True
+        return False
+
 
 def _safe_list(d: Optional[Dict], key: str) -> List[Dict]:
     if d is None:
@@ -33,6 +195,7 @@ def merge_results(
     Mutates and returns ``gpt_result`` with enriched issues.
     """
     detected_issues: List[Dict] = gpt_result.get("detected_issues", [])
+    matcher = IssueMatcher(detected_issues, code_validation.issues) if code_validation else None
 
     # ── Index MedGemma validation by original_index ────────────
     gemma_by_idx: Dict[int, Dict] = {
@@ -47,7 +210,7 @@ def merge_results(
         agreeing: List[str] = ["GPT"]
 
         # MedGemma validation
-        gemma = gemma_by_idx.get(idx)
+        gemma = None if issue.get("stage3_skipped") else gemma_by_idx.get(idx)
         if gemma is not None:
             validated_by.append("MedGemma")
             if gemma.get("agrees", False):
@@ -57,12 +220,9 @@ def merge_results(
                 issue["clinical_note"] = note
 
         # Check if PyCTAKES found a matching code issue
-        if code_validation:
-            issue_code = _extract_code_from_issue(issue)
-            ctakes_match = _find_ctakes_match(issue_code, issue, code_validation)
-            if ctakes_match:
-                validated_by.append("PyCTAKES")
-                agreeing.append("PyCTAKES")
+        if matcher and matcher.supported_by_code_issue(idx):
+            validated_by.append("PyCTAKES")
+            agreeing.append("PyCTAKES")
 
         # Confidence adjustment
         total_v = len(validated_by)
@@ -83,19 +243,7 @@ def merge_results(
     # ── Append PyCTAKES-only issues (GPT missed) ──────────────
 
     if code_validation:
-        for ci in code_validation.issues:
-            if not _is_duplicate_of_gpt(ci, detected_issues):
-                detected_issues.append({
-                    "category": "Coding",
-                    "severity": ci.severity,
-                    "description": ci.description,
-                    "confidence": ci.confidence,
-                    "estimated_savings": ci.estimated_savings,
-                    "recommended_action": ci.recommended_action,
-                    "affected_items": [ci.code],
-                    "model_agreement": "1/1 models agree",
-                    "validated_by": "PyCTAKES",
-                })
+        detected_issues.extend(code_validation_issues(code_validation.issues, detected_issues, matcher))
 
     # ── Append MedGemma-only new issues ───────────────────────
 
@@ -106,45 +254,44 @@ def merge_results(
         ni["validated_by"] = "MedGemma"
         detected_issues.append(ni)
 
+    # ── Collapse the same problem reported by several models ──
+
+    if settings.FINDING_DEDUP_ENABLED:
+        from app.services.finding_dedup import dedup_findings
+        detected_issues, merged = dedup_findings(detected_issues)
+        if merged:
+            print(f"[Consensus] Merged {merged} near-duplicate findings", flush=True)
+
     gpt_result["detected_issues"] = detected_issues
     return gpt_result
 
 
-def _extract_code_from_issue(issue: Dict) -> str:
-    """Try to pull a CPT/HCPCS code from a GPT issue."""
-    affected = issue.get("affected_items", [])
-    if affected:
-        return str(affected[0])
-    desc = issue.get("description", "")
-    import re
-    match = re.search(r"\b(\d{5})\b", desc)
-    return match.group(1) if match else ""
-
-
-def _find_ctakes_match(code: str, issue: Dict, validation: ValidationResult) -> bool:
-    """Check if any PyCTAKES issue matches this GPT finding."""
-    issue_desc = issue.get("description", "").lower()
-    for ci in validation.issues:
-        if code and code in ci.code:
-            return True
-        if ci.issue_type == "UNBUNDLING" and "duplicate" in issue_desc:
-            return True
-        if ci.issue_type == "DESCRIPTION_MISMATCH" and "upcod" in issue_desc:
-            return True
-    return False
-
-
-def _is_duplicate_of_gpt(ci: CodeIssue, gpt_issues: List[Dict]) -> bool:
-    """Check if a PyCTAKES issue already exists in GPT findings."""
-    for issue in gpt_issues:
-        desc = issue.get("description", "").lower()
-        if ci.code in desc:
-            if ci.issue_type == "UNBUNDLING" and "duplicate" in desc:
-                return True
-            if ci.issue_type == "MUTUALLY_EXCLUSIVE" and "mutually exclusive" in desc:
-                return True
-            if ci.issue_type == "MISSING_MODIFIER" and "modifier" in desc:
-                return True
-            if ci.issue_type == "DESCRIPTION_MISMATCH" and ("upcode" in desc or "mismatch" in desc):
-                return True
-    return False
+def code_validation_issues(
+    code_issues: List[CodeIssue],
+    gpt_issues: List[Dict],
+    matcher: Optional[IssueMatcher] = None,
+) -> List[Dict]:
+    """PyCTAKES issues not already reported by GPT, as detected-issue dicts."""
+    if matcher is None:
+        matcher = IssueMatcher(gpt_issues, code_issues)
+    new_issues = []
+    for j, ci in enumerate(code_issues):
+        if matcher.duplicates_gpt(j):
+            continue
+        new_issue = {
+            "category": "Financial" if ci.issue_type == "OVERCHARGE" else "Coding",
+            "severity": ci.severity,
+            "description": ci.description,
+            "confidence": ci.confidence,
+            "estimated_savings": ci.estimated_savings,
+            "recommended_action": ci.recommended_action,
+            "affected_items": [ci.code],
+            "model_agreement": "1/1 models agree",
+            "validated_by": "PyCTAKES",
+        }
+        if ci.billed_amount is not None:
+            new_issue["billed_amount"] = ci.billed_amount
+        if ci.expected_amount is not None:
+            new_issue["expected_amount"] = ci.expected_amount
+        new_issues.append(new_issue)
+    return new_issues
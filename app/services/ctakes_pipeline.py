@@ -0,0 +1,183 @@
+"""
+Process-wide PyCTAKES pipelines.
+
+Building a ``pyctakes.ClinicalPipeline`` loads its dictionaries and models,
+which costs far more than processing one bill, so pipelines are created once
+per process and reused. ClinicalPipeline is not documented as thread-safe,
+so instead of sharing one instance behind a lock we keep a small pool
+(CTAKES_POOL_SIZE) and check an instance out per call. Callers that find
+the pool empty and full wait on a condition that is notified both when a
+pipeline is returned and when building one fails, so a failed build never
+strands a waiter. The pyctakes import probe also runs only once per process.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from app.core.config import settings
+
+_probe_lock = threading.Lock()
+_probed = False
+_available = False
+
+
+def ctakes_available() -> bool:
+    """Whether pyctakes can be imported (checked once per process)."""
+    global _probed, _available
+    if _probed:
+        return _available
+    with _probe_lock:
+        if not _probed:
+            try:
+                import pyctakes  # noqa: F401
+                _available = True
+            except ImportError:
+                print("[CodeValidation] pyctakes not installed, using built-in rules only", flush=True)
+            _probed = True
+    return _available
+
+
+def bill_clinical_text(gpt_result: Dict[str, Any]) -> str:
+    """Line-item descriptions (with their codes) joined into one clinical note."""
+    parts = []
+    for item in gpt_result.get("line_items", []) or []:
+        desc = item.get("description", "")
+        code = item.get("code", "")
+        if desc:
+            parts.append(f"{desc} ({code})" if code else desc)
+    return ". ".join(parts)
+
+
+def _umls_codes(ctakes_result) -> List[str]:
+    codes = []
+    for annotation in getattr(ctakes_result, "annotations", []):
+        cui = getattr(annotation, "cui", None)
+        preferred = getattr(annotation, "preferred_text", "")
+        if cui and preferred:
+            codes.append(f"UMLS:{cui}")
+    return codes
+
+
+class CTakesPool:
+    """A bounded pool of ClinicalPipeline instances, created on demand."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle: List[Any] = []          # LIFO: the most recently used pipeline is warmest
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._created = 0                   # built or being built
+        self._calls = 0
+        self._texts = 0
+        self._build_seconds = 0.0
+
+    def _new_pipeline(self):
+        from pyctakes import ClinicalPipeline
+
+        start = time.perf_counter()
+        pipeline = ClinicalPipeline()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._build_seconds += elapsed
+        print(f"[CodeValidation] PyCTAKES pipeline ready in {elapsed:.1f}s", flush=True)
+        return pipeline
+
+    def _checkout(self) -> Any:
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self._new_pipeline()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                # Let a waiter take the free slot and try building it
+                self._available.notify()
+            raise
+
+    def _checkin(self, instance: Any):
+        with self._available:
+            self._idle.append(instance)
+            self._available.notify()
+
+    @contextmanager
+    def pipeline(self) -> Iterator[Any]:
+        """Check out a pipeline for the duration of the block."""
+        instance = self._checkout()
+        try:
+            yield instance
+        finally:
+            self._checkin(instance)
+
+    def warm_up(self):
+        """Build the first pipeline ahead of the first bill."""
+        with self.pipeline():
+            pass
+
+    def process(self, text: str) -> List[str]:
+        """UMLS concept codes found in ``text``."""
+        return self.process_many([text])[0]
+
+    def process_many(self, texts: Sequence[str]) -> List[List[str]]:
+        """
+        UMLS concept codes for each text, in order, using one checked-out
+        pipeline for the whole batch. A text that fails yields an empty list.
+        """
+        results: List[List[str]] = []
+        with self.pipeline() as instance:
+            for text in texts:
+                if not text:
+                    results.append([])
+                    continue
+                try:
+                    results.append(_umls_codes(instance.process(text)))
+                except Exception as exc:
+                    print(f"[CodeValidation] PyCTAKES processing failed: {exc}", flush=True)
+                    results.append([])
+        with self._lock:
+            self._calls += 1
+            self._texts += len(texts)
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "pool_size": self.size,
+                "pipelines": self._created,
+                "idle": len(self._idle),
+                "calls": self._calls,
+                "texts": self._texts,
+                "build_seconds": round(self._build_seconds, 2),
+            }
+
+
+_pool: Optional[CTakesPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ctakes_pool() -> Optional[CTakesPool]:
+    """Process-wide pipeline pool, or None when pyctakes is not installed."""
+    global _pool
+    if not ctakes_available():
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CTakesPool(settings.CTAKES_POOL_SIZE)
+    return _pool
+
+
+def warm_up_ctakes():
+    """Build a pipeline now (called from startup) so no bill pays for it."""
+    pool = get_ctakes_pool()
+    if pool is None:
+        return
+    try:
+        pool.warm_up()
+    except Exception as exc:
+        print(f"[CodeValidation] PyCTAKES warm-up failed: {exc}", flush=True)
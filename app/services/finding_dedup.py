@@ -0,0 +1,182 @@
+"""
+Local semantic deduplication of merged findings.
+
+Claude, PyCTAKES and MedGemma often describe the same problem in different
+words, and the consensus merge keeps each as its own finding, which inflates
+total estimated savings. This stage runs after the merge, with no network
+calls:
+
+1. Each description becomes a TF-IDF vector of hashed word and character
+   n-grams. Digits are dropped, so amounts and codes don't count as shared
+   wording. Only the hash buckets that occur in the bill are kept, so the
+   matrix is small and dense.
+2. Pairwise cosine similarity is one matrix product.
+3. Pairs above FINDING_DEDUP_THRESHOLD are merged, most similar first, into
+   clusters with a union-find. When only one of the two names codes, the
+   pair needs FINDING_DEDUP_UNCODED_THRESHOLD instead. Two clusters are
+   never merged when both name codes and share none, so a code-less finding
+   cannot bridge findings about different codes. A cluster never holds two
+   findings from the same source. Repeats within one source, such as two
+   overcharged line items, are real.
+4. Each cluster keeps its first finding. It gets the union of ``validated_by``
+   sources and affected items, the highest severity and confidence, and the
+   maximum (not the sum) of the estimated savings.
+"""
+
+import re
+import zlib
+from typing import Dict, FrozenSet, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.consensus import issue_codes
+
+_N_FEATURES = 1 << 20
+_WORD_RE = re.compile(r"[a-z]+")
+_SOURCE_ORDER = ("GPT", "PyCTAKES", "MedGemma")
+_SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+_AGREEMENT_RE = re.compile(r"(\d+)\s*/\s*(\d+)")
+
+
+def _features(text: str) -> List[int]:
+    """Hashed word unigrams, word bigrams and in-word character 4-grams."""
+    words = _WORD_RE.findall(text.lower())
+    grams = list(words)
+    grams += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        grams += [padded[i:i + 4] for i in range(max(1, len(padded) - 3))]
+    return [zlib.crc32(g.encode()) % _N_FEATURES for g in grams]
+
+
+def tfidf_matrix(texts: List[str]) -> np.ndarray:
+    """L2-normalized TF-IDF rows over the hash buckets used by ``texts``."""
+    hashed = [_features(t) for t in texts]
+    buckets = np.unique(np.fromiter((h for row in hashed for h in row), dtype=np.int64))
+    matrix = np.zeros((len(texts), len(buckets)), dtype=np.float32)
+    for i, row in enumerate(hashed):
+        if row:
+            cols, counts = np.unique(np.searchsorted(buckets, row), return_counts=True)
+            matrix[i, cols] = 1.0 + np.log(counts)
+
+    df = (matrix > 0).sum(axis=0)
+    matrix *= (np.log((1.0 + len(texts)) / (1.0 + df)) + 1.0).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _sources(issue: Dict) -> List[str]:
+    sources = [s.strip() for s in str(issue.get("validated_by") or "GPT").split(",") if s.strip()]
+    return sources or ["GPT"]
+
+
+def _origin(issue: Dict) -> str:
+    """The model that reported the finding (first entry of validated_by)."""
+    return _sources(issue)[0]
+
+
+class _Clusters:
+    def __init__(self, origins: List[str], codes: List[FrozenSet[str]]):
+        self.parent = list(range(len(origins)))
+        self.origins = [{o} for o in origins]
+        self.codes = [set(c) for c in codes]
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        a, b = self.find(i), self.find(j)
+        if a == b or self.origins[a] & self.origins[b]:
+            return False
+        if self.codes[a] and self.codes[b] and not self.codes[a] & self.codes[b]:
+            return False
+        keep, drop = min(a, b), max(a, b)
+        self.parent[drop] = keep
+        self.origins[keep] |= self.origins[drop]
+        self.codes[keep] |= self.codes[drop]
+        return True
+
+
+def _merge_into(target: Dict, others: List[Dict]):
+    group = [target] + others
+    sources = []
+    for issue in group:
+        for s in _sources(issue):
+            if s not in sources:
+                sources.append(s)
+    sources.sort(key=lambda s: _SOURCE_ORDER.index(s) if s in _SOURCE_ORDER else len(_SOURCE_ORDER))
+
+    match = _AGREEMENT_RE.search(str(target.get("model_agreement") or ""))
+    agreeing = int(match.group(1)) if match else len(_sources(target))
+    added = len(sources) - len(_sources(target))
+    target["model_agreement"] = f"{min(len(sources), agreeing + added)}/{len(sources)} models agree"
+    target["validated_by"] = ", ".join(sources)
+
+    target["estimated_savings"] = max(float(i.get("estimated_savings", 0) or 0) for i in group)
+    target["confidence"] = max(float(i.get("confidence", 0) or 0) for i in group)
+    target["severity"] = max(
+        (str(i.get("severity", "Medium")) for i in group),
+        key=lambda s: _SEVERITY_RANK.get(s.lower(), 1),
+    )
+    affected = []
+    for issue in group:
+        for item in issue.get("affected_items", []) or []:
+            if item not in affected:
+                affected.append(item)
+    if affected:
+        target["affected_items"] = affected
+    for key in ("billed_amount", "expected_amount", "clinical_note"):
+        if target.get(key) is None:
+            for other in others:
+                if other.get(key) is not None:
+                    target[key] = other[key]
+                    break
+    if any(i.get("needs_human_review") for i in group):
+        target["needs_human_review"] = True
+    target["merged_count"] = len(group)
+
+
+def dedup_findings(issues: List[Dict], threshold: float = None) -> Tuple[List[Dict], int]:
+    """
+    Merge near-duplicate findings from different sources. Returns the kept
+    issues (in original order) and the number of findings merged away.
+    """
+    if threshold is None:
+        threshold = settings.FINDING_DEDUP_THRESHOLD
+    uncoded_threshold = max(threshold, settings.FINDING_DEDUP_UNCODED_THRESHOLD)
+    n = len(issues)
+    if n < 2:
+        return issues, 0
+
+    vectors = tfidf_matrix([str(i.get("description", "") or "") for i in issues])
+    similarity = vectors @ vectors.T
+    rows, cols = np.nonzero(np.triu(similarity >= threshold, k=1))
+    if not len(rows):
+        return issues, 0
+
+    codes = [issue_codes(i) for i in issues]
+    clusters = _Clusters([_origin(i) for i in issues], codes)
+    # Most similar pairs first; ties broken by position so results are stable
+    order = np.lexsort((cols, rows, -similarity[rows, cols]))
+    for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+        if bool(codes[i]) != bool(codes[j]) and similarity[i, j] < uncoded_threshold:
+            continue
+        clusters.union(i, j)
+
+    members: Dict[int, List[int]] = {}
+    for i in range(n):
+        members.setdefault(clusters.find(i), []).append(i)
+    kept = []
+    for i in range(n):
+        if clusters.find(i) != i:
+            continue
+        others = [issues[j] for j in members[i][1:]]
+        if others:
+            _merge_into(issues[i], others)
+        kept.append(issues[i])
+    return kept, n - len(kept)
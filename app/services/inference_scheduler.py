@@ -0,0 +1,133 @@
+"""
+CPU scheduling for local model inference (BioBERT).
+
+torch defaults to one intra-op thread per core for every call, so several
+concurrent analyses per worker (and several workers per box) oversubscribe
+the CPU badly. This module pins torch's thread pools from settings and gates
+inference behind a semaphore sized to the cores available to this process,
+so extra load queues up instead of thrashing. Queue wait time is tracked.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app.core.config import settings
+
+
+class InferenceQueueTimeout(Exception):
+    """Raised when an inference slot could not be acquired in time."""
+
+
+def available_cores() -> int:
+    """Cores this process may use: INFERENCE_CPU_CORES, else the affinity mask."""
+    if settings.INFERENCE_CPU_CORES > 0:
+        return settings.INFERENCE_CPU_CORES
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+_torch_configured = False
+_torch_lock = threading.Lock()
+
+
+def configure_torch_threads():
+    """Apply intra/inter-op thread counts once, before the model runs anything."""
+    global _torch_configured
+    if _torch_configured:
+        return
+    with _torch_lock:
+        if _torch_configured:
+            return
+        _torch_configured = True
+        try:
+            import torch
+        except ImportError:
+            return
+        intra = max(1, settings.INFERENCE_INTRA_OP_THREADS)
+        inter = max(1, settings.INFERENCE_INTER_OP_THREADS)
+        torch.set_num_threads(intra)
+        try:
+            # Only allowed before the first parallel op in the process
+            torch.set_num_interop_threads(inter)
+        except RuntimeError as exc:
+            print(f"[Inference] Could not set inter-op threads: {exc}", flush=True)
+        print(f"[Inference] torch threads: intra_op={intra}, inter_op={inter}", flush=True)
+
+
+class InferenceScheduler:
+    """Semaphore-gated inference slots with queue wait accounting."""
+
+    def __init__(self, slots: int, queue_timeout: Optional[float] = None):
+        self.slots = max(1, slots)
+        self.queue_timeout = queue_timeout
+        self._sem = threading.BoundedSemaphore(self.slots)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._calls = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        """Hold an inference slot for the duration of the block; yields the wait in seconds."""
+        start = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+        acquired = self._sem.acquire(timeout=self.queue_timeout)
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._queued -= 1
+            if not acquired:
+                self._timeouts += 1
+            else:
+                self._running += 1
+                self._calls += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+        if not acquired:
+            raise InferenceQueueTimeout(
+                f"No inference slot free after {wait:.1f}s ({self.slots} slots busy)"
+            )
+        try:
+            yield wait
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._sem.release()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "slots": self.slots,
+                "running": self._running,
+                "queued": self._queued,
+                "calls": self._calls,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._wait_total / self._calls * 1000, 1) if self._calls else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 1),
+            }
+
+
+_scheduler: Optional[InferenceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_inference_scheduler() -> InferenceScheduler:
+    """Process-wide scheduler; slots default to cores // intra-op threads."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                slots = settings.INFERENCE_MAX_CONCURRENCY
+                if slots <= 0:
+                    slots = available_cores() // max(1, settings.INFERENCE_INTRA_OP_THREADS)
+                timeout = settings.INFERENCE_QUEUE_TIMEOUT
+                _scheduler = InferenceScheduler(slots, timeout if timeout > 0 else None)
+    return _scheduler
@@ -0,0 +1,162 @@
+"""
+Layout templates: remember the column mapping of each statement layout.
+
+Most bills come from a few hundred billing systems whose itemized
+statements repeat exactly. When the table extractor reads a page with a
+header row confidently, the page's layout fingerprint (page size plus the
+header labels and positions, see ``table_extract.layout_fingerprint``) is
+stored with the column positions it found. Later pages with the same
+fingerprint reuse those columns instead of detecting them, so the
+extraction is deterministic and takes milliseconds.
+
+A template is only trusted while it keeps working: each hit is recorded as
+a success or, below TABLE_EXTRACT_MIN_CONFIDENCE, a failure, and a template
+with at least three failures and more failures than successes is dropped
+so the layout can be learned again.
+
+A proven template (LAYOUT_TEMPLATE_PROVEN_HITS successful hits, at most one
+failure per ten) is trusted past the confidence gate: when every table page
+of a bill was read with proven templates and the items add up to the
+printed total, the extraction counts as confident even if the generic
+penalties (few rows, a quantity column that does not multiply out) would
+have sent the bill back to full Stage 1 extraction. Stage 1 still runs in
+issues-only mode on the extracted table; it is what finds the issues.
+
+Templates are read and written in a session of their own, so a failed
+write (two workers learning the same layout at once hit the unique
+fingerprint) is rolled back without touching the caller's session.
+Lookups, hits and extraction times are counted process-wide for
+/pipeline-status.
+"""
+
+import json
+import threading
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.layout_template import LayoutTemplate
+from app.repositories.layout_template_repository import LayoutTemplateRepository
+from app.utils.table_extract import TableExtraction, TableLayout, extract_line_items
+
+_RETIRE_AFTER_FAILURES = 3
+
+
+class _TemplateStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.extractions = 0
+        self.hits = 0
+        self.learned = 0
+        self.retired = 0
+        self.promoted = 0
+        self.hit_ms = 0.0
+        self.miss_ms = 0.0
+
+    def record(self, result: TableExtraction, learned: int, retired: int, promoted: bool):
+        with self._lock:
+            self.extractions += 1
+            self.learned += learned
+            self.retired += retired
+            self.promoted += int(promoted)
+            if result.template_hits:
+                self.hits += 1
+                self.hit_ms += result.ms
+            else:
+                self.miss_ms += result.ms
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            misses = self.extractions - self.hits
+            return {
+                "enabled": settings.LAYOUT_TEMPLATES_ENABLED,
+                "extractions": self.extractions,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.extractions, 3) if self.extractions else 0.0,
+                "learned": self.learned,
+                "retired": self.retired,
+                "promoted": self.promoted,
+                "avg_ms_hit": round(self.hit_ms / self.hits, 1) if self.hits else None,
+                "avg_ms_detect": round(self.miss_ms / misses, 1) if misses else None,
+            }
+
+
+_stats = _TemplateStats()
+
+
+def template_stats() -> Dict[str, object]:
+    """Process-wide template counters (for /pipeline-status)."""
+    return _stats.snapshot()
+
+
+def _proven(template: LayoutTemplate) -> bool:
+    return template.hits >= settings.LAYOUT_TEMPLATE_PROVEN_HITS and template.failures * 10 <= template.hits
+
+
+class LayoutTemplateStore:
+    def extract(self, file_path: str, pages: Optional[Sequence[int]] = None) -> TableExtraction:
+        """Extract line items, using and learning layout templates."""
+        db = SessionLocal()
+        try:
+            return self._extract(LayoutTemplateRepository(db), file_path, pages)
+        finally:
+            db.close()
+
+    def _extract(
+        self, repo: LayoutTemplateRepository, file_path: str, pages: Optional[Sequence[int]]
+    ) -> TableExtraction:
+        used: Dict[str, LayoutTemplate] = {}
+
+        def template_for(fingerprint: str) -> Optional[TableLayout]:
+            template = used.get(fingerprint) or repo.get_by_fingerprint(fingerprint)
+            if template is None:
+                return None
+            used[fingerprint] = template
+            return TableLayout.from_dict(json.loads(template.columns))
+
+        result = extract_line_items(file_path, pages, template_for=template_for)
+        confident = result.confidence >= settings.TABLE_EXTRACT_MIN_CONFIDENCE
+        promoted = (
+            not confident
+            and result.total_matches
+            and result.template_pages == result.table_pages > 0
+            and all(_proven(used[f]) for f in result.template_hits)
+        )
+        if promoted:
+            result.confidence = settings.TABLE_EXTRACT_MIN_CONFIDENCE
+            result.notes.append("proven layout template")
+            confident = True
+
+        learned = retired = 0
+        try:
+            for fingerprint in result.template_hits:
+                template = repo.record_use(used[fingerprint], confident, result.ms)
+                if template.failures >= _RETIRE_AFTER_FAILURES and template.failures > template.hits:
+                    print(
+                        f"[Templates] Retiring layout {fingerprint[:10]} "
+                        f"({template.hits} hits, {template.failures} failures)",
+                        flush=True,
+                    )
+                    repo.delete(template)
+                    retired += 1
+            if confident:
+                for fingerprint, (layout, header) in result.layouts.items():
+                    if fingerprint in used or repo.get_by_fingerprint(fingerprint) is not None:
+                        continue
+                    try:
+                        repo.create(fingerprint, header, layout.to_dict())
+                    except IntegrityError:
+                        # Another worker learned the same layout first
+                        repo.db.rollback()
+                        continue
+                    learned += 1
+                    print(f"[Templates] Learned layout {fingerprint[:10]}: {header[:80]}", flush=True)
+        except Exception as e:
+            # Templates are an optimization; never fail the analysis over them
+            repo.db.rollback()
+            print(f"[Templates] Could not update layout templates: {e}", flush=True)
+
+        _stats.record(result, learned, retired, promoted)
+        return result
@@ -0,0 +1,190 @@
+"""
+Compact, token-budgeted user payload for the MedGemma clinical review.
+
+The payload used to be pretty-printed JSON with the first 4000 characters
+of the bill and every field of every GPT issue. MedGemma only needs what the
+prompt asks about, so this builder:
+
+- emits compact JSON (no indentation, no empty sections);
+- keeps only the issue fields the clinical review uses, each with its
+  ``original_index`` so the response maps back to the GPT issue list;
+- replaces the fixed excerpt with windows of bill text around the codes the
+  issues refer to, added most-referenced code first until
+  MEDGEMMA_EXCERPT_TOKEN_BUDGET is spent. Bills whose text mentions none of
+  the codes fall back to the start of the text under the same budget.
+
+Token counts are estimated at ~4 characters per token; the endpoint has no
+tokenizer we can call locally.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.biobert_service import ExtractionResult
+from app.services.code_validation_service import ValidationResult
+from app.services.consensus import issue_codes
+
+CHARS_PER_TOKEN = 4
+_WINDOW_RADIUS = 240          # characters of context on each side of a code
+_WINDOW_SEPARATOR = " … "
+_ISSUE_FIELDS = ("category", "severity", "description", "affected_items", "estimated_savings", "confidence")
+
+
+@dataclass
+class PayloadStats:
+    payload_chars: int = 0
+    excerpt_chars: int = 0
+    bill_text_chars: int = 0
+    windows: int = 0
+    issues: int = 0
+
+    @property
+    def estimated_tokens(self) -> int:
+        return (self.payload_chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _code_positions(text_upper: str, code: str) -> List[int]:
+    """Start offsets of ``code`` in the text as a whole token (not inside a longer number)."""
+    positions = []
+    start = text_upper.find(code)
+    while start >= 0:
+        end = start + len(code)
+        before = text_upper[start - 1] if start else " "
+        after = text_upper[end] if end < len(text_upper) else " "
+        if not before.isalnum() and not after.isalnum():
+            positions.append(start)
+        start = text_upper.find(code, end)
+    return positions
+
+
+def select_excerpt(bill_text: str, codes: Sequence[str], budget_chars: int) -> Tuple[str, int]:
+    """
+    Windows of ``bill_text`` around ``codes`` (in priority order), merged where
+    they overlap and returned in document order, within ``budget_chars``.
+    Returns the excerpt and the number of windows.
+    """
+    if not bill_text or budget_chars <= 0:
+        return "", 0
+    if len(bill_text) <= budget_chars:
+        return bill_text, 1
+
+    text_upper = bill_text.upper()
+    spans: List[List[int]] = []
+    used = 0
+    for code in codes:
+        for pos in _code_positions(text_upper, code):
+            lo = max(0, pos - _WINDOW_RADIUS)
+            hi = min(len(bill_text), pos + len(code) + _WINDOW_RADIUS)
+            if any(s[0] <= pos and pos + len(code) <= s[1] for s in spans):
+                continue
+            # Only the part not already covered by an overlapping window costs budget
+            overlap = sum(max(0, min(hi, s[1]) - max(lo, s[0])) for s in spans)
+            cost = (hi - lo) - overlap + len(_WINDOW_SEPARATOR)
+            if used + cost > budget_chars:
+                continue
+            spans.append([lo, hi])
+            used += cost
+            break  # one window per code
+
+    if not spans:
+        return bill_text[:budget_chars], 1
+
+    spans.sort()
+    merged = [spans[0]]
+    for lo, hi in spans[1:]:
+        if lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return _WINDOW_SEPARATOR.join(bill_text[lo:hi].strip() for lo, hi in merged), len(merged)
+
+
+def _compact_issue(index: int, issue: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"original_index": index}
+    for key in _ISSUE_FIELDS:
+        value = issue.get(key)
+        if value not in (None, "", []):
+            out[key] = value
+    return out
+
+
+def _ranked_codes(issues: List[Dict[str, Any]], code_issues: ValidationResult) -> List[str]:
+    """Codes named by the issues, most often referenced first (ties: first seen)."""
+    counts: Dict[str, int] = {}
+    order: Dict[str, int] = {}
+    referenced = [sorted(issue_codes(i)) for i in issues]
+    # Pair issues (NCCI, mutually exclusive) carry "99213, 99214"; each code has its own lines
+    referenced += [
+        [c.strip().upper() for c in ci.code.split(",") if c.strip()] for ci in code_issues.issues if ci.code
+    ]
+    for codes in referenced:
+        for code in codes:
+            counts[code] = counts.get(code, 0) + 1
+            order.setdefault(code, len(order))
+    return sorted(counts, key=lambda c: (-counts[c], order[c]))
+
+
+def build_medgemma_payload(
+    gpt_result: Dict[str, Any],
+    bill_text: str,
+    entities: ExtractionResult,
+    code_issues: ValidationResult,
+    issue_indices: Optional[Sequence[int]] = None,
+    excerpt_token_budget: Optional[int] = None,
+) -> Tuple[str, PayloadStats]:
+    """
+    The JSON user message for MedGemma and its size stats. ``issue_indices``
+    restricts the GPT issues sent (indices into ``detected_issues``, kept as
+    ``original_index``); by default all are sent.
+    """
+    if excerpt_token_budget is None:
+        excerpt_token_budget = settings.MEDGEMMA_EXCERPT_TOKEN_BUDGET
+    detected = gpt_result.get("detected_issues", []) or []
+    if issue_indices is None:
+        issue_indices = range(len(detected))
+    issues = [_compact_issue(i, detected[i]) for i in issue_indices]
+
+    excerpt, windows = select_excerpt(
+        bill_text or "",
+        _ranked_codes([detected[i] for i in issue_indices], code_issues),
+        excerpt_token_budget * CHARS_PER_TOKEN,
+    )
+
+    payload: Dict[str, Any] = {}
+    if excerpt:
+        payload["bill_text_excerpt"] = excerpt
+    summary = gpt_result.get("summary", "")
+    if summary:
+        payload["gpt_summary"] = summary
+    if issues:
+        payload["detected_issues"] = issues
+    entity_codes = {
+        "cpt_codes": sorted(set(entities.cpt_codes)),
+        "icd_codes": sorted(set(entities.icd_codes)),
+        "hcpcs_codes": sorted(set(entities.hcpcs_codes)),
+    }
+    entity_codes = {k: v for k, v in entity_codes.items() if v}
+    if entity_codes:
+        payload["biobert_entities"] = entity_codes
+    if code_issues.issues:
+        payload["code_validation_issues"] = [
+            {
+                "code": ci.code,
+                "issue_type": ci.issue_type,
+                "severity": ci.severity,
+                "description": ci.description,
+            }
+            for ci in code_issues.issues
+        ]
+
+    text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    stats = PayloadStats(
+        payload_chars=len(text),
+        excerpt_chars=len(excerpt),
+        bill_text_chars=len(bill_text or ""),
+        windows=windows,
+        issues=len(issues),
+    )
+    return text, stats
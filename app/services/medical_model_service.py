@@ -3,15 +3,25 @@ MedGemma clinical validation via Google Cloud Vertex AI.
 
 Replaces the previous Together AI multi-model approach with a single
 MedGemma endpoint on Vertex AI for clinical reasoning validation.
+
+The Vertex AI endpoint client is created once per process and shared, so
+its channel is reused across bills. With MEDGEMMA_BATCH_WINDOW_MS > 0,
+requests from concurrent bills are collected for that long (up to
+MEDGEMMA_BATCH_MAX_SIZE) and sent as one ``endpoint.predict`` call.
 """
 
 import json
+import queue
+import threading
+import time
 import traceback
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from app.core.config import settings
 from app.services.biobert_service import ExtractionResult
 from app.services.code_validation_service import ValidationResult
+from app.services.medgemma_payload import build_medgemma_payload
 
 
 CLINICAL_VALIDATION_PROMPT = """\
@@ -19,7 +29,7 @@ You are a clinical reasoning validator for a medical billing auditor.
 
 You will receive:
 1. Bill text (excerpt).
-2. A JSON analysis produced by GPT containing detected_issues.
+2. The issues detected by GPT (detected_issues), each with its original_index.
 3. Entities extracted by a local NER model (BioBERT).
 4. Code validation issues found by a deterministic rule engine (PyCTAKES).
 
@@ -61,27 +71,154 @@ Return ONLY a JSON object:
 }"""
 
 
-class MedicalModelService:
-    """Runs GPT analysis + local NLP results through MedGemma for clinical validation."""
+_ENDPOINT_RETRY_SECONDS = 60.0
 
-    def __init__(self):
-        self._endpoint = None
+_endpoint = None
+_endpoint_lock = threading.Lock()
+_endpoint_failed_at: Optional[float] = None
 
-    def _get_endpoint(self):
-        if self._endpoint is not None:
-            return self._endpoint
+
+def get_medgemma_endpoint():
+    """Process-wide Vertex AI endpoint client (None when it cannot be created)."""
+    global _endpoint, _endpoint_failed_at
+    if _endpoint is not None:
+        return _endpoint
+    with _endpoint_lock:
+        if _endpoint is not None:
+            return _endpoint
+        # Don't hammer Vertex AI with init calls on every bill while it is unreachable
+        if _endpoint_failed_at is not None and time.monotonic() - _endpoint_failed_at < _ENDPOINT_RETRY_SECONDS:
+            return None
         try:
             from google.cloud import aiplatform
             aiplatform.init(
                 project=settings.GCP_PROJECT_ID,
                 location=settings.GCP_LOCATION,
             )
-            self._endpoint = aiplatform.Endpoint(settings.MEDGEMMA_ENDPOINT_ID)
+            _endpoint = aiplatform.Endpoint(settings.MEDGEMMA_ENDPOINT_ID)
+            _endpoint_failed_at = None
             print(f"[MedGemma] Connected to endpoint {settings.MEDGEMMA_ENDPOINT_ID}", flush=True)
-            return self._endpoint
         except Exception as exc:
+            _endpoint_failed_at = time.monotonic()
             print(f"[MedGemma] Failed to connect to Vertex AI: {exc}", flush=True)
-            return None
+        return _endpoint
+
+
+def _prediction_texts(response) -> List[str]:
+    if hasattr(response, "predictions") and response.predictions:
+        return [str(p) for p in response.predictions]
+    if isinstance(response, list):
+        return [str(p) for p in response]
+    return []
+
+
+class PredictionBatcher:
+    """
+    Collects predict instances from concurrent callers and sends them to the
+    endpoint together. Each caller gets a Future for its own prediction.
+    """
+
+    def __init__(self, window_seconds: float, max_size: int):
+        self.window = window_seconds
+        self.max_size = max(1, max_size)
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._batches = 0
+        self._instances = 0
+        self._largest = 0
+        self._failures = 0
+
+    def submit(self, instance: Dict[str, Any]) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((instance, future))
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="medgemma-batcher")
+                self._thread.start()
+
+    def _collect(self) -> List[Tuple[Dict[str, Any], Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            batch = [(inst, fut) for inst, fut in batch if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self._batches += 1
+            self._instances += len(batch)
+            self._largest = max(self._largest, len(batch))
+            try:
+                endpoint = get_medgemma_endpoint()
+                if endpoint is None:
+                    raise RuntimeError("MedGemma endpoint unavailable")
+                response = endpoint.predict(
+                    instances=[inst for inst, _ in batch], timeout=settings.MEDICAL_MODEL_TIMEOUT,
+                )
+                texts = _prediction_texts(response)
+                if len(texts) != len(batch):
+                    raise RuntimeError(f"expected {len(batch)} predictions, got {len(texts)}")
+                for (_, future), text in zip(batch, texts):
+                    future.set_result(text)
+            except Exception as exc:
+                self._failures += 1
+                print(f"[MedGemma] Batched prediction of {len(batch)} failed: {exc}", flush=True)
+                for _, future in batch:
+                    future.set_exception(exc)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "window_ms": round(self.window * 1000),
+            "max_size": self.max_size,
+            "batches": self._batches,
+            "instances": self._instances,
+            "avg_batch": round(self._instances / self._batches, 2) if self._batches else 0.0,
+            "largest_batch": self._largest,
+            "failed_batches": self._failures,
+            "queued": self._queue.qsize(),
+        }
+
+
+_batcher: Optional[PredictionBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_prediction_batcher() -> Optional[PredictionBatcher]:
+    """Process-wide batcher, or None when batching is off (MEDGEMMA_BATCH_WINDOW_MS=0)."""
+    global _batcher
+    if settings.MEDGEMMA_BATCH_WINDOW_MS <= 0:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = PredictionBatcher(
+                    settings.MEDGEMMA_BATCH_WINDOW_MS / 1000.0, settings.MEDGEMMA_BATCH_MAX_SIZE,
+                )
+    return _batcher
+
+
+class MedicalModelService:
+    """Runs GPT analysis + local NLP results through MedGemma for clinical validation."""
+
+    def _get_endpoint(self):
+        return get_medgemma_endpoint()
 
     def validate_clinical(
         self,
@@ -89,38 +226,26 @@ class MedicalModelService:
         bill_text: str,
         entities: ExtractionResult,
         code_issues: ValidationResult,
+        issue_indices: Optional[Sequence[int]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
-        Send all prior-stage outputs to MedGemma for clinical review.
+        Send all prior-stage outputs to MedGemma for clinical review; with
+        ``issue_indices``, only those GPT issues (see stage3_triage).
         Returns the MedGemma response dict or None on failure.
         """
         endpoint = self._get_endpoint()
         if endpoint is None:
             return None
 
-        user_payload = json.dumps({
-            "bill_text_excerpt": bill_text[:4000],
-            "gpt_analysis": {
-                "summary": gpt_result.get("summary", ""),
-                "risk_score": gpt_result.get("risk_score", 0),
-                "detected_issues": gpt_result.get("detected_issues", []),
-            },
-            "biobert_entities": {
-                "cpt_codes": entities.cpt_codes,
-                "icd_codes": entities.icd_codes,
-                "hcpcs_codes": entities.hcpcs_codes,
-                "entity_count": len(entities.entities),
-            },
-            "code_validation_issues": [
-                {
-                    "code": ci.code,
-                    "issue_type": ci.issue_type,
-                    "severity": ci.severity,
-                    "description": ci.description,
-                }
-                for ci in code_issues.issues
-            ],
-        }, indent=2)
+        user_payload, stats = build_medgemma_payload(
+            gpt_result, bill_text, entities, code_issues, issue_indices=issue_indices,
+        )
+        print(
+            f"[MedGemma] Payload {stats.payload_chars} chars (~{stats.estimated_tokens} tokens): "
+            f"{stats.issues} issues, excerpt {stats.excerpt_chars}/{stats.bill_text_chars} chars "
+            f"in {stats.windows} window(s)",
+            flush=True,
+        )
 
         try:
             instances = [{
@@ -133,13 +258,14 @@ class MedicalModelService:
                 },
             }]
 
-            response = endpoint.predict(instances=instances, timeout=settings.MEDICAL_MODEL_TIMEOUT)
-
-            raw = ""
-            if hasattr(response, "predictions") and response.predictions:
-                raw = str(response.predictions[0])
-            elif isinstance(response, list) and response:
-                raw = str(response[0])
+            batcher = get_prediction_batcher()
+            if batcher is not None:
+                future = batcher.submit(instances[0])
+                raw = future.result(timeout=settings.MEDICAL_MODEL_TIMEOUT + batcher.window + 5)
+            else:
+                response = endpoint.predict(instances=instances, timeout=settings.MEDICAL_MODEL_TIMEOUT)
+                texts = _prediction_texts(response)
+                raw = texts[0] if texts else ""
 
             return self._parse_response(raw)
 
@@ -0,0 +1,230 @@
+"""
+Two-tier cache for BioBERT NER results.
+
+Tier 1 is an in-process LRU; tier 2 is a SQLite file shared by every worker
+on the box. Entries are keyed by the model id plus a SHA-256 of the
+normalized bill text, so retries and re-analyses of the same statement skip
+inference entirely. Entries older than NER_CACHE_TTL_SECONDS are treated as
+misses in both tiers and recomputed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.biobert_service import ExtractionResult, MedicalEntity
+
+# Bump when ExtractionResult or the regex extraction changes so stale disk rows are ignored
+CACHE_SCHEMA_VERSION = 2
+
+_SPACE_RUN = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of bill text: NFKC, collapsed spaces, trimmed lines."""
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_SPACE_RUN.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def make_key(model_id: str, normalized_text: str) -> str:
+    digest = hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+    return f"v{CACHE_SCHEMA_VERSION}:{model_id}:{digest}"
+
+
+def _serialize(result: ExtractionResult) -> bytes:
+    return json.dumps(asdict(result), separators=(",", ":")).encode("utf-8")
+
+
+def _deserialize(blob: bytes) -> ExtractionResult:
+    data = json.loads(blob)
+    data["entities"] = [MedicalEntity(**e) for e in data.get("entities", [])]
+    return ExtractionResult(**data)
+
+
+class _DiskStore:
+    """Size-bounded SQLite store; least-recently-accessed rows are evicted."""
+
+    def __init__(self, path: str, max_entries: int, ttl: float = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ner_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed_at REAL NOT NULL, "
+            "created_at REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(ner_cache)")}
+        if "created_at" not in columns:
+            # Files from before the TTL: their rows count as created at epoch 0
+            self._conn.execute("ALTER TABLE ner_cache ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_ner_cache_accessed ON ner_cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """(value, created_at) of a live entry, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM ner_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM ner_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE ner_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0], row[1]
+
+    def put(self, key: str, value: bytes) -> int:
+        """Insert or replace an entry; returns the number of rows evicted."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ner_cache (key, value, accessed_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM ner_cache").fetchone()[0]
+            evicted = 0
+            if count > self.max_entries:
+                # Trim 10% below the cap so we don't evict on every insert
+                evicted = count - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM ner_cache WHERE key IN ("
+                    "SELECT key FROM ner_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (evicted,),
+                )
+            self._conn.commit()
+            return evicted
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ner_cache").fetchone()[0]
+
+
+class NERCache:
+    """In-process LRU in front of an optional on-disk store, with hit/miss counters."""
+
+    def __init__(self, memory_entries: int, disk_path: Optional[str], disk_entries: int, ttl: float = 0):
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        # key -> (serialized result, created_at)
+        self._memory: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[_DiskStore] = None
+        if disk_path:
+            try:
+                self._disk = _DiskStore(disk_path, disk_entries, ttl)
+            except Exception as exc:
+                print(f"[NERCache] Disk tier unavailable ({disk_path}): {exc}", flush=True)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.expired = 0
+
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self.ttl and time.time() - entry[1] > self.ttl:
+                del self._memory[key]
+                self.expired += 1
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return _deserialize(entry[0])
+
+        if self._disk is not None:
+            try:
+                row = self._disk.get(key)
+            except Exception as exc:
+                print(f"[NERCache] Disk read failed: {exc}", flush=True)
+                row = None
+            if row is not None:
+                blob, created_at = row
+                self._remember(key, blob, created_at)
+                with self._lock:
+                    self.disk_hits += 1
+                return _deserialize(blob)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: ExtractionResult):
+        blob = _serialize(result)
+        self._remember(key, blob)
+        if self._disk is not None:
+            try:
+                evicted = self._disk.put(key, blob)
+            except Exception as exc:
+                print(f"[NERCache] Disk write failed: {exc}", flush=True)
+                return
+            with self._lock:
+                self.disk_evictions += evicted
+
+    def _remember(self, key: str, blob: bytes, created_at: Optional[float] = None):
+        with self._lock:
+            self._memory[key] = (blob, time.time() if created_at is None else created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self.memory_evictions += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "expired": self.expired,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+        stats["disk_entries"] = self._disk.size() if self._disk is not None else None
+        return stats
+
+
+_cache: Optional[NERCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ner_cache() -> Optional[NERCache]:
+    """Process-wide cache instance, or None when NER_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.NER_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = NERCache(
+                    memory_entries=settings.NER_CACHE_MEMORY_ENTRIES,
+                    disk_path=settings.NER_CACHE_PATH or None,
+                    disk_entries=settings.NER_CACHE_DISK_ENTRIES,
+                    ttl=settings.NER_CACHE_TTL_SECONDS,
+                )
+    return _cache
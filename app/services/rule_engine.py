@@ -0,0 +1,253 @@
+"""
+Declarative rule engine for deterministic code validation.
+
+Rules are plain functions registered on a ``RuleSet`` with a decorator:
+
+    @rules.item_rule("em_description_mismatch", where=lambda item: item.code in EM_LEVELS)
+    def em_description_mismatch(ctx, item):
+        ...  # return an issue, a list of issues, or None
+
+    @rules.bill_rule("mutually_exclusive", where=lambda ctx: len(ctx.code_set) > 1)
+    def mutually_exclusive(ctx):
+        ...
+
+The rule set is compiled into a single pass over the line items: each item
+is parsed once into a ``ParsedItem``, every item rule runs against it, and
+bill-level aggregates (codes, units and dollars per code, description text)
+are accumulated on the ``RuleContext`` for the bill rules that run after the
+pass. Issues are returned in rule registration order, and per-rule call
+counts, hit counts and time are kept so slow rules are visible.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+_CPT_RE = re.compile(r"^\d{5}$")
+_HCPCS_RE = re.compile(r"^[A-V]\d{4}$")
+# "99213-25", "11042 59", "J1100-JW-XU": base code followed by modifiers
+_CODE_WITH_MODIFIERS_RE = re.compile(r"^([0-9A-Z]{5})((?:[-\s,]+[0-9A-Z]{2})+)$")
+# Modifiers written in a description: "-59", "modifier 59", "mod: XU"
+_DESCRIPTION_MODIFIER_RE = re.compile(r"(?:-\s?|\bmod(?:ifier)?s?\s*[:#]?\s*)([0-9A-Z]{2})\b", re.IGNORECASE)
+
+
+def _modifiers(value: Any) -> Set[str]:
+    if isinstance(value, (list, tuple, set)):
+        value = " ".join(str(v) for v in value)
+    return {m for m in re.split(r"[-\s,]+", str(value or "").upper()) if len(m) == 2}
+
+
+def split_code_modifiers(code: str) -> Tuple[str, Set[str]]:
+    """("99213-25" -> "99213", {"25"}); codes without modifiers are returned as is."""
+    m = _CODE_WITH_MODIFIERS_RE.match(code)
+    if not m:
+        return code, set()
+    return m.group(1), _modifiers(m.group(2))
+
+
+def _number(value: Any, default: float) -> float:
+    """Parse amounts like 12, "12.50" or "$1,200.00"; ``default`` when unparseable."""
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        try:
+            return float(str(value).replace("$", "").replace(",", "").strip())
+        except ValueError:
+            return default
+
+
+@dataclass
+class ParsedItem:
+    """A GPT line item with its code and amounts parsed once."""
+    index: int
+    code: str                 # stripped, upper-cased; "" when missing
+    description: str
+    description_lower: str
+    quantity: float
+    unit_price: float
+    billed: float             # total_price, or unit_price x quantity
+    is_cpt: bool              # 5-digit numeric code
+    modifiers: Set[str] = field(default_factory=set)   # from the code, a modifier field or the description
+    raw: Dict[str, Any] = field(repr=False, default_factory=dict)
+
+    @classmethod
+    def parse(cls, index: int, item: Dict[str, Any]) -> "ParsedItem":
+        code = str(item.get("code", "") or "").strip().upper()
+        description = str(item.get("description", "") or "")
+        code, modifiers = split_code_modifiers(code)
+        modifiers |= _modifiers(item.get("modifier")) | _modifiers(item.get("modifiers"))
+        modifiers |= {mod.upper() for mod in _DESCRIPTION_MODIFIER_RE.findall(description)}
+        quantity = _number(item.get("quantity"), 1.0) or 1.0
+        unit_price = _number(item.get("unit_price"), 0.0)
+        billed = _number(item.get("total_price"), 0.0) or unit_price * quantity
+        return cls(
+            index=index,
+            code=code,
+            description=description,
+            description_lower=description.lower(),
+            quantity=quantity,
+            unit_price=unit_price,
+            billed=billed,
+            is_cpt=bool(_CPT_RE.match(code)),
+            modifiers=modifiers,
+            raw=item,
+        )
+
+
+@dataclass
+class RuleContext:
+    """Everything a rule may look at; aggregates are filled during the pass."""
+    gpt_result: Dict[str, Any]
+    entities: Any
+    result: Any                                   # ValidationResult (validated/invalid code lists)
+    service_date: Optional[date] = None           # code status is checked as of this date (default today)
+    items: List[ParsedItem] = field(default_factory=list)
+    codes: List[str] = field(default_factory=list)          # sorted CPT/HCPCS codes from items + NER
+    code_set: Set[str] = field(default_factory=set)
+    count_by_code: Dict[str, int] = field(default_factory=dict)
+    units_by_code: Dict[str, float] = field(default_factory=dict)
+    billed_by_code: Dict[str, float] = field(default_factory=dict)
+    modifiers_by_code: Dict[str, Set[str]] = field(default_factory=dict)   # union over each code's lines
+    descriptions_text: str = ""                   # all descriptions, lower-cased, space-joined
+    issues_by_rule: Dict[str, List[Any]] = field(default_factory=dict)
+
+
+@dataclass
+class _Rule:
+    name: str
+    fn: Callable
+    where: Optional[Callable]
+    per_item: bool
+    calls: int = 0
+    hits: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+
+def _as_list(value) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+class RuleSet:
+    def __init__(self, name: str):
+        self.name = name
+        self._rules: List[_Rule] = []
+        self._lock = threading.Lock()
+        # Rules run on the analysis thread pool; counters are only touched under this lock
+        self._stats_lock = threading.Lock()
+
+    def item_rule(self, name: str, where: Optional[Callable[[ParsedItem], bool]] = None):
+        """Register ``fn(ctx, item)``, evaluated for each line item matching ``where``."""
+        def decorator(fn):
+            self._register(_Rule(name, fn, where, per_item=True))
+            return fn
+        return decorator
+
+    def bill_rule(self, name: str, where: Optional[Callable[[RuleContext], bool]] = None):
+        """Register ``fn(ctx)``, evaluated once after the pass when ``where(ctx)`` holds."""
+        def decorator(fn):
+            self._register(_Rule(name, fn, where, per_item=False))
+            return fn
+        return decorator
+
+    def _register(self, rule: _Rule):
+        with self._lock:
+            if any(r.name == rule.name for r in self._rules):
+                raise ValueError(f"Rule '{rule.name}' is already registered in {self.name}")
+            self._rules.append(rule)
+
+    @property
+    def rule_names(self) -> List[str]:
+        return [r.name for r in self._rules]
+
+    def run(self, ctx: RuleContext, skip: Optional[Set[str]] = None) -> List[Any]:
+        """
+        Single pass over the line items, then bill rules; returns issues in
+        rule order. Rules named in ``skip`` are not evaluated (callers that
+        compute them another way, e.g. vectorized over many bills).
+        """
+        rules = [r for r in self._rules if not skip or r.name not in skip]
+        item_rules = [r for r in rules if r.per_item]
+        found: Dict[str, List[Any]] = {r.name: [] for r in rules}
+        ctx.issues_by_rule = found
+
+        descriptions: List[str] = []
+        gpt_codes: List[str] = []
+        for index, raw in enumerate(ctx.gpt_result.get("line_items", []) or []):
+            item = ParsedItem.parse(index, raw)
+            ctx.items.append(item)
+            descriptions.append(item.description_lower)
+            code = item.code
+            if code and code != "SUMMARY":
+                ctx.count_by_code[code] = ctx.count_by_code.get(code, 0) + 1
+                if len(code) == 5:
+                    ctx.units_by_code[code] = ctx.units_by_code.get(code, 0.0) + item.quantity
+                    ctx.billed_by_code[code] = ctx.billed_by_code.get(code, 0.0) + item.billed
+                if item.is_cpt or _HCPCS_RE.match(code):
+                    gpt_codes.append(code)
+                if item.modifiers:
+                    ctx.modifiers_by_code.setdefault(code, set()).update(item.modifiers)
+
+            for rule in item_rules:
+                self._apply(rule, ctx, item, f" on item {index}")
+
+        entities = ctx.entities
+        ner_codes = list(getattr(entities, "cpt_codes", [])) + list(getattr(entities, "hcpcs_codes", []))
+        ctx.codes = sorted(set(gpt_codes + ner_codes))
+        ctx.code_set = set(ctx.codes)
+        ctx.descriptions_text = " ".join(descriptions)
+
+        for rule in rules:
+            if not rule.per_item:
+                self._apply(rule, ctx, None, "")
+
+        return [issue for rule in rules for issue in found[rule.name]]
+
+    def _apply(self, rule: _Rule, ctx: RuleContext, item: Optional[ParsedItem], where_label: str):
+        """Evaluate one rule; a failing rule is logged and counted, never fatal."""
+        subject = ctx if item is None else item
+        start = None
+        try:
+            if rule.where is not None and not rule.where(subject):
+                return
+            start = time.perf_counter()
+            issues = _as_list(rule.fn(ctx) if item is None else rule.fn(ctx, item))
+        except Exception as exc:
+            self._record(rule, start, 0, failed=True)
+            print(f"[Rules] {self.name}.{rule.name} failed{where_label}: {exc}", flush=True)
+            return
+        self._record(rule, start, len(issues))
+        ctx.issues_by_rule[rule.name].extend(issues)
+
+    def _record(self, rule: _Rule, start: Optional[float], hits: int, failed: bool = False):
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        with self._stats_lock:
+            if start is not None:
+                rule.calls += 1
+                rule.seconds += elapsed
+            rule.hits += hits
+            if failed:
+                rule.errors += 1
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._stats_lock:
+            return {
+                r.name: {
+                    "kind": "item" if r.per_item else "bill",
+                    "calls": r.calls,
+                    "hits": r.hits,
+                    "errors": r.errors,
+                    "total_ms": round(r.seconds * 1000, 2),
+                    "avg_us": round(r.seconds / r.calls * 1e6, 1) if r.calls else 0.0,
+                }
+                for r in self._rules
+            }
@@ -0,0 +1,152 @@
+"""
+Stage 3 triage: decide which GPT issues need MedGemma's clinical review.
+
+Most issues on a routine bill are confident, low-value and either
+corroborated by Stage 2 or outside what Stage 2 checks, and MedGemma rarely
+changes them. An issue is sent to MedGemma when any of these hold:
+
+- ``low_confidence``: Claude's confidence is below MEDGEMMA_TRIAGE_MIN_CONFIDENCE;
+- ``high_value``: estimated savings are at least MEDGEMMA_TRIAGE_MIN_SAVINGS;
+- ``stage2_disagrees``: Stage 2 looked at the same thing and found it clean:
+  every code the issue names was validated by Stage 2, the issue is of a
+  kind Stage 2 checks (invalid or terminated codes, duplicates, mutually
+  exclusive pairs, plus MUE units and overcharges when those tables are
+  installed), and no Stage 2 finding concerns those codes. Issues outside
+  what Stage 2 checks, such as most pricing questions, are not a
+  disagreement.
+
+Stage 2 findings that GPT did not report are new to the bill, so they are
+also a reason to call MedGemma. When nothing qualifies, Stage 3 is skipped
+for the bill. With MEDGEMMA_TRIAGE_ENABLED=false every issue is sent.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.code_validation_service import ValidationResult
+from app.services.consensus import IssueMatcher
+
+
+@dataclass
+class TriagePlan:
+    send: List[int] = field(default_factory=list)              # indices into detected_issues
+    reasons: Dict[int, List[str]] = field(default_factory=dict)
+    skipped: List[int] = field(default_factory=list)
+    new_code_issues: int = 0                                   # Stage 2 findings GPT did not report
+
+    @property
+    def total(self) -> int:
+        return len(self.send) + len(self.skipped)
+
+    @property
+    def skip_ratio(self) -> float:
+        return len(self.skipped) / self.total if self.total else 0.0
+
+    @property
+    def call_needed(self) -> bool:
+        return bool(self.send or self.new_code_issues) or not settings.MEDGEMMA_TRIAGE_ENABLED
+
+    def mark_skipped(self, gpt_result: Dict[str, Any]):
+        """Flag the issues that bypassed Stage 3 so reviewers can tell."""
+        detected = gpt_result.get("detected_issues", []) or []
+        for i in self.skipped:
+            detected[i]["stage3_skipped"] = True
+
+
+class _TriageStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bills = 0
+        self.bills_skipped = 0
+        self.issues = 0
+        self.issues_skipped = 0
+        self.reasons: Dict[str, int] = {}
+
+    def record(self, plan: TriagePlan):
+        with self._lock:
+            self.bills += 1
+            self.bills_skipped += 0 if plan.call_needed else 1
+            self.issues += plan.total
+            self.issues_skipped += len(plan.skipped)
+            for reasons in plan.reasons.values():
+                for reason in reasons:
+                    self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": settings.MEDGEMMA_TRIAGE_ENABLED,
+                "bills": self.bills,
+                "bills_without_call": self.bills_skipped,
+                "issues": self.issues,
+                "issues_skipped": self.issues_skipped,
+                "skip_ratio": round(self.issues_skipped / self.issues, 3) if self.issues else 0.0,
+                "send_reasons": dict(self.reasons),
+            }
+
+
+_stats = _TriageStats()
+
+
+def triage_stats() -> Dict[str, object]:
+    """Process-wide triage counters (for /pipeline-status)."""
+    return _stats.snapshot()
+
+
+def _number(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _stage2_checked_types() -> Set[str]:
+    """Issue types Stage 2 rules out for a code it validated without flagging."""
+    from app.codesets import get_fee_schedule, get_mue_table
+
+    types = {"INVALID_CODE", "EXPIRED_CODE", "UNBUNDLING", "MUTUALLY_EXCLUSIVE"}
+    if get_mue_table() is not None:
+        types.add("UNITS_EXCEEDED")
+    if get_fee_schedule() is not None:
+        types.add("OVERCHARGE")
+    return types
+
+
+def plan_stage3(gpt_result: Dict[str, Any], code_validation: Optional[ValidationResult]) -> TriagePlan:
+    """Pick the issues to send to MedGemma and record the decision in the stats."""
+    detected = gpt_result.get("detected_issues", []) or []
+    plan = TriagePlan()
+    matcher = None
+    validated: Set[str] = set()
+    checked: Set[str] = set()
+    if code_validation is not None:
+        matcher = IssueMatcher(detected, code_validation.issues)
+        validated = set(code_validation.validated_codes)
+        checked = _stage2_checked_types()
+        plan.new_code_issues = sum(
+            1 for j in range(len(code_validation.issues)) if not matcher.duplicates_gpt(j)
+        )
+
+    for i, issue in enumerate(detected):
+        reasons = []
+        if not settings.MEDGEMMA_TRIAGE_ENABLED:
+            reasons.append("triage_disabled")
+        else:
+            if _number(issue.get("confidence"), 0.0) < settings.MEDGEMMA_TRIAGE_MIN_CONFIDENCE:
+                reasons.append("low_confidence")
+            if _number(issue.get("estimated_savings"), 0.0) >= settings.MEDGEMMA_TRIAGE_MIN_SAVINGS:
+                reasons.append("high_value")
+            key = matcher.gpt_keys[i] if matcher is not None else None
+            if (key is not None and key.codes and key.codes <= validated and key.types & checked
+                    and not matcher.supported_by_code_issue(i)):
+                reasons.append("stage2_disagrees")
+        if reasons:
+            plan.send.append(i)
+            plan.reasons[i] = reasons
+        else:
+            plan.skipped.append(i)
+
+    _stats.record(plan)
+    return plan
@@ -0,0 +1,32 @@
+"""
+Bill file storage for the API and analysis workers.
+
+STORAGE_TYPE=local keeps files under UPLOAD_DIR in hashed fan-out
+directories; STORAGE_TYPE=s3 keeps them in S3_BUCKET_NAME (S3_ENDPOINT_URL
+for MinIO and other S3-compatible stores) with a local read-through cache,
+so any node can serve or analyze any bill.
+"""
+
+import threading
+from typing import Optional
+
+from app.core.config import settings
+from app.storage.base import StorageAdapter, new_key
+from app.storage.local import LocalStorageAdapter
+from app.storage.s3 import S3StorageAdapter
+
+_adapter: Optional[StorageAdapter] = None
+_adapter_lock = threading.Lock()
+
+
+def get_storage_adapter() -> StorageAdapter:
+    """Process-wide adapter (the S3 read-through cache is shared)."""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = S3StorageAdapter() if settings.STORAGE_TYPE == "s3" else LocalStorageAdapter()
+    return _adapter
+
+
+__all__ = ["StorageAdapter", "LocalStorageAdapter", "S3StorageAdapter", "get_storage_adapter", "new_key"]
@@ -0,0 +1,35 @@
+import uuid
+from abc import ABC, abstractmethod
+
+
+def new_key(ext: str) -> str:
+    """Storage key for a new upload: ``<uuid4><ext>``, one path component."""
+    return f"{uuid.uuid4()}{ext}"
+
+
+def check_key(key: str) -> str:
+    if not key or key.startswith(".") or "/" in key or "\\" in key:
+        raise ValueError(f"Invalid storage key: {key!r}")
+    return key
+
+
+class StorageAdapter(ABC):
+    """Where uploaded bill files live. ``Bill.file_path`` holds the key."""
+
+    @abstractmethod
+    def get_local_path(self, key: str) -> str:
+        """Path of the file on this node's disk (fetched first if remote)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def store(self, source_path: str, key: str, move: bool = False) -> str:
+        """Store a local file under ``key`` (``move`` consumes the source); returns the key."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
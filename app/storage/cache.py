@@ -0,0 +1,159 @@
+"""
+Read-through cache of remote files on a worker's local disk.
+
+Analysis opens a bill file several times (triage, table extraction,
+rendering), so remote objects are downloaded once into the cache and
+served from there. The cache is bounded by STORAGE_CACHE_MAX_MB and evicts
+least recently used files first (file mtime, touched on every hit), except
+files used in the last few minutes, which an analysis may still be reading.
+Concurrent misses on one key share a single download; the per-key lock
+lives only while some thread is using that key.
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.storage.local import fanout_path
+
+_MIN_AGE_S = 600   # never evict a file used this recently
+
+
+class ReadThroughCache:
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, List] = {}    # key -> [lock, threads using it]
+        self._index: Optional["OrderedDict[Path, int]"] = None   # path -> size, oldest first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        entries = []
+        if self.root.exists():
+            for path in self.root.glob("*/*/*"):
+                if path.name.startswith("."):
+                    continue
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, path, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((path, size) for _, path, size in entries)
+        self._bytes = sum(self._index.values())
+
+    def _evict(self):
+        cutoff = time.time() - _MIN_AGE_S
+        for path in list(self._index):
+            if self._bytes <= self.max_bytes:
+                break
+            try:
+                if path.stat().st_mtime > cutoff:
+                    break   # oldest-first order: everything after is recent too
+            except OSError:
+                pass
+            self._bytes -= self._index.pop(path)
+            self.evictions += 1
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _admit(self, path: Path, size: int):
+        with self._lock:
+            self._load_index()
+            self._bytes += size - self._index.pop(path, 0)
+            self._index[path] = size
+            self._evict()
+
+    @contextlib.contextmanager
+    def _key_locked(self, key: str) -> Iterator[None]:
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def get(self, key: str, fetch: Callable[[str], None]) -> str:
+        """Local path of ``key``; on a miss ``fetch(tmp_path)`` writes the file first."""
+        path = fanout_path(self.root, key)
+        with self._key_locked(key):   # one download per key even with concurrent analyses
+            if path.is_file():
+                os.utime(path)
+                with self._lock:
+                    self.hits += 1
+                    self._load_index()
+                    if path in self._index:
+                        self._index.move_to_end(path)
+                return str(path)
+            with self._lock:
+                self.misses += 1
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".fetch-")
+            os.close(fd)
+            try:
+                fetch(tmp)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        self._admit(path, path.stat().st_size)
+        return str(path)
+
+    def put(self, key: str, source_path: str, move: bool = False):
+        """Seed the cache with a file this node already has (e.g. the upload it just stored)."""
+        import shutil
+
+        path = fanout_path(self.root, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            shutil.move(source_path, path)
+        else:
+            shutil.copyfile(source_path, path)
+        self._admit(path, path.stat().st_size)
+
+    def discard(self, key: str):
+        path = fanout_path(self.root, key)
+        with self._lock:
+            self._load_index()
+            self._bytes -= self._index.pop(path, 0)
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "files": len(self._index),
+                "mb": round(self._bytes / (1024 * 1024), 1),
+                "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.storage.base import StorageAdapter, check_key
+
+
+def fanout_path(root: Path, key: str) -> Path:
+    """``root/ab/cd/<key>`` with ``abcd`` from SHA-1 of the key, so no directory grows without bound."""
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return root / digest[:2] / digest[2:4] / key
+
+
+def legacy_path(root: Path, key: str) -> Optional[Path]:
+    """Bills stored before fan-out keep their full path (``uploads/<uuid>.pdf``) in file_path."""
+    path = Path(key) if ("/" in key or "\\" in key) else root / key
+    return path if path.is_file() else None
+
+
+class LocalStorageAdapter(StorageAdapter):
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.UPLOAD_DIR)
+
+    def get_local_path(self, key: str) -> str:
+        legacy = legacy_path(self.root, key)
+        if legacy is not None:
+            return str(legacy)
+        path = fanout_path(self.root, check_key(key))
+        if not path.is_file():
+            raise FileNotFoundError(f"Stored file not found: {key}")
+        return str(path)
+
+    def store(self, source_path: str, key: str, move: bool = False) -> str:
+        path = fanout_path(self.root, check_key(key))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            shutil.move(source_path, path)   # a rename on the same filesystem
+        else:
+            shutil.copyfile(source_path, path)
+        return key
+
+    def delete(self, key: str):
+        path = legacy_path(self.root, key) or fanout_path(self.root, check_key(key))
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return legacy_path(self.root, key) is not None or fanout_path(self.root, check_key(key)).is_file()
@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.storage.base import StorageAdapter, check_key
+from app.storage.cache import ReadThroughCache
+from app.storage.local import legacy_path
+
+CACHE_DIRNAME = ".storage-cache"
+
+
+class S3StorageAdapter(StorageAdapter):
+    """
+    S3 or any S3-compatible store (MinIO, R2, ...; set S3_ENDPOINT_URL).
+    Reads go through a local cache under UPLOAD_DIR, so every API or worker
+    node can open any bill.
+    """
+
+    def __init__(self, client=None, cache: Optional[ReadThroughCache] = None):
+        if not settings.S3_BUCKET_NAME:
+            raise ValueError("S3_BUCKET_NAME is not set.")
+        if client is None:
+            import boto3
+
+            client = boto3.client(
+                "s3",
+                region_name=settings.AWS_REGION,
+                endpoint_url=settings.S3_ENDPOINT_URL or None,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            )
+        self.client = client
+        self.bucket = settings.S3_BUCKET_NAME
+        self.prefix = settings.S3_PREFIX.strip("/")
+        self.cache = cache or ReadThroughCache(
+            Path(settings.UPLOAD_DIR) / CACHE_DIRNAME,
+            settings.STORAGE_CACHE_MAX_MB * 1024 * 1024,
+        )
+
+    def _object_key(self, key: str) -> str:
+        check_key(key)
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def get_local_path(self, key: str) -> str:
+        legacy = legacy_path(Path(settings.UPLOAD_DIR), key)
+        if legacy is not None:
+            return str(legacy)
+        object_key = self._object_key(key)
+        return self.cache.get(key, lambda tmp: self.client.download_file(self.bucket, object_key, tmp))
+
+    def store(self, source_path: str, key: str, move: bool = False) -> str:
+        self.client.upload_file(source_path, self.bucket, self._object_key(key))
+        # This node is likely to analyze the file next; keep it without a round trip
+        self.cache.put(key, source_path, move=move)
+        return key
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        self.cache.discard(key)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
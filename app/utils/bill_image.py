@@ -0,0 +1,68 @@
+"""
+Typed page images passed from rendering to the vision request.
+
+Images used to travel as ``data:image/png;base64,...`` strings, which meant
+a base64 copy, a str copy, an f-string copy and then a regex over megabytes
+to split them apart again in the Anthropic service. A ``BillImage`` carries
+the media type and the raw encoded bytes instead; base64 is produced once,
+when the request content block is built.
+"""
+
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+ImageBytes = Union[bytes, memoryview]
+
+
+@dataclass(frozen=True)
+class BillImage:
+    media_type: str           # image/png | image/jpeg
+    data: ImageBytes          # encoded image file bytes (not base64)
+    page: Optional[int] = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes if isinstance(self.data, memoryview) else len(self.data)
+
+    def base64(self) -> str:
+        return binascii.b2a_base64(self.data, newline=False).decode("ascii")
+
+    def anthropic_block(self) -> Dict[str, Any]:
+        """Image content block for the Anthropic Messages API."""
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": self.media_type,
+                "data": self.base64(),
+            },
+        }
+
+    def data_uri(self) -> str:
+        return f"data:{self.media_type};base64,{self.base64()}"
+
+    @classmethod
+    def from_data_uri(cls, uri: str) -> Optional["BillImage"]:
+        """Parse a legacy ``data:<type>;base64,<data>`` string; None if malformed."""
+        header, sep, payload = uri.partition(",")
+        if not sep or not header.startswith("data:image/") or not header.endswith(";base64"):
+            return None
+        try:
+            data = base64.b64decode(payload, validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        return cls(media_type=header[5:-7], data=data)
+
+
+def image_content_blocks(images: Sequence[Union[BillImage, str]]) -> List[Dict[str, Any]]:
+    """Anthropic image blocks; each image is base64-encoded here and nowhere else."""
+    blocks = []
+    for image in images:
+        if isinstance(image, str):
+            image = BillImage.from_data_uri(image)
+            if image is None:
+                continue
+        blocks.append(image.anthropic_block())
+    return blocks
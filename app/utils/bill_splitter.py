@@ -0,0 +1,140 @@
+"""
+Split PDFs that contain several patients' statements back to back.
+
+Billing offices upload one PDF holding dozens of statements. Each page's
+text layer is checked for the signals that start a statement:
+
+- a page-number reset: "Page 1 of N" (also "Page 1/N");
+- any text page after the last page ("Page N of N") of a statement;
+- an account number that differs from the current statement's
+  ("Account #", "Acct No.", "Patient Account", "Guarantor ID" ...);
+- "Page k of N" with k > 1 always continues the current statement, and
+  pages without text (scans) stay with the statement before them.
+
+An account change only starts a statement at a page laid out like the
+first page of an earlier statement: the text blocks in the top part of the
+page (provider, address, account box) sit in the same places. Positions,
+not text, are compared, so the patient's name and address do not matter,
+while a continuation page that mentions a second account number (a family
+member, a prior balance) under a running header does not split a
+statement. Documents with no page numbers or account numbers are not split.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import FrozenSet, List, Optional, Tuple
+
+from app.utils.pdf_text import PdfText, extract_pdf_pages
+
+_PAGE_OF_RE = re.compile(r"\bpage\s*(\d{1,3})\s*(?:of|/)\s*(\d{1,3})\b", re.IGNORECASE)
+_ACCOUNT_RE = re.compile(
+    r"\b(?:patient\s+|guarantor\s+)?(?:account|acct|guarantor)\s*(?:no\.?|number|num|id|#)?\s*[:#]?\s*"
+    r"([A-Z0-9][A-Z0-9-]{3,19})\b",
+    re.IGNORECASE,
+)
+_HEADER_SHARE = 0.4     # top part of a page holding the statement header
+_GRID = 6               # pt; block positions are compared on this grid
+_LAYOUT_MATCH = 0.6     # share of header blocks two statement first pages have in common
+
+
+@dataclass
+class StatementSegment:
+    pages: List[int] = field(default_factory=list)   # 0-based, contiguous
+    account: Optional[str] = None
+    reason: str = "start"                            # why the segment starts: start | page_reset | page_end | account
+
+
+def _page_of(text: str) -> Optional[Tuple[int, int]]:
+    m = _PAGE_OF_RE.search(text)
+    if not m:
+        return None
+    page, total = int(m.group(1)), int(m.group(2))
+    return (page, total) if 1 <= page <= total else None
+
+
+def _account(text: str) -> Optional[str]:
+    for m in _ACCOUNT_RE.finditer(text):
+        value = m.group(1).upper()
+        if any(c.isdigit() for c in value):
+            return value
+    return None
+
+
+def _layout(page) -> FrozenSet[Tuple[int, int]]:
+    """Grid positions of the text blocks in the header area of a PyMuPDF page."""
+    limit = page.rect.height * _HEADER_SHARE
+    return frozenset(
+        (round(b[0] / _GRID), round(b[1] / _GRID))
+        for b in page.get_text("blocks")
+        if b[6] == 0 and b[1] < limit and b[4].strip()
+    )
+
+
+def _same_layout(a: FrozenSet[Tuple[int, int]], b: FrozenSet[Tuple[int, int]]) -> bool:
+    return bool(a and b) and len(a & b) >= _LAYOUT_MATCH * max(len(a), len(b))
+
+
+def split_statements(file_path: str, pdf_text: Optional[PdfText] = None) -> List[StatementSegment]:
+    """Statement segments of a PDF; a single segment when nothing indicates several."""
+    import fitz  # PyMuPDF
+
+    if pdf_text is None:
+        pdf_text = extract_pdf_pages(file_path)
+    pages = sorted(pdf_text.pages, key=lambda p: p.page)
+
+    segments: List[StatementSegment] = []
+    start_layouts: List[FrozenSet[Tuple[int, int]]] = []
+    last_page_of: Optional[Tuple[int, int]] = None     # latest "Page k of N" of the current statement
+    with fitz.open(file_path) as doc:
+        for page in pages:
+            text = page.text or ""
+            page_of = _page_of(text)
+            account = _account(text)
+            current = segments[-1] if segments else None
+            layout = None
+
+            reason = None
+            if current is None:
+                reason = "start"
+            elif not text.strip() or (page_of and page_of[0] > 1):
+                reason = None
+            elif page_of and page_of[0] == 1:
+                reason = "page_reset"
+            elif last_page_of and last_page_of[0] == last_page_of[1]:
+                reason = "page_end"
+            elif account and current.account and account != current.account:
+                layout = _layout(doc[page.page])
+                if any(_same_layout(layout, start) for start in start_layouts):
+                    reason = "account"
+
+            if reason:
+                segments.append(StatementSegment(pages=[page.page], account=account, reason=reason))
+                start_layouts.append(layout if layout is not None else _layout(doc[page.page]))
+                last_page_of = page_of
+            else:
+                current.pages.append(page.page)
+                if current.account is None:
+                    current.account = account
+                last_page_of = page_of or last_page_of
+    return segments or [StatementSegment(pages=[p.page for p in pages])]
+
+
+def write_segments(file_path: str, segments: List[StatementSegment], out_dir: Path) -> List[Tuple[str, str]]:
+    """Write each segment to its own PDF in ``out_dir``; returns [(path, sha256)]."""
+    import uuid
+
+    import fitz  # PyMuPDF
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    with fitz.open(file_path) as src:
+        for segment in segments:
+            path = out_dir / f"{uuid.uuid4()}.pdf"
+            with fitz.open() as part:
+                part.insert_pdf(src, from_page=segment.pages[0], to_page=segment.pages[-1])
+                data = part.tobytes(garbage=3, deflate=True)
+            path.write_bytes(data)
+            written.append((str(path), hashlib.sha256(data).hexdigest()))
+    return written
@@ -1,25 +1,38 @@
 import os
-import uuid
-import base64
+import hashlib
+import tempfile
 from pathlib import Path
 from typing import Optional, Tuple, List
 from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.storage import get_storage_adapter, new_key
+from app.utils.bill_image import BillImage
 from PIL import Image
-import PyPDF2
 
 
 ALLOWED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png"}
-ALLOWED_MIME_TYPES = {
-    "application/pdf",
-    "image/jpeg",
-    "image/jpg",
-    "image/png",
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Anthropic rejects any single image over 5 MB
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+# Leading bytes of each accepted format; the upload's content_type is client-supplied
+MAGIC_BYTES = {
+    "jpg": b"\xff\xd8\xff",
+    "png": b"\x89PNG\r\n\x1a\n",
 }
+# PDF readers accept the %PDF- header anywhere in the first 1 KB
+_PDF_HEADER = b"%PDF-"
+_SNIFF_BYTES = 1024
 
 
 def validate_file(file: UploadFile) -> Tuple[str, str]:
-    """Validate uploaded file and return (file_type, extension)"""
+    """Validate the uploaded file name and return (file_type, extension).
+
+    The contents are checked against the extension while saving (magic bytes).
+    """
     file_ext = Path(file.filename).suffix.lower()
     if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
@@ -27,12 +40,6 @@ def validate_file(file: UploadFile) -> Tuple[str, str]:
             detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file MIME type",
-        )
-
     if file_ext == ".pdf":
         file_type = "pdf"
     elif file_ext in [".jpg", ".jpeg"]:
@@ -45,43 +52,107 @@ def validate_file(file: UploadFile) -> Tuple[str, str]:
     return file_type, file_ext
 
 
-async def save_uploaded_file(file: UploadFile, file_type: str) -> Tuple[str, str]:
-    """Save uploaded file and return (file_path, file_name)"""
-    upload_dir = Path(settings.UPLOAD_DIR)
-    upload_dir.mkdir(parents=True, exist_ok=True)
+def sniff_file_type(head: bytes) -> Optional[str]:
+    """File type from the leading bytes, or None when not an accepted format."""
+    for file_type, signature in MAGIC_BYTES.items():
+        if head.startswith(signature):
+            return file_type
+    if _PDF_HEADER in head[:_SNIFF_BYTES]:
+        return "pdf"
+    return None
 
-    file_ext = Path(file.filename).suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = upload_dir / unique_filename
 
-    # Check file size
-    file_content = await file.read()
-    file_size_mb = len(file_content) / (1024 * 1024)
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB",
+    )
+
+
+def _open_temp(upload_dir: Path):
+    return tempfile.NamedTemporaryFile(dir=upload_dir, prefix=".upload-", suffix=".part", delete=False)
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
 
-    if file_size_mb > settings.MAX_FILE_SIZE_MB:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB",
-        )
 
-    # Validate image files
-    if file_type in ["jpg", "png"]:
+def _verify_image(path: str):
+    with Image.open(path) as img:
+        img.verify()
+
+
+def _discard(out):
+    try:
+        out.close()
+    finally:
         try:
-            from io import BytesIO
+            os.unlink(out.name)
+        except OSError:
+            pass
+
+
+async def save_uploaded_file(file: UploadFile, file_type: str) -> Tuple[str, str, str]:
+    """Save uploaded file and return (storage key, file_name, sha256 hex digest).
+
+    The body is copied in UPLOAD_CHUNK_BYTES chunks to a temp file in
+    UPLOAD_DIR, with the file I/O and hashing in the threadpool, so a large
+    upload neither sits in memory nor blocks the event loop. The copy stops as
+    soon as MAX_FILE_SIZE_MB is exceeded, and the file is handed to storage
+    only after its magic bytes (and, for images, ``Image.verify``) check out.
+    The key is what ``Bill.file_path`` stores.
+    """
+    upload_dir = Path(settings.UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    max_bytes = int(settings.MAX_FILE_SIZE_MB * 1024 * 1024)
+    # Starlette already knows the size of a parsed multipart file; reject before copying
+    if getattr(file, "size", None) is not None and file.size > max_bytes:
+        raise _too_large()
 
-            img = Image.open(BytesIO(file_content))
-            img.verify()
-        except Exception:
+    file_ext = Path(file.filename).suffix.lower()
+    key = new_key(file_ext)
+
+    digest = hashlib.sha256()
+    out = await run_in_threadpool(_open_temp, upload_dir)
+    try:
+        size = 0
+        head = b""
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large()
+            if len(head) < _SNIFF_BYTES:
+                head += chunk[:_SNIFF_BYTES - len(head)]
+            await run_in_threadpool(_write_chunk, out, digest, chunk)
+        await run_in_threadpool(out.close)
+
+        if sniff_file_type(head) != file_type:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid image file",
+                detail="File contents do not match its type",
             )
 
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+        # Validate image files
+        if file_type in ["jpg", "png"]:
+            try:
+                await run_in_threadpool(_verify_image, out.name)
+            except Exception:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid image file",
+                )
+
+        await run_in_threadpool(get_storage_adapter().store, out.name, key, True)
+    except BaseException:
+        await run_in_threadpool(_discard, out)
+        raise
 
-    return str(file_path), file.filename
+    return key, file.filename, digest.hexdigest()
 
 
 def get_file_url(file_path: str) -> str:
@@ -90,7 +161,7 @@ def get_file_url(file_path: str) -> str:
 
 
 def extract_text_from_file(file_path: str) -> str:
-    """Extract text from PDF using PyPDF2 (text-based PDFs only)"""
+    """Extract text from a text-based PDF (PyMuPDF per page, PyPDF2 fallback)"""
     path = Path(file_path)
     if not path.exists():
         raise ValueError(f"File not found: {file_path}")
@@ -98,17 +169,18 @@ def extract_text_from_file(file_path: str) -> str:
     file_ext = path.suffix.lower()
 
     if file_ext == ".pdf":
+        from app.utils.pdf_text import extract_pdf_pages
+
         try:
-            text_parts = []
-            with open(file_path, "rb") as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                for page in pdf_reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-            return "\n".join(text_parts)
+            result = extract_pdf_pages(file_path)
         except Exception as e:
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+        print(
+            f"[PdfText] {path.name}: {len(result.pages)} pages, {result.chars} chars "
+            f"via {result.engine} in {result.seconds * 1000:.0f} ms",
+            flush=True,
+        )
+        return result.text
 
     elif file_ext in [".jpg", ".jpeg", ".png"]:
         # Can't extract text from images without OCR
@@ -118,52 +190,73 @@ def extract_text_from_file(file_path: str) -> str:
         raise ValueError(f"Unsupported file type: {file_ext}")
 
 
-def get_file_as_base64_images(file_path: str, max_pages: int = 3) -> List[str]:
+def get_file_images(
+    file_path: str,
+    max_pages: int = 3,
+    file_hash: Optional[str] = None,
+    pages: Optional[List[int]] = None,
+) -> List[BillImage]:
     """
-    Convert a file to base64-encoded PNG images for OpenAI Vision API.
-
-    For PDFs: renders each page as an image (up to max_pages).
-    For images: returns the image as-is in base64.
-
-    Returns a list of base64 data-URI strings like:
-        ["data:image/png;base64,iVBOR..."]
+    Page images of a bill for the vision model, as encoded bytes.
+
+    For PDFs: renders ``pages`` (0-based; default the first max_pages) as
+    PNGs, through the on-disk render cache (see app.utils.render_cache).
+    ``pages`` is in priority order: a page that would push the total past
+    VISION_MAX_BYTES, or is itself over the API's per-image limit, is sent
+    as a JPEG instead, and dropped if that still does not fit. The first
+    page is always kept. Images come back in page order.
+    For images: returns the file bytes as-is.
     """
     path = Path(file_path)
     if not path.exists():
         raise ValueError(f"File not found: {file_path}")
 
     file_ext = path.suffix.lower()
-    images: List[str] = []
 
     if file_ext == ".pdf":
         try:
-            import fitz  # PyMuPDF
-
-            doc = fitz.open(file_path)
-            for page_num in range(min(len(doc), max_pages)):
-                page = doc[page_num]
-                # Render at 150 DPI for good quality without huge size
-                pix = page.get_pixmap(dpi=150)
-                img_bytes = pix.tobytes("png")
-                b64 = base64.b64encode(img_bytes).decode("utf-8")
-                images.append(f"data:image/png;base64,{b64}")
-            doc.close()
+            from app.utils.render_cache import page_count, render_page, render_pages
+
+            if pages is None:
+                pages = list(range(min(page_count(file_path), max_pages)))
+            # Render at 150 DPI for good quality without huge size
+            rendered = render_pages(file_path, pages, dpi=150, fmt="png", file_hash=file_hash)
+            images: List[BillImage] = []
+            total = 0
+            for n, data in zip(pages, rendered):
+                image = BillImage("image/png", data, page=n)
+                if image.nbytes > MAX_IMAGE_BYTES or total + image.nbytes > settings.VISION_MAX_BYTES:
+                    # Scanned pages are several times smaller as JPEG
+                    jpeg = render_page(file_path, n, dpi=150, fmt="jpeg", file_hash=file_hash)
+                    image = BillImage("image/jpeg", jpeg, page=n)
+                    if images and total + image.nbytes > settings.VISION_MAX_BYTES:
+                        print(
+                            f"[Vision] Skipping page {n + 1}: {image.nbytes} bytes over the "
+                            f"{settings.VISION_MAX_BYTES}-byte budget ({total} used)",
+                            flush=True,
+                        )
+                        continue
+                images.append(image)
+                total += image.nbytes
         except ImportError:
             raise ValueError("PyMuPDF (fitz) not installed. Cannot render PDF pages.")
         except Exception as e:
             raise ValueError(f"Failed to render PDF as images: {str(e)}")
+        return sorted(images, key=lambda img: img.page)
 
     elif file_ext in [".jpg", ".jpeg"]:
-        with open(file_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-            images.append(f"data:image/jpeg;base64,{b64}")
+        return [BillImage("image/jpeg", path.read_bytes(), page=0)]
 
     elif file_ext == ".png":
-        with open(file_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-            images.append(f"data:image/png;base64,{b64}")
+        return [BillImage("image/png", path.read_bytes(), page=0)]
 
     else:
         raise ValueError(f"Unsupported file type for image conversion: {file_ext}")
 
-    return images
+
+def get_file_as_base64_images(file_path: str, max_pages: int = 3, file_hash: Optional[str] = None) -> List[str]:
+    """
+    Same as get_file_images, as base64 data-URI strings like
+    ["data:image/png;base64,iVBOR..."]. Prefer get_file_images.
+    """
+    return [img.data_uri() for img in get_file_images(file_path, max_pages, file_hash)]
@@ -0,0 +1,149 @@
+"""
+Local OCR for photographed bills (Tesseract via its command-line binary).
+
+A photo of a bill otherwise goes straight to the vision model as a multi-MB
+base64 image. When OCR_ENABLED is set and ``tesseract`` is on the path, the
+image is cleaned up first (EXIF rotation, grayscale, upscaling of small
+photos, autocontrast, light denoising) and run through ``tesseract ... tsv``,
+which reports a confidence per word. The caller routes the bill to the text
+path when the mean word confidence and the amount of text are high enough,
+and keeps vision for poor scans.
+"""
+
+import csv
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image, ImageFilter, ImageOps
+
+from app.core.config import settings
+
+_MIN_WIDTH = 1800     # Tesseract does best with ~10pt text at >= 300 dpi
+
+_probe_lock = threading.Lock()
+_tesseract_path: Optional[str] = None
+_probed = False
+
+
+def tesseract_available() -> bool:
+    """Whether the tesseract binary is on the path (checked once per process)."""
+    global _probed, _tesseract_path
+    if not _probed:
+        with _probe_lock:
+            if not _probed:
+                _tesseract_path = shutil.which(settings.TESSERACT_CMD)
+                if not _tesseract_path:
+                    print(f"[OCR] '{settings.TESSERACT_CMD}' not found, OCR disabled", flush=True)
+                _probed = True
+    return _tesseract_path is not None
+
+
+@dataclass
+class OcrResult:
+    text: str = ""
+    confidence: float = 0.0     # mean word confidence, 0-100, weighted by word length
+    words: int = 0
+    preprocess_ms: float = 0.0
+    ocr_ms: float = 0.0
+
+    @property
+    def total_ms(self) -> float:
+        return self.preprocess_ms + self.ocr_ms
+
+    def good_enough(self) -> bool:
+        return (
+            self.confidence >= settings.OCR_MIN_CONFIDENCE
+            and len(self.text.strip()) >= settings.OCR_MIN_CHARS
+        )
+
+
+def preprocess_image(img: Image.Image) -> Image.Image:
+    """Grayscale, upright, large enough and contrast-stretched for Tesseract."""
+    img = ImageOps.exif_transpose(img)
+    img = ImageOps.grayscale(img)
+    if img.width < _MIN_WIDTH:
+        scale = _MIN_WIDTH / img.width
+        img = img.resize((_MIN_WIDTH, round(img.height * scale)), Image.LANCZOS)
+    img = img.filter(ImageFilter.MedianFilter(3))
+    return ImageOps.autocontrast(img, cutoff=1)
+
+
+def parse_tsv(tsv: str) -> OcrResult:
+    """Text (one line per Tesseract line) and confidence from ``tesseract ... tsv`` output."""
+    lines = []
+    current_key = None
+    current: list = []
+    conf_sum = 0.0
+    weight = 0
+    words = 0
+    for row in csv.DictReader(io.StringIO(tsv), delimiter="\t", quoting=csv.QUOTE_NONE):
+        text = (row.get("text") or "").strip()
+        if row.get("level") != "5" or not text:
+            continue
+        try:
+            conf = float(row.get("conf", -1))
+        except ValueError:
+            conf = -1.0
+        key = (row.get("page_num"), row.get("block_num"), row.get("par_num"), row.get("line_num"))
+        if key != current_key:
+            if current:
+                lines.append(" ".join(current))
+            current_key, current = key, []
+        current.append(text)
+        words += 1
+        if conf >= 0:
+            conf_sum += conf * len(text)
+            weight += len(text)
+    if current:
+        lines.append(" ".join(current))
+    return OcrResult(
+        text="\n".join(lines),
+        confidence=round(conf_sum / weight, 1) if weight else 0.0,
+        words=words,
+    )
+
+
+def ocr_image(file_path: str) -> Optional[OcrResult]:
+    """OCR an image file; None when OCR is disabled, unavailable or fails."""
+    if not settings.OCR_ENABLED or not tesseract_available():
+        return None
+
+    start = time.perf_counter()
+    fd, prepared = tempfile.mkstemp(suffix=".png", prefix="ocr-")
+    os.close(fd)
+    try:
+        with Image.open(file_path) as img:
+            preprocess_image(img).save(prepared)
+        preprocess_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [_tesseract_path, prepared, "stdout", "-l", settings.OCR_LANG, "--psm", "6", "tsv"],
+            capture_output=True,
+            text=True,
+            timeout=settings.OCR_TIMEOUT,
+        )
+        ocr_ms = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            print(f"[OCR] tesseract exited {proc.returncode}: {proc.stderr.strip()[:200]}", flush=True)
+            return None
+    except Exception as e:
+        print(f"[OCR] Failed on {os.path.basename(file_path)}: {e}", flush=True)
+        return None
+    finally:
+        try:
+            os.unlink(prepared)
+        except OSError:
+            pass
+
+    result = parse_tsv(proc.stdout)
+    result.preprocess_ms = round(preprocess_ms, 1)
+    result.ocr_ms = round(ocr_ms, 1)
+    return result
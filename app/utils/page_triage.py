@@ -0,0 +1,190 @@
+"""
+Page triage: pick the PDF pages worth sending to Stage 1.
+
+Itemized statements often carry cover letters, payment coupons, legal
+notices, blank pages and repeated copies of the same page. Each page is
+classified from cheap local signals:
+
+- text pages (PyMuPDF text layer): character count, share of digits,
+  dollar amounts, billing-code hits (CPT/HCPCS/ICD-10/revenue codes) and
+  coupon/remittance phrases;
+- pages with little or no text (scans): a tiny grayscale render gives a
+  blank test (pixel spread) and a 64-bit difference hash (dHash).
+
+Kinds: ``line_items`` and ``summary`` are kept; ``scanned`` pages are kept
+because their content is unknown; ``boilerplate``, ``blank`` and
+``duplicate`` pages are dropped. Text pages are duplicates when their text
+is identical. Scans are compared by dHash first, but at this size every
+page of a table has about the same hash, so a match is confirmed by the
+mean pixel difference of the thumbnails: repeated or re-encoded copies of a
+page pass, different pages (and noisy rescans) do not. If no page
+would be kept, every non-blank page is. There is no fixed page cap; the
+vision path is bounded by VISION_MAX_PAGES and VISION_MAX_BYTES (see
+file_upload.get_file_images).
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.pdf_text import PdfText, extract_pdf_pages
+
+_AMOUNT_RE = re.compile(r"\$\s?\d[\d,]*\.\d{2}|\b\d{1,3}(?:,\d{3})*\.\d{2}\b")
+_CODE_RE = re.compile(
+    r"\b(?:\d{5}|[A-HJ-NP-V]\d{4}|0\d{3}|[A-TV-Z]\d{2}\.\d{1,4})\b"   # CPT, HCPCS, revenue code, ICD-10
+)
+_COUPON_PHRASES = (
+    "amount enclosed", "detach and return", "please detach", "return this portion",
+    "remit to", "make checks payable", "payment coupon",
+)
+
+_SCAN_CHARS = 40          # below this a page is treated as a scan
+_THUMB_DPI = 12
+_BLANK_SPREAD = 10        # max-min gray level (after trimming outliers) of a blank page
+_DUP_HASH_BITS = 4        # dHash distance at or below which two scans may be the same page
+_DUP_MAX_DIFF = 0.5       # mean gray-level difference confirming it (different pages: ~1.5+)
+
+KEEP_KINDS = ("line_items", "summary", "scanned")
+
+
+@dataclass
+class PageInfo:
+    page: int
+    kind: str = ""
+    chars: int = 0
+    digit_ratio: float = 0.0
+    amounts: int = 0
+    codes: int = 0
+    dhash: Optional[int] = None
+    duplicate_of: Optional[int] = None
+    thumbnail: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @property
+    def keep(self) -> bool:
+        return self.kind in KEEP_KINDS
+
+
+@dataclass
+class PageTriage:
+    pages: List[PageInfo] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+
+    @property
+    def kept(self) -> List[int]:
+        return [p.page for p in self.pages if p.keep]
+
+    @property
+    def text(self) -> str:
+        """Text of the kept pages only."""
+        return "\n".join(self.texts[n] for n in self.kept if self.texts[n])
+
+    @property
+    def total_chars(self) -> int:
+        return sum(len(t) for t in self.texts)
+
+    def vision_pages(self) -> List[int]:
+        """
+        Kept pages for the vision path, at most VISION_MAX_PAGES, most useful
+        first (line items, scans, summaries) so a byte budget drops the rest.
+        """
+        rank = {"line_items": 0, "scanned": 1, "summary": 2}
+        return sorted(self.kept, key=lambda n: (rank.get(self.pages[n].kind, 3), n))[:settings.VISION_MAX_PAGES]
+
+    def summary(self) -> str:
+        counts = {}
+        for p in self.pages:
+            counts[p.kind] = counts.get(p.kind, 0) + 1
+        return ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+
+
+def _classify_text(info: PageInfo, text: str):
+    stripped = "".join(text.split())
+    info.chars = len(stripped)
+    info.digit_ratio = sum(c.isdigit() for c in stripped) / info.chars if info.chars else 0.0
+    info.amounts = len(_AMOUNT_RE.findall(text))
+    info.codes = len(_CODE_RE.findall(text.upper()))
+    lower = text.lower()
+    coupon = any(phrase in lower for phrase in _COUPON_PHRASES)
+
+    # A 5-digit number may be a ZIP code, so a couple of code hits also need amounts
+    if info.codes >= 4 or (info.codes >= 2 and info.amounts >= 2) or (info.amounts >= 4 and info.digit_ratio >= 0.08):
+        info.kind = "line_items"
+    elif coupon and info.codes == 0:
+        info.kind = "boilerplate"
+    elif info.amounts >= 1:
+        info.kind = "summary"
+    else:
+        info.kind = "boilerplate"
+
+
+def _thumbnail_stats(page) -> Tuple[bool, int, np.ndarray]:
+    """(is_blank, dHash, thumbnail) from a tiny grayscale render of the page."""
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    pix = page.get_pixmap(dpi=_THUMB_DPI, colorspace=fitz.csGRAY, alpha=False)
+    thumb = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+    low, high = np.percentile(thumb, [1, 99])
+
+    small = np.asarray(Image.fromarray(thumb).resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = 0
+    for bit in (small[:, :-1] > small[:, 1:]).ravel():
+        bits = (bits << 1) | int(bit)
+    return high - low <= _BLANK_SPREAD, bits, thumb.astype(np.int16)
+
+
+def _same_scan(a: PageInfo, b: PageInfo) -> bool:
+    if bin(a.dhash ^ b.dhash).count("1") > _DUP_HASH_BITS or a.thumbnail.shape != b.thumbnail.shape:
+        return False
+    return float(np.abs(a.thumbnail - b.thumbnail).mean()) <= _DUP_MAX_DIFF
+
+
+def triage_pdf(file_path: str, pdf_text: Optional[PdfText] = None) -> PageTriage:
+    """Classify every page of a PDF; ``pdf_text`` reuses an earlier extraction."""
+    import fitz  # PyMuPDF
+
+    if pdf_text is None:
+        pdf_text = extract_pdf_pages(file_path)
+    texts = {p.page: p.text for p in pdf_text.pages}
+
+    result = PageTriage()
+    seen_text = {}
+    seen_scans: List[PageInfo] = []
+    with fitz.open(file_path) as doc:
+        for n in range(len(doc)):
+            text = texts.get(n, "")
+            info = PageInfo(page=n)
+            _classify_text(info, text)
+            if info.chars < _SCAN_CHARS:
+                blank, info.dhash, info.thumbnail = _thumbnail_stats(doc[n])
+                info.kind = "blank" if blank else "scanned"
+
+            if info.kind == "scanned":
+                for other in seen_scans:
+                    if _same_scan(info, other):
+                        info.kind, info.duplicate_of = "duplicate", other.page
+                        break
+                else:
+                    seen_scans.append(info)
+            elif info.keep:
+                fingerprint = hashlib.sha1(" ".join(text.split()).encode()).hexdigest()
+                if fingerprint in seen_text:
+                    info.kind, info.duplicate_of = "duplicate", seen_text[fingerprint]
+                else:
+                    seen_text[fingerprint] = n
+
+            result.pages.append(info)
+            result.texts.append(text)
+    for info in result.pages:
+        info.thumbnail = None   # only needed while comparing
+
+    if not result.kept:
+        # Nothing looked like a bill page; don't drop the document
+        for info in result.pages:
+            if info.kind in ("boilerplate", "duplicate"):
+                info.kind = "summary"
+    return result
@@ -0,0 +1,135 @@
+"""
+Per-page PDF text extraction.
+
+PyMuPDF (``fitz``) extracts text in C and is much faster than PyPDF2's
+pure-Python ``page.extract_text()``. Large PDFs (PDF_TEXT_PARALLEL_MIN_PAGES
+pages or more) are split into page ranges and extracted on a process pool of
+PDF_TEXT_WORKERS processes; each worker opens the file itself, so only page
+numbers and text cross the process boundary. The pool is created on first
+use and reused. If PyMuPDF is missing or fails on a file, PyPDF2 is used.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass
+class PageText:
+    page: int          # 0-based page number
+    text: str
+    chars: int
+
+
+@dataclass
+class PdfText:
+    pages: List[PageText] = field(default_factory=list)
+    engine: str = ""   # "pymupdf" | "pymupdf-parallel" | "pypdf2"
+    seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(p.text for p in self.pages if p.text)
+
+    @property
+    def chars(self) -> int:
+        return sum(p.chars for p in self.pages)
+
+
+def _page_text(page: int, text: str) -> PageText:
+    return PageText(page=page, text=text, chars=len(text.strip()))
+
+
+def _pymupdf_range(file_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Text of pages [start, stop); runs in pool workers as well as inline."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return [(n, doc[n].get_text("text")) for n in range(start, min(stop, len(doc)))]
+
+
+def _pymupdf_page_count(file_path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return len(doc)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _worker_count() -> int:
+    if settings.PDF_TEXT_WORKERS > 0:
+        return settings.PDF_TEXT_WORKERS
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: the API process runs threads, which fork does not copy safely
+                _pool = ProcessPoolExecutor(
+                    max_workers=_worker_count(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def extract_pages_pymupdf(file_path: str, parallel: Optional[bool] = None) -> PdfText:
+    """Per-page text with PyMuPDF; ``parallel=None`` decides by page count."""
+    start = time.perf_counter()
+    page_count = _pymupdf_page_count(file_path)
+    workers = _worker_count()
+    if parallel is None:
+        parallel = workers > 1 and page_count >= settings.PDF_TEXT_PARALLEL_MIN_PAGES
+
+    if parallel:
+        step = -(-page_count // workers)
+        futures = [
+            _get_pool().submit(_pymupdf_range, file_path, lo, lo + step)
+            for lo in range(0, page_count, step)
+        ]
+        pairs = [pair for f in futures for pair in f.result()]
+        engine = "pymupdf-parallel"
+    else:
+        pairs = _pymupdf_range(file_path, 0, page_count)
+        engine = "pymupdf"
+
+    return PdfText(
+        pages=[_page_text(n, text) for n, text in pairs],
+        engine=engine,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def extract_pages_pypdf2(file_path: str) -> PdfText:
+    """Per-page text with PyPDF2 (slow, pure Python)."""
+    import PyPDF2
+
+    start = time.perf_counter()
+    pages = []
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for n, page in enumerate(reader.pages):
+            pages.append(_page_text(n, page.extract_text() or ""))
+    return PdfText(pages=pages, engine="pypdf2", seconds=time.perf_counter() - start)
+
+
+def extract_pdf_pages(file_path: str) -> PdfText:
+    """Per-page text, PyMuPDF first and PyPDF2 as the fallback."""
+    try:
+        return extract_pages_pymupdf(file_path)
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"[PdfText] PyMuPDF failed on {os.path.basename(file_path)}, using PyPDF2: {e}", flush=True)
+    return extract_pages_pypdf2(file_path)
@@ -0,0 +1,224 @@
+"""
+On-disk cache of rendered page images.
+
+Rendering a PDF page with ``page.get_pixmap`` and encoding it costs tens of
+milliseconds per page, and the same pages are rendered again on every
+retry, re-analysis, thumbnail and preview request. Renders are stored under
+``UPLOAD_DIR/.renders`` keyed by (file SHA-256, page, DPI, format), so a page
+is rendered once no matter which file copy or caller asks for it.
+
+The cache is bounded by RENDER_CACHE_MAX_MB and evicts least recently used
+files first. Recency is the file mtime (touched on every hit), so it
+survives restarts and is shared by workers using the same UPLOAD_DIR; each
+process keeps an in-memory index that is rebuilt from the directory on
+first use.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+CACHE_DIRNAME = ".renders"
+FORMATS = {"png": "image/png", "jpeg": "image/jpeg"}
+
+# Sizes served to the apps: thumbnails for bill lists, previews for the detail view
+THUMBNAIL_DPI = 36
+PREVIEW_DPI = 110
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[Path, int]"] = None   # path -> size, oldest first
+        self._bytes = 0
+        self._hashes: Dict[Tuple[str, int, int], str] = {}      # (path, mtime_ns, size) -> sha256
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ── index ─────────────────────────────────────────────────
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        entries = []
+        if self.root.exists():
+            for path in self.root.glob("*/*"):
+                if path.name.startswith("."):
+                    continue
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, path, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((path, size) for _, path, size in entries)
+        self._bytes = sum(self._index.values())
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._index:
+            path, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    # ── keys ──────────────────────────────────────────────────
+
+    def content_hash(self, file_path: str) -> str:
+        """SHA-256 of a source file, memoized by path, mtime and size."""
+        st = os.stat(file_path)
+        key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached is None:
+            cached = file_sha256(file_path)
+            with self._lock:
+                self._hashes[key] = cached
+        return cached
+
+    def path_for(self, file_hash: str, page: int, dpi: int, fmt: str) -> Path:
+        return self.root / file_hash[:2] / f"{file_hash}-p{page}-{dpi}.{fmt}"
+
+    # ── get / put ─────────────────────────────────────────────
+
+    def get(self, path: Path) -> Optional[bytes]:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            self._load_index()
+            if path in self._index:
+                self._index.move_to_end(path)
+        return data
+
+    def put(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".render-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._load_index()
+            self._bytes += len(data) - self._index.pop(path, 0)
+            self._index[path] = len(data)
+            self._evict()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "files": len(self._index),
+                "mb": round(self._bytes / (1024 * 1024), 1),
+                "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[RenderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Process-wide cache, or None when RENDER_CACHE_MAX_MB is 0."""
+    global _cache
+    if settings.RENDER_CACHE_MAX_MB <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RenderCache(
+                    Path(settings.UPLOAD_DIR) / CACHE_DIRNAME,
+                    settings.RENDER_CACHE_MAX_MB * 1024 * 1024,
+                )
+    return _cache
+
+
+def page_count(file_path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return len(doc)
+
+
+def render_pages(
+    file_path: str,
+    pages: List[int],
+    dpi: int = 150,
+    fmt: str = "png",
+    file_hash: Optional[str] = None,
+) -> List[bytes]:
+    """
+    Encoded images of ``pages`` (0-based) of a PDF or image file, rendered
+    at ``dpi`` and served from the cache when possible. The document is only
+    opened if some page is missing from the cache.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported render format: {fmt}")
+    cache = get_render_cache()
+    paths: List[Optional[Path]] = [None] * len(pages)
+    results: List[Optional[bytes]] = [None] * len(pages)
+    if cache is not None:
+        file_hash = file_hash or cache.content_hash(file_path)
+        for i, page in enumerate(pages):
+            paths[i] = cache.path_for(file_hash, page, dpi, fmt)
+            results[i] = cache.get(paths[i])
+
+    missing = [i for i, data in enumerate(results) if data is None]
+    if missing:
+        import fitz  # PyMuPDF
+
+        with fitz.open(file_path) as doc:
+            for i in missing:
+                page = pages[i]
+                if not 0 <= page < len(doc):
+                    raise ValueError(f"Page {page} out of range (document has {len(doc)} pages)")
+                data = doc[page].get_pixmap(dpi=dpi).tobytes(fmt)
+                results[i] = data
+                if cache is not None:
+                    try:
+                        cache.put(paths[i], data)
+                    except OSError as e:
+                        print(f"[RenderCache] Could not store {paths[i].name}: {e}", flush=True)
+    return results
+
+
+def render_page(file_path: str, page: int, dpi: int, fmt: str = "png", file_hash: Optional[str] = None) -> bytes:
+    return render_pages(file_path, [page], dpi, fmt, file_hash)[0]
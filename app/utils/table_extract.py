@@ -0,0 +1,492 @@
+"""
+Deterministic line-item extraction from PDF text layout.
+
+Claude spends most of its output tokens re-typing the line items of a bill.
+For text PDFs the table can be read locally from PyMuPDF word boxes:
+
+1. Words are grouped into rows by vertical position and into cells by
+   horizontal gaps; each cell is typed (money, CPT/HCPCS code, modifier,
+   revenue code, small integer, date or text).
+2. On each page, the right edges of money cells in item-like rows are
+   clustered into columns. A header row (``Description``, ``Qty``,
+   ``Unit Price``, ``Charges`` ...) labels the columns when present;
+   otherwise one column is the line total and two are unit price and total.
+3. Each item-like row becomes a line item (code, modifiers, description,
+   quantity, unit price, total). Text-only rows right under an item continue its
+   description. Summary rows (totals, payments, balances) are not items.
+
+The confidence is the share of item-like rows that fit the column model,
+lowered when quantity x unit price disagrees with the total, when the
+items do not add up to a printed "total charges" amount, when columns are
+ambiguous, or when there are too few rows to trust. Callers only skip the
+model's extraction when it reaches TABLE_EXTRACT_MIN_CONFIDENCE.
+
+Pages with a header row have a layout fingerprint. ``template_for`` lets a
+caller supply the columns already known for a fingerprint (see
+app.services.layout_templates); newly detected, unambiguous layouts are
+returned in ``TableExtraction.layouts`` so they can be remembered.
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+_MONEY_RE = re.compile(r"^\(?-?\$?\s?(\d{1,3}(?:,\d{3})+|\d+)\.\d{2}\)?$")
+_CODE_RE = re.compile(r"^(\d{5}|[A-V]\d{4})(?:-?([A-Z0-9]{2}(?:-[A-Z0-9]{2})*))?$")
+_MOD_RE = re.compile(r"^-([A-Z0-9]{2})$")     # "-59" printed apart from its code
+_REV_RE = re.compile(r"^0\d{3}$")
+_INT_RE = re.compile(r"^\d{1,3}$")
+_DATE_RE = re.compile(r"^\d{1,2}/\d{1,2}/\d{2,4}$")
+
+_SUMMARY_WORDS = (
+    "total", "subtotal", "balance", "payment", "paid", "adjustment", "amount due",
+    "deductible", "copay", "coinsurance", "credit", "discount", "previous",
+)
+_HEADER_LABELS = {
+    "description": "description", "service": "description", "procedure": "description",
+    "code": "code", "cpt": "code", "hcpcs": "code",
+    "qty": "qty", "quantity": "qty", "units": "qty", "unit": "unit", "units/qty": "qty",
+    "price": "unit", "rate": "unit", "each": "unit",
+    "charge": "total", "charges": "total", "amount": "total", "total": "total",
+    "paid": "other", "payment": "other", "payments": "other", "insurance": "other",
+    "adjustment": "other", "adjustments": "other", "allowed": "other",
+    "balance": "other", "responsibility": "other", "due": "other", "discount": "other",
+}
+
+
+@dataclass
+class _Cell:
+    text: str
+    x0: float
+    x1: float
+    kind: str     # money | code | mod | rev | int | date | text
+
+
+@dataclass
+class _Row:
+    y: float
+    height: float
+    cells: List[_Cell]
+
+    @property
+    def text(self) -> str:
+        return " ".join(c.text for c in self.cells)
+
+
+@dataclass
+class TableLayout:
+    """Column positions (right edge of money cells, center of the quantity) of an item table."""
+    total_x: float
+    unit_x: Optional[float] = None
+    qty_x: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {"total_x": self.total_x, "unit_x": self.unit_x, "qty_x": self.qty_x}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Optional[float]]) -> "TableLayout":
+        return cls(total_x=data["total_x"], unit_x=data.get("unit_x"), qty_x=data.get("qty_x"))
+
+
+TemplateLookup = Callable[[str], Optional[TableLayout]]
+
+
+@dataclass
+class TableExtraction:
+    line_items: List[Dict] = field(default_factory=list)
+    confidence: float = 0.0
+    candidate_rows: int = 0
+    matched_rows: int = 0
+    arithmetic_checked: int = 0
+    arithmetic_ok: int = 0
+    printed_total: Optional[float] = None
+    other_text: str = ""          # non-item rows (header, provider, totals) for context
+    notes: List[str] = field(default_factory=list)
+    layouts: Dict[str, Tuple[TableLayout, str]] = field(default_factory=dict)  # detected: fingerprint -> (layout, header)
+    template_hits: Set[str] = field(default_factory=set)                      # fingerprints served by a template
+    table_pages: int = 0          # pages with an item table
+    template_pages: int = 0       # ... whose columns came from a template
+    total_matches: bool = False   # items add up to the printed total
+    ms: float = 0.0
+
+    @property
+    def items_total(self) -> float:
+        return round(sum(i["total_price"] for i in self.line_items), 2)
+
+
+def _money(text: str) -> float:
+    negative = text.startswith("(") or "-" in text
+    value = float(re.sub(r"[^\d.]", "", text))
+    return -value if negative else value
+
+
+def _cell_kind(text: str) -> str:
+    if _MONEY_RE.match(text):
+        return "money"
+    if _DATE_RE.match(text):
+        return "date"
+    if _CODE_RE.match(text.upper()):
+        return "code"
+    if _MOD_RE.match(text.upper()):
+        return "mod"
+    if _REV_RE.match(text):
+        return "rev"
+    if _INT_RE.match(text):
+        return "int"
+    return "text"
+
+
+def _rows(words: Sequence[Tuple]) -> List[_Row]:
+    """Group PyMuPDF words (x0, y0, x1, y1, text, ...) into rows of cells."""
+    if not words:
+        return []
+    heights = [w[3] - w[1] for w in words if w[3] > w[1]]
+    tol = 0.45 * (median(heights) if heights else 8.0)
+    ordered = sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0]))
+
+    groups: List[List[Tuple]] = []
+    centers: List[float] = []
+    for w in ordered:
+        yc = (w[1] + w[3]) / 2
+        if groups and abs(yc - centers[-1]) <= tol:
+            groups[-1].append(w)
+        else:
+            groups.append([w])
+            centers.append(yc)
+
+    rows = []
+    for group, yc in zip(groups, centers):
+        group.sort(key=lambda w: w[0])
+        height = median(w[3] - w[1] for w in group) or 8.0
+        gap = 0.9 * height
+        cells: List[List[Tuple]] = []
+        for w in group:
+            if cells and w[0] - cells[-1][-1][2] <= gap and not _stands_alone(w[4], cells[-1][-1][4]):
+                cells[-1].append(w)
+            else:
+                cells.append([w])
+        rows.append(_Row(
+            y=yc,
+            height=height,
+            cells=[
+                _Cell(" ".join(w[4] for w in c), c[0][0], c[-1][2], _cell_kind(" ".join(w[4] for w in c)))
+                for c in cells
+            ],
+        ))
+    return rows
+
+
+def _stands_alone(word: str, previous: str) -> bool:
+    """Numbers, codes and dates are their own cells even when closely spaced."""
+    return _cell_kind(word) != "text" or _cell_kind(previous) != "text"
+
+
+def _cluster(values: List[float], tol: float) -> List[Tuple[float, int]]:
+    """1-D clusters as (center, count), left to right."""
+    clusters: List[List[float]] = []
+    for v in sorted(values):
+        if clusters and v - clusters[-1][-1] <= tol:
+            clusters[-1].append(v)
+        else:
+            clusters.append([v])
+    return [(sum(c) / len(c), len(c)) for c in clusters]
+
+
+def _is_summary(row: _Row) -> bool:
+    lower = row.text.lower()
+    return not any(c.kind == "code" for c in row.cells) and any(w in lower for w in _SUMMARY_WORDS)
+
+
+def _header_labels(rows: List[_Row]) -> Tuple[Optional[int], Dict[str, float]]:
+    """Index of the table header row and the x-center of each labelled column."""
+    for idx, row in enumerate(rows):
+        if any(c.kind == "money" for c in row.cells):
+            continue
+        labels: Dict[str, float] = {}
+        for cell in row.cells:
+            words = re.findall(r"[a-z/]+", cell.text.lower())
+            label = None
+            for word in words:
+                if word in _HEADER_LABELS:
+                    # "Unit Price" / "Total Charge": the money word wins over the qualifier
+                    candidate = _HEADER_LABELS[word]
+                    if label is None or (label == "unit" and candidate in ("unit", "total") and word != "unit"):
+                        label = candidate
+                    elif label == "qty" and candidate == "unit":
+                        label = "unit"
+            if label and label not in labels:
+                labels[label] = (cell.x0 + cell.x1) / 2
+            elif label == "other":
+                labels.setdefault(f"other@{cell.x0:.0f}", (cell.x0 + cell.x1) / 2)
+        if "description" in labels and ("total" in labels or "unit" in labels):
+            return idx, labels
+    return None, {}
+
+
+def _detect_layout(
+    candidates: List[_Row], labels: Dict[str, float], char_w: float
+) -> Tuple[Optional[TableLayout], bool]:
+    """Money/qty column positions of a page, and whether the money columns were ambiguous."""
+    tol = 3 * char_w
+    money_edges = [c.x1 for r in candidates for c in r.cells if c.kind == "money"]
+    columns = [x for x, n in _cluster(money_edges, tol) if n >= max(2, 0.3 * len(candidates))]
+    if not columns:
+        return None, False
+
+    unit_col = total_col = None
+    ambiguous = False
+    if labels:
+        def nearest(label_x: float) -> Optional[float]:
+            best = min(columns, key=lambda x: abs(x - label_x))
+            return best if abs(best - label_x) <= 12 * char_w else None
+        if "total" in labels:
+            total_col = nearest(labels["total"])
+        if "unit" in labels:
+            unit_col = nearest(labels["unit"])
+            if unit_col == total_col:
+                unit_col = None
+    if total_col is None:
+        if len(columns) == 1:
+            total_col = columns[0]
+        else:
+            unit_col, total_col = columns[0], columns[1]
+            ambiguous = len(columns) > 2
+    qty_x = labels.get("qty")
+    if qty_x is None:
+        # No header: a trailing integer is a quantity only if it lines up across rows
+        trailing = []
+        for r in candidates:
+            first_money_x = min(c.x0 for c in r.cells if c.kind == "money")
+            left = [c for c in r.cells if c.x1 <= first_money_x]
+            if left and left[-1].kind == "int":
+                trailing.append((left[-1].x0 + left[-1].x1) / 2)
+        aligned = [(x, n) for x, n in _cluster(trailing, tol) if n >= max(2, 0.5 * len(candidates))]
+        if aligned:
+            qty_x = max(aligned, key=lambda xn: xn[1])[0]
+    return TableLayout(total_x=total_col, unit_x=unit_col, qty_x=qty_x), ambiguous
+
+
+def layout_fingerprint(header: _Row, page_size: Tuple[float, float]) -> str:
+    """
+    Fingerprint of a statement layout: the page size and the header row's
+    labels and positions (to 4 pt). Bills printed by the same billing system
+    share it; patient data does not enter it.
+    """
+    parts = [f"{page_size[0]:.0f}x{page_size[1]:.0f}"]
+    parts += [f"{c.text.lower()}@{round(c.x0 / 4) * 4:.0f}" for c in header.cells]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def _extract_page(
+    rows: List[_Row],
+    result: TableExtraction,
+    page_size: Tuple[float, float],
+    template_for: Optional[TemplateLookup] = None,
+) -> Tuple[int, int, bool]:
+    """Append the page's items to ``result``; returns (candidate rows, matched rows, ambiguous)."""
+    header_idx, labels = _header_labels(rows)
+    body = rows[header_idx + 1:] if header_idx is not None else rows
+    candidates = [
+        r for r in body
+        if any(c.kind == "money" for c in r.cells)
+        and any(c.kind in ("code", "text") for c in r.cells)
+        and not _is_summary(r)
+    ]
+    if not candidates:
+        return 0, 0, False
+
+    char_w = median(r.height for r in candidates) * 0.5
+    tol = 3 * char_w
+    layout = None
+    ambiguous = False
+    fingerprint = layout_fingerprint(rows[header_idx], page_size) if header_idx is not None else None
+    if fingerprint is not None and template_for is not None:
+        layout = template_for(fingerprint)
+        if layout is not None:
+            result.template_hits.add(fingerprint)
+            result.template_pages += 1
+    if layout is None:
+        layout, ambiguous = _detect_layout(candidates, labels, char_w)
+        if layout is None:
+            return len(candidates), 0, False
+        if fingerprint is not None and not ambiguous:
+            result.layouts[fingerprint] = (layout, rows[header_idx].text)
+    result.table_pages += 1
+    total_col, unit_col, qty_x = layout.total_x, layout.unit_x, layout.qty_x
+    if header_idx is not None:
+        result.other_text += "".join(r.text + "\n" for r in rows[:header_idx + 1])
+
+    matched = 0
+    previous: Optional[Dict] = None
+    previous_row: Optional[_Row] = None
+    for row in body:
+        is_candidate = row in candidates
+        if not is_candidate:
+            # A wrapped description line directly under an item
+            if (
+                previous is not None
+                and previous_row is not None
+                and row.cells[0].kind == "text"
+                and all(c.kind in ("text", "int") for c in row.cells)
+                and row.y - previous_row.y <= 1.8 * row.height
+            ):
+                previous["description"] = f"{previous['description']} {row.text}".strip()
+                previous_row = row
+                continue
+            previous = previous_row = None
+            if row.cells:
+                result.other_text += row.text + "\n"
+            continue
+
+        money = [c for c in row.cells if c.kind == "money"]
+        total_cell = next((c for c in money if abs(c.x1 - total_col) <= tol), None)
+        unit_cell = next((c for c in money if unit_col is not None and abs(c.x1 - unit_col) <= tol), None)
+        first_money_x = min(c.x0 for c in money)
+        left = [c for c in row.cells if c.x1 <= first_money_x]
+        code_cell = next((c for c in left if c.kind == "code"), None)
+        # Quantity: the integer just before the money columns (or under a "Qty" header)
+        qty_cell = None
+        if qty_x is not None:
+            qty_cell = next(
+                (c for c in left if c.kind == "int" and abs((c.x0 + c.x1) / 2 - qty_x) <= 6 * char_w),
+                None,
+            )
+        # Modifiers: "-59" cells, or a bare two-digit number right after the code
+        mod_cells = []
+        if code_cell is not None:
+            mod_cells = [c for c in left if c.kind == "mod"]
+            after = left.index(code_cell) + 1
+            if (
+                after < len(left)
+                and left[after].kind == "int"
+                and len(left[after].text) == 2
+                and left[after] is not qty_cell
+            ):
+                mod_cells.append(left[after])
+        # Description: everything from the first text cell up to the quantity
+        start = next((i for i, c in enumerate(left) if c.kind == "text"), len(left))
+        description = " ".join(
+            c.text for c in left[start:] if c is not qty_cell and c is not code_cell and c not in mod_cells
+        ).strip()
+
+        if total_cell is None or not (description or code_cell):
+            result.other_text += row.text + "\n"
+            previous = previous_row = None
+            continue
+        matched += 1
+
+        total = _money(total_cell.text)
+        quantity = float(qty_cell.text) if qty_cell is not None else 1.0
+        quantity = quantity or 1.0
+        unit_price = _money(unit_cell.text) if unit_cell else round(total / quantity, 2)
+        if unit_cell is not None and qty_cell is not None:
+            result.arithmetic_checked += 1
+            if abs(quantity * unit_price - total) <= max(0.011, 0.005 * abs(total)):
+                result.arithmetic_ok += 1
+
+        code = ""
+        modifiers: List[str] = []
+        if code_cell is not None:
+            m = _CODE_RE.match(code_cell.text.upper())
+            code = m.group(1)
+            if m.group(2):
+                modifiers += m.group(2).split("-")
+            modifiers += [c.text.upper().lstrip("-") for c in sorted(mod_cells, key=lambda c: c.x0)]
+        item = {
+            "description": description or code,
+            "code": code,
+            "modifier": "-".join(dict.fromkeys(modifiers)),
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "total_price": total,
+        }
+        result.line_items.append(item)
+        previous, previous_row = item, row
+
+    for row in body:
+        if _is_summary(row) and "total" in row.text.lower():
+            amounts = [_money(c.text) for c in row.cells if c.kind == "money"]
+            if amounts and ("charge" in row.text.lower() or result.printed_total is None):
+                result.printed_total = amounts[0]
+    return len(candidates), matched, ambiguous
+
+
+def extract_line_items(
+    file_path: str,
+    pages: Optional[Sequence[int]] = None,
+    template_for: Optional[TemplateLookup] = None,
+) -> TableExtraction:
+    """
+    Line items from the given pages (0-based; default all) of a text PDF.
+    ``template_for`` maps a layout fingerprint to a known layout; pages whose
+    header matches one skip column detection.
+    """
+    import fitz  # PyMuPDF
+
+    started = time.perf_counter()
+    result = TableExtraction()
+    ambiguous_pages = 0
+    with fitz.open(file_path) as doc:
+        for n in (pages if pages is not None else range(len(doc))):
+            page = doc[n]
+            rows = _rows(page.get_text("words"))
+            candidates, matched, ambiguous = _extract_page(
+                rows, result, (page.rect.width, page.rect.height), template_for
+            )
+            result.candidate_rows += candidates
+            result.matched_rows += matched
+            ambiguous_pages += int(ambiguous)
+    result.ms = (time.perf_counter() - started) * 1000
+
+    if not result.candidate_rows or not result.line_items:
+        result.notes.append("no table found")
+        return result
+
+    confidence = result.matched_rows / result.candidate_rows
+    if result.arithmetic_checked:
+        share = result.arithmetic_ok / result.arithmetic_checked
+        confidence *= 0.5 + 0.5 * share
+        if share < 1:
+            result.notes.append(f"qty x unit != total on {result.arithmetic_checked - result.arithmetic_ok} rows")
+    if result.printed_total is not None:
+        if abs(result.items_total - result.printed_total) <= max(0.011, 0.005 * abs(result.printed_total)):
+            result.total_matches = True
+            result.notes.append("items add up to printed total")
+        else:
+            confidence *= 0.6
+            result.notes.append(f"items total {result.items_total:.2f} != printed {result.printed_total:.2f}")
+    else:
+        confidence *= 0.9
+        result.notes.append("no printed total to check")
+    if ambiguous_pages:
+        confidence *= 0.5
+        result.notes.append("ambiguous money columns")
+    if len(result.line_items) < 3:
+        confidence *= 0.7
+        result.notes.append("few rows")
+    if result.template_hits:
+        result.notes.append("layout template")
+    result.confidence = round(confidence, 3)
+    result.ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+def code_with_modifier(item: Dict) -> str:
+    """``"99213-25"`` for an item with code 99213 and modifier 25; the code alone otherwise."""
+    code = str(item.get("code", "") or "")
+    modifier = str(item.get("modifier", "") or "")
+    return f"{code}-{modifier}" if code and modifier else code
+
+
+def format_table(items: List[Dict]) -> str:
+    """Numbered, pipe-separated rendering of line items for a prompt; modifiers follow the code."""
+    lines = ["# | code | description | qty | unit_price | total_price"]
+    for n, item in enumerate(items, 1):
+        lines.append(
+            f"{n} | {code_with_modifier(item)} | {item['description']} | {item['quantity']:g} | "
+            f"{item['unit_price']:.2f} | {item['total_price']:.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the consensus merge on bills with hundreds of issues.
+
+Generates synthetic GPT issues and PyCTAKES code issues over a shared pool of
+codes and times consensus.merge_results as the issue count grows; with the
+indexed matcher the time per issue should stay roughly flat.
+
+    python scripts/bench_consensus.py
+"""
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing app.services builds the DB engine; it never connects here
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='acuvera-bench-')}/bench.db")
+
+from app.services.code_validation_service import CodeIssue, ValidationResult  # noqa: E402
+from app.services.consensus import merge_results  # noqa: E402
+
+random.seed(42)
+
+GPT_TEMPLATES = [
+    "CPT {code} appears to be a duplicate charge for the same service.",
+    "Possible upcoding: {code} billed at a higher level than documented.",
+    "The charge for {code} is well above the typical range for this area.",
+    "Procedure {code} is missing modifier 25 on the same day as an office visit.",
+    "Facility fee looks high compared to similar hospitals.",
+]
+CODE_ISSUES = [
+    ("UNBUNDLING", "CPT code {code} appears 2 times on this bill. This may be a duplicate charge."),
+    ("DESCRIPTION_MISMATCH", "CPT {code} was billed, but the description mentions a different level."),
+    ("OVERCHARGE", "CPT {code} was billed at 5.0x the Medicare fee schedule reference price."),
+    ("INVALID_CODE", "CPT code {code} does not exist in the current CPT/HCPCS code set."),
+    ("UNITS_EXCEEDED", "CPT {code} was billed for 6 units, above the Medically Unlikely Edit."),
+]
+
+
+def make_inputs(n_issues: int):
+    codes = [f"{random.randint(10000, 99999)}" for _ in range(max(10, n_issues // 2))]
+    gpt_issues = []
+    for _ in range(n_issues):
+        code = random.choice(codes)
+        gpt_issues.append({
+            "category": "Coding",
+            "severity": "Medium",
+            "description": random.choice(GPT_TEMPLATES).format(code=code),
+            "confidence": 0.8,
+            "affected_items": [code] if random.random() < 0.7 else [],
+        })
+    validation = ValidationResult()
+    for _ in range(n_issues):
+        issue_type, text = random.choice(CODE_ISSUES)
+        code = random.choice(codes)
+        validation.issues.append(CodeIssue(
+            code=code, issue_type=issue_type, severity="High",
+            description=text.format(code=code), confidence=0.9,
+        ))
+    medgemma = {"validated_issues": [
+        {"original_index": i, "agrees": random.random() < 0.7} for i in range(0, n_issues, 3)
+    ]}
+    return {"detected_issues": gpt_issues}, validation, medgemma
+
+
+def main():
+    print(f"{'issues':>7} {'runs':>5} {'ms/merge':>10} {'us/issue':>10} {'merged':>8}")
+    for n_issues in (50, 100, 200, 400, 800, 1600):
+        gpt_result, validation, medgemma = make_inputs(n_issues)
+        runs = max(3, 2000 // n_issues)
+        inputs = [copy.deepcopy(gpt_result) for _ in range(runs)]
+        start = time.perf_counter()
+        for gpt in inputs:
+            merged = merge_results(gpt, validation, medgemma)
+        elapsed = (time.perf_counter() - start) / runs
+        print(f"{n_issues:>7} {runs:>5} {elapsed * 1000:>10.2f} {elapsed / (2 * n_issues) * 1e6:>10.1f} "
+              f"{len(merged['detected_issues']):>8}")
+
+
+if __name__ == "__main__":
+    main()
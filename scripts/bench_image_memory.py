@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Peak memory of preparing a scanned bill for the vision request.
+
+Builds a 3-page scanned-looking PDF (noisy page images, so the PNGs are
+large) and measures with tracemalloc, from rendered page bytes to the
+Anthropic content blocks:
+
+- legacy: base64 -> str -> data-URI f-string -> regex split per image
+- typed:  BillImage -> one base64 encode per image in the content block
+
+Rendering itself is the same for both and is done before measuring; the
+peaks include the base64 content blocks that the request has to hold.
+
+    python scripts/bench_image_memory.py [--pages 3]
+"""
+import argparse
+import base64
+import gc
+import os
+import re
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+tmp_dir = tempfile.mkdtemp(prefix="acuvera-bench-")
+# Importing app.* builds the DB engine; it never connects here
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp_dir}/bench.db")
+os.environ["RENDER_CACHE_MAX_MB"] = "0"
+
+from app.utils.bill_image import BillImage, image_content_blocks  # noqa: E402
+
+
+def build_scan(path: str, pages: int):
+    import fitz  # PyMuPDF
+    from PIL import Image, ImageDraw
+
+    doc = fitz.open()
+    for n in range(pages):
+        img = Image.effect_noise((1275, 1650), 40).convert("RGB")   # 8.5x11in at 150 dpi
+        draw = ImageDraw.Draw(img)
+        for row in range(60):
+            draw.text((80, 80 + row * 24), f"03/14/2025  9921{row % 5}  Office visit ... ${row * 17.5:.2f}", fill=0)
+        png = os.path.join(tmp_dir, f"scan{n}.png")
+        img.save(png)
+        page = doc.new_page(width=612, height=792)
+        page.insert_image(page.rect, filename=png)
+    doc.save(path)
+    doc.close()
+
+
+def legacy_blocks(rendered):
+    uris = [f"data:image/png;base64,{base64.b64encode(data).decode('utf-8')}" for data in rendered]
+    content = []
+    for uri in uris:
+        match = re.match(r"data:(image/[^;]+);base64,(.+)", uri)
+        if match:
+            content.append({
+                "type": "image",
+                "source": {"type": "base64", "media_type": match.group(1), "data": match.group(2)},
+            })
+    return content
+
+
+def typed_blocks(rendered):
+    images = [BillImage("image/png", data, page=n) for n, data in enumerate(rendered)]
+    return image_content_blocks(images)
+
+
+def measure(fn, rendered):
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    content = fn(rendered)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=3, help="pages in the synthetic scan (default 3)")
+    args = parser.parse_args()
+
+    from app.utils.file_upload import get_file_images
+
+    pdf = os.path.join(tmp_dir, "scan.pdf")
+    build_scan(pdf, args.pages)
+    rendered = [img.data for img in get_file_images(pdf, max_pages=args.pages)]
+    png_mb = sum(len(d) for d in rendered) / (1024 * 1024)
+
+    legacy_peak, legacy = measure(legacy_blocks, rendered)
+    typed_peak, typed = measure(typed_blocks, rendered)
+    assert legacy == typed, "request content differs"
+
+    print(f"{args.pages}-page scan, {png_mb:.1f} MB of rendered PNG")
+    print(f"{'path':<8} {'peak MB':>8} {'x PNG':>6}")
+    for name, peak in (("legacy", legacy_peak), ("typed", typed_peak)):
+        mb = peak / (1024 * 1024)
+        print(f"{name:<8} {mb:>8.1f} {mb / png_mb:>6.2f}")
+    print(f"reduction: {(1 - typed_peak / legacy_peak) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
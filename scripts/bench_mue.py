@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark the MUE units check on bills with hundreds of line items.
+
+Builds a synthetic 15,000-code MUE table in a temp directory and times
+a full CodeValidationService.validate pass on bills of increasing size,
+then prints the per-rule timings kept by the rule set.
+
+    python scripts/bench_mue.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+tmp_dir = tempfile.mkdtemp(prefix="acuvera-bench-")
+os.environ["CODESET_DIR"] = tmp_dir
+# Importing app.services builds the DB engine; it never connects here
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp_dir}/bench.db")
+
+from app.codesets.mue import FILENAME, build_mue_table  # noqa: E402
+from app.services.biobert_service import ExtractionResult  # noqa: E402
+from app.services.code_validation_service import CodeValidationService, code_rules  # noqa: E402
+
+random.seed(42)
+CODES = [f"{n:05d}" for n in random.sample(range(10000, 99999), 15000)]
+
+
+def build_table():
+    csv_path = os.path.join(tmp_dir, "mue.csv")
+    with open(csv_path, "w") as f:
+        f.write("HCPCS/CPT Code,Practitioner Services MUE Values,MUE Adjudication Indicator\n")
+        for code in CODES:
+            f.write(f"{code},{random.randint(1, 4)},{random.choice([1, 2, 3])} Date of Service Edit\n")
+    build_mue_table(csv_path, os.path.join(tmp_dir, FILENAME))
+
+
+def make_bill(n_items: int) -> dict:
+    pool = random.sample(CODES, max(1, n_items // 3))
+    return {"line_items": [
+        {
+            "code": random.choice(pool),
+            "quantity": random.choice([1, 1, 1, 2, 3]),
+            "unit_price": round(random.uniform(10, 500), 2),
+        }
+        for _ in range(n_items)
+    ]}
+
+
+def main():
+    build_table()
+    validator = CodeValidationService()
+    print(f"{'items':>6} {'bills':>6} {'us/bill':>10} {'issues/bill':>12}")
+    for n_items in (50, 200, 500, 1000):
+        bills = [make_bill(n_items) for _ in range(200)]
+        issues = 0
+        start = time.perf_counter()
+        for bill in bills:
+            result = validator.validate(bill, ExtractionResult())
+            issues += len(result.issues)
+        elapsed = time.perf_counter() - start
+        print(f"{n_items:>6} {len(bills):>6} {elapsed / len(bills) * 1e6:>10.1f} {issues / len(bills):>12.1f}")
+
+    print()
+    for name, stats in code_rules.stats().items():
+        print(f"{name:<32} calls={stats['calls']:<6} avg={stats['avg_us']:>9.1f}us hits={stats['hits']}")
+
+
+if __name__ == "__main__":
+    main()
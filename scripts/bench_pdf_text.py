@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF text extraction: PyPDF2 vs PyMuPDF (inline and process pool).
+
+Runs each engine on sample.pdf and on a synthetic 50-page itemized bill
+(generated with PyMuPDF in a temp directory) and prints pages/sec.
+
+    python scripts/bench_pdf_text.py [--pages 50] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+tmp_dir = tempfile.mkdtemp(prefix="acuvera-bench-")
+# Importing app.* builds the DB engine; it never connects here
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp_dir}/bench.db")
+
+from app.utils.pdf_text import (  # noqa: E402
+    extract_pages_pymupdf,
+    extract_pages_pypdf2,
+)
+
+DESCRIPTIONS = [
+    "Office visit, established patient, moderate complexity",
+    "Comprehensive metabolic panel",
+    "Complete blood count with differential",
+    "Chest x-ray, two views",
+    "Electrocardiogram, routine, 12 leads",
+    "Intravenous infusion, hydration, initial hour",
+    "Room and board, semi-private",
+    "Pharmacy - ondansetron 4 mg injection",
+]
+
+
+def build_bill(path: str, pages: int):
+    import fitz  # PyMuPDF
+
+    rng = random.Random(7)
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        lines = [f"ACME REGIONAL HOSPITAL   Statement page {n + 1} of {pages}", ""]
+        for row in range(45):
+            code = rng.choice(["99213", "80053", "85025", "71046", "93000", "96360", "J2405"])
+            lines.append(
+                f"03/{rng.randint(1, 28):02d}/2025  {code}  {rng.choice(DESCRIPTIONS):<55} "
+                f"{rng.randint(1, 3)}  ${rng.uniform(20, 900):>9.2f}"
+            )
+        page.insert_text((36, 40), "\n".join(lines), fontsize=7)
+    doc.save(path)
+    doc.close()
+
+
+def bench(label: str, path: str, repeat: int):
+    engines = [
+        ("pypdf2", lambda: extract_pages_pypdf2(path)),
+        ("pymupdf", lambda: extract_pages_pymupdf(path, parallel=False)),
+        ("pymupdf-parallel", lambda: extract_pages_pymupdf(path, parallel=True)),
+    ]
+    # Start the worker processes before timing
+    extract_pages_pymupdf(path, parallel=True)
+
+    print(f"\n{label}")
+    print(f"{'engine':<18} {'pages':>6} {'chars':>9} {'best ms':>9} {'pages/s':>9}")
+    for name, run in engines:
+        results = [run() for _ in range(repeat)]
+        best = min(r.seconds for r in results)
+        pages = len(results[0].pages)
+        print(f"{name:<18} {pages:>6} {results[0].chars:>9} {best * 1000:>9.1f} {pages / best:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50, help="pages in the synthetic bill (default 50)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per engine; best is reported (default 3)")
+    args = parser.parse_args()
+
+    sample = os.path.join(ROOT, "sample.pdf")
+    if os.path.exists(sample):
+        bench("sample.pdf", sample, args.repeat)
+
+    synthetic = os.path.join(tmp_dir, "synthetic_bill.pdf")
+    build_bill(synthetic, args.pages)
+    bench(f"synthetic {args.pages}-page bill", synthetic, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
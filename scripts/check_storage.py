@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Round-trip check of the configured bill storage (STORAGE_TYPE).
+
+Stores a small PDF under a new key, checks ``exists``, reads it back
+through ``get_local_path`` (twice for S3: the second read must come from
+the local cache after the cache copy is dropped once), then deletes it.
+
+Local backend (default, needs nothing):
+
+    python scripts/check_storage.py
+
+S3 backend against the MinIO stand-in from docker-compose:
+
+    docker compose --profile storage up -d minio
+    STORAGE_TYPE=s3 S3_ENDPOINT_URL=http://localhost:9000 S3_BUCKET_NAME=acuvera-test \\
+    AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin \\
+        python scripts/check_storage.py --create-bucket
+"""
+import argparse
+import filecmp
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+tmp_dir = tempfile.mkdtemp(prefix="acuvera-storage-")
+# Importing app.* builds the DB engine; it never connects here
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp_dir}/check.db")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(tmp_dir, "uploads"))
+
+from app.core.config import settings  # noqa: E402
+from app.storage import S3StorageAdapter, get_storage_adapter, new_key  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--create-bucket", action="store_true", help="create S3_BUCKET_NAME first (MinIO)")
+    args = parser.parse_args()
+
+    storage = get_storage_adapter()
+    print(f"backend: {type(storage).__name__}, UPLOAD_DIR={settings.UPLOAD_DIR}")
+    if args.create_bucket and isinstance(storage, S3StorageAdapter):
+        try:
+            storage.client.create_bucket(Bucket=storage.bucket)
+        except storage.client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+    source = os.path.join(tmp_dir, "source.pdf")
+    with open(source, "wb") as f:
+        f.write(b"%PDF-1.4\n% storage round trip\n" + os.urandom(4096))
+
+    key = new_key(".pdf")
+    assert storage.store(source, key) == key
+    assert storage.exists(key), "stored key does not exist"
+    path = storage.get_local_path(key)
+    assert filecmp.cmp(source, path, shallow=False), "read back different bytes"
+    print(f"stored {key} -> {path}")
+
+    if isinstance(storage, S3StorageAdapter):
+        storage.cache.discard(key)              # force a download
+        path = storage.get_local_path(key)
+        assert filecmp.cmp(source, path, shallow=False), "downloaded different bytes"
+        storage.get_local_path(key)             # and a cache hit
+        print(f"cache: {storage.cache.stats()}")
+
+    storage.delete(key)
+    assert not storage.exists(key), "key still exists after delete"
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
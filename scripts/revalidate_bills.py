@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Re-run Stage 2 code validation over every completed bill (no LLM calls).
+
+Use after rebuilding code tables (python -m app.codesets.build ...) or
+changing validation rules. Prints bills/sec and a summary of new, changed
+and no-longer-reported findings.
+
+    python scripts/revalidate_bills.py --dry-run
+    python scripts/revalidate_bills.py --prune
+"""
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.jobs.revalidation_job import revalidate_completed_bills  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-bills", type=int, default=2000, help="bills validated together (default 2000)")
+    parser.add_argument("--dry-run", action="store_true", help="report the diff without writing findings")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete unreviewed Stage 2 findings that are no longer reported")
+    parser.add_argument("--bill-id", type=int, action="append", dest="bill_ids",
+                        help="only these bills (repeatable)")
+    args = parser.parse_args()
+
+    revalidate_completed_bills(
+        batch_bills=args.batch_bills,
+        dry_run=args.dry_run,
+        prune=args.prune,
+        bill_ids=args.bill_ids,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import fitz
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import app.models  # noqa: E402,F401
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.models.analysis_job import AnalysisJob  # noqa: E402
+from app.models.bill import BillStatus  # noqa: E402
+from app.services import bill_service  # noqa: E402
+from app.storage import LocalStorageAdapter, new_key  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bills.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def stored_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    storage = LocalStorageAdapter(str(tmp_path / "uploads"))
+    monkeypatch.setattr(bill_service, "get_storage_adapter", lambda: storage)
+
+    doc = fitz.open()
+    for patient in ("Alice Smith", "Bob Smith"):
+        page = doc.new_page()
+        page.insert_text((50, 60), f"Statement for {patient}   Page 1 of 1", fontsize=10)
+        page.insert_text((50, 120), "99213  Office visit   $120.00", fontsize=9)
+    source = tmp_path / "batch.pdf"
+    doc.save(str(source))
+    doc.close()
+    return storage, storage.store(str(source), new_key(".pdf"))
+
+
+def test_split_upload_returns_before_analyses_finish(db, stored_batch, monkeypatch):
+    storage, key = stored_batch
+    release = threading.Event()
+    analyzed = []
+
+    def slow_analysis(bill_id):
+        release.wait(5)
+        analyzed.append(bill_id)
+
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(bill_service, "_analyze_in_own_session", slow_analysis)
+    monkeypatch.setattr(bill_service, "_get_analysis_pool", lambda: pool)
+
+    service = bill_service.BillService(db)
+    result = asyncio.run(asyncio.wait_for(service._split_and_analyze(key, "batch.pdf", 1, None), 5))
+
+    bills = result["bills"]
+    assert [b.file_name for b in bills] == ["batch (1 of 2).pdf", "batch (2 of 2).pdf"]
+    assert all(b.status == BillStatus.PENDING for b in bills)
+    assert db.query(AnalysisJob).count() == 2
+    assert not storage.exists(key)
+    assert analyzed == []
+
+    release.set()
+    pool.shutdown(wait=True)
+    assert sorted(analyzed) == sorted(b.id for b in bills)
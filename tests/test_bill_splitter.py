@@ -0,0 +1,94 @@
+import os
+import sys
+from pathlib import Path
+
+import fitz
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.utils.bill_splitter import split_statements, write_segments  # noqa: E402
+
+
+def _first_page(doc, patient, account, page_of=None):
+    """Statement first page: provider and patient lines, address, account box, then items."""
+    page = doc.new_page()
+    page.insert_text((50, 60), "General Hospital Billing Office", fontsize=11)
+    page.insert_text((50, 74), f"Statement for {patient}", fontsize=10)
+    page.insert_text((50, 130), "12 Elm Road", fontsize=9)
+    page.insert_text((50, 144), "Springfield", fontsize=9)
+    page.insert_text((380, 130), f"Account #: {account}", fontsize=9)
+    page.insert_text((380, 144), "Statement date: 03/31/2024", fontsize=9)
+    if page_of:
+        page.insert_text((480, 40), f"Page {page_of[0]} of {page_of[1]}", fontsize=8)
+    page.insert_text((50, 420), "99213  Office visit   $120.00", fontsize=9)
+    return page
+
+
+def _continuation(doc, text, page_of=None):
+    page = doc.new_page()
+    page.insert_text((50, 40), "General Hospital", fontsize=8)
+    page.insert_text((50, 420), text, fontsize=9)
+    if page_of:
+        page.insert_text((480, 40), f"Page {page_of[0]} of {page_of[1]}", fontsize=8)
+
+
+def _pdf(tmp_path, build):
+    doc = fitz.open()
+    build(doc)
+    path = tmp_path / "batch.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def _split(path):
+    return [(s.pages, s.account, s.reason) for s in split_statements(path)]
+
+
+def test_two_patients_without_page_numbers(tmp_path):
+    def build(doc):
+        _first_page(doc, "Alice Smith", "A100234")
+        _continuation(doc, "85025  Complete blood count   $45.00")
+        _first_page(doc, "Bob Smithers-Jones", "B200876")
+
+    assert _split(_pdf(tmp_path, build)) == [
+        ([0, 1], "A100234", "start"),
+        ([2], "B200876", "account"),
+    ]
+
+
+def test_second_account_on_a_continuation_page_does_not_split(tmp_path):
+    def build(doc):
+        _first_page(doc, "Alice Smith", "A100234")
+        _continuation(doc, "Prior balance transferred from Account #: C300555   $80.00")
+
+    assert _split(_pdf(tmp_path, build)) == [([0, 1], "A100234", "start")]
+
+
+def test_unpaginated_statement_after_paginated_one(tmp_path):
+    def build(doc):
+        _first_page(doc, "Alice Smith", "A100234", page_of=(1, 2))
+        _continuation(doc, "85025  Complete blood count   $45.00", page_of=(2, 2))
+        doc.new_page()                                   # blank back side stays with Alice
+        _continuation(doc, "Bob Smith   Account #: B200876   80053 Metabolic panel $60.00")
+
+    assert _split(_pdf(tmp_path, build)) == [
+        ([0, 1, 2], "A100234", "start"),
+        ([3], "B200876", "page_end"),
+    ]
+
+
+def test_page_reset_and_segment_files(tmp_path):
+    def build(doc):
+        _first_page(doc, "Alice Smith", "A100234", page_of=(1, 1))
+        _first_page(doc, "Alice Smith", "A100234", page_of=(1, 2))
+        _continuation(doc, "Payments received   $20.00", page_of=(2, 2))
+
+    path = _pdf(tmp_path, build)
+    segments = split_statements(path)
+    assert [(s.pages, s.reason) for s in segments] == [([0], "start"), ([1, 2], "page_reset")]
+
+    written = write_segments(path, segments, tmp_path / "parts")
+    assert [fitz.open(p).page_count for p, _ in written] == [1, 2]
+    assert len({digest for _, digest in written}) == 2
@@ -0,0 +1,120 @@
+import os
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import app.codesets  # noqa: E402
+from app.codesets import CPTIndex, build_cpt_index  # noqa: E402
+from app.services.biobert_service import ExtractionResult  # noqa: E402
+from app.services.code_validation_service import CodeValidationService, bill_service_date  # noqa: E402
+
+
+def _bill(*items):
+    return {"line_items": [
+        {"code": code, "description": desc, "quantity": 1, "unit_price": price, "total_price": price}
+        for code, desc, price in items
+    ]}
+
+
+def _issues(result, issue_type=None):
+    return [i for i in result.issues if issue_type is None or i.issue_type == issue_type]
+
+
+@pytest.fixture
+def cpt_index(tmp_path, monkeypatch):
+    source = tmp_path / "cpt.csv"
+    source.write_text(
+        "code,effective_date,termination_date\n"
+        "99201,1992-01-01,2020-12-31\n"
+        "99213,1992-01-01,\n"
+        "J1100,2000-01-01,\n"
+    )
+    out = str(tmp_path / "cpt_hcpcs.bin")
+    build_cpt_index(str(source), out)
+    index = CPTIndex(out)
+    monkeypatch.setattr(app.codesets, "get_cpt_index", lambda: index)
+    return index
+
+
+def test_service_date_parsing():
+    uploaded = datetime(2024, 5, 2, 13, 30)
+    assert bill_service_date("2019-03-14", uploaded) == date(2019, 3, 14)
+    assert bill_service_date("03/14/2019", uploaded) == date(2019, 3, 14)
+    assert bill_service_date("", uploaded) == date(2024, 5, 2)
+    assert bill_service_date("not a date", None) is None
+    assert bill_service_date(date(2018, 1, 1)) == date(2018, 1, 1)
+
+
+def test_terminated_code_checked_as_of_service_date(cpt_index):
+    bill = _bill(("99201", "Office visit, new patient", 80.0))
+    service = CodeValidationService()
+
+    historical = service.validate(bill, ExtractionResult(), service_date=date(2019, 6, 1))
+    assert not _issues(historical, "EXPIRED_CODE")
+    assert historical.validated_codes == ["99201"]
+
+    current = service.validate(bill, ExtractionResult(), service_date=date(2024, 6, 1))
+    assert [i.code for i in _issues(current, "EXPIRED_CODE")] == ["99201"]
+
+
+def test_hcpcs_level_ii_codes_are_validated(cpt_index):
+    bill = _bill(("J1100", "Dexamethasone injection", 20.0), ("J9999", "Unlisted drug", 40.0))
+    result = CodeValidationService().validate(bill, ExtractionResult(), service_date=date(2024, 1, 1))
+    assert "J1100" in result.validated_codes
+    assert [i.code for i in _issues(result, "INVALID_CODE")] == ["J9999"]
+
+
+@pytest.fixture
+def ncci_table(tmp_path, monkeypatch):
+    from app.codesets import NCCITable, build_ncci_table
+
+    source = tmp_path / "ptp.csv"
+    source.write_text(
+        "column 1,column 2,effective date,deletion date,modifier\n"
+        "29880,29870,20000101,,1\n"
+        "97110,97530,20000101,,1\n"
+    )
+    out = str(tmp_path / "ncci_ptp.col")
+    build_ncci_table(str(source), out)
+    table = NCCITable(out)
+    monkeypatch.setattr(app.codesets, "get_ncci_table", lambda: table)
+    return table
+
+
+def test_distinct_modifier_only_counts_on_the_column2_line(ncci_table):
+    bill = _bill(
+        ("29880", "Knee arthroscopy, meniscectomy", 2000.0),
+        ("29870", "Diagnostic knee arthroscopy", 600.0),
+        ("97110", "Therapeutic exercise", 90.0),
+        ("97530-59", "Therapeutic activities", 95.0),
+    )
+    result = CodeValidationService().validate(bill, ExtractionResult())
+    # 97530 carries -59; the knee pair has no modifier on 29870 and is still flagged
+    assert [i.code for i in _issues(result, "MISSING_MODIFIER")] == ["29880, 29870"]
+
+
+def test_modifier_from_field_or_description(ncci_table):
+    for column2 in (
+        {"code": "29870", "modifier": "XS", "description": "Diagnostic knee arthroscopy"},
+        {"code": "29870", "description": "Diagnostic knee arthroscopy, modifier 59"},
+    ):
+        bill = {"line_items": [{"code": "29880", "description": "Meniscectomy", "total_price": 2000.0},
+                               dict(column2, total_price=600.0)]}
+        result = CodeValidationService().validate(bill, ExtractionResult())
+        assert not _issues(result, "MISSING_MODIFIER")
+
+
+def test_overcharge_expected_amount_is_the_reference_price():
+    from app.services.code_validation_service import overcharge_issue
+
+    assert overcharge_issue("99213", 2, 470.0, 80.0, 3.0) is None      # threshold $480
+    issue = overcharge_issue("99213", 2, 600.0, 80.0, 3.0)
+    assert issue.expected_amount == 160.0
+    assert issue.billed_amount == 600.0
+    assert issue.estimated_savings == 120.0                              # above the $480 threshold only
+    assert "$160.00 in total" in issue.description and "$480.00" in issue.description
@@ -0,0 +1,37 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.services.code_validation_service import CodeIssue  # noqa: E402
+from app.services.consensus import IssueMatcher, issue_codes  # noqa: E402
+
+
+def _issue(description, affected=()):
+    return {"description": description, "affected_items": list(affected)}
+
+
+def test_amounts_zip_codes_and_accounts_are_not_codes():
+    issue = _issue(
+        "Total billed $12,345.00 against an expected 10250.75; statement mailed to "
+        "Springfield, IL 62704 for account 55512."
+    )
+    assert issue_codes(issue) == frozenset()
+
+
+def test_codes_with_context_or_in_affected_items():
+    assert issue_codes(_issue("CPT codes 99213 and 99214 were both billed")) == {"99213", "99214"}
+    assert issue_codes(_issue("Office visit billed twice", ["99213", "Line 4"])) == {"99213"}
+    assert issue_codes(_issue("Injection J1100 and diagnosis E11.9 on one line")) == {"J1100", "E11.9"}
+    assert issue_codes(_issue("Billed 99213 twice")) == frozenset()
+
+
+def test_unrelated_issues_sharing_a_number_do_not_match():
+    gpt = [_issue("Facility fee of $250 looks high; statement mailed to Anchorage, AK 99213.", ["Facility fee"])]
+    code = CodeIssue(code="99213", issue_type="UNBUNDLING", severity="High",
+                     description="CPT code 99213 appears 2 times on this bill.", confidence=0.9)
+    matcher = IssueMatcher(gpt, [code])
+    assert not matcher.supported_by_code_issue(0)
+    assert not matcher.duplicates_gpt(0)
@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.services.ctakes_pipeline import CTakesPool  # noqa: E402
+
+
+class _FlakyPool(CTakesPool):
+    """First build blocks until released, then fails; later builds succeed."""
+
+    def __init__(self, size):
+        super().__init__(size)
+        self.building = threading.Event()
+        self.release = threading.Event()
+        self.builds = 0
+
+    def _new_pipeline(self):
+        self.builds += 1
+        if self.builds == 1:
+            self.building.set()
+            self.release.wait(5)
+            raise RuntimeError("dictionary load failed")
+        return object()
+
+
+def test_waiter_builds_after_a_failed_build():
+    pool = _FlakyPool(size=1)
+    errors, got = [], []
+
+    def first():
+        try:
+            with pool.pipeline():
+                pass
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    def second():
+        with pool.pipeline() as instance:
+            got.append(instance)
+
+    a = threading.Thread(target=first)
+    a.start()
+    assert pool.building.wait(5)
+    b = threading.Thread(target=second)
+    b.start()
+    b.join(0.2)
+    assert b.is_alive()         # pool full while A builds: B waits
+
+    pool.release.set()
+    a.join(5)
+    b.join(5)
+    assert not b.is_alive(), "waiter was never woken after the failed build"
+    assert len(errors) == 1 and len(got) == 1
+    assert pool.stats()["pipelines"] == 1 and pool.stats()["idle"] == 1
+
+
+def test_pipelines_are_reused_up_to_the_pool_size():
+    pool = _FlakyPool(size=2)
+    pool.builds = 1                 # skip the failing first build
+    with pool.pipeline() as a:
+        with pool.pipeline() as b:
+            assert a is not b
+    with pool.pipeline() as c:
+        assert c is a               # LIFO: the last one returned is reused first
+    assert pool.stats()["pipelines"] == 2
@@ -0,0 +1,66 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.services.finding_dedup import dedup_findings, tfidf_matrix  # noqa: E402
+
+
+def _finding(description, source, savings=0.0, affected=(), severity="Medium"):
+    return {
+        "description": description,
+        "validated_by": source,
+        "estimated_savings": savings,
+        "affected_items": list(affected),
+        "severity": severity,
+        "confidence": 0.8,
+    }
+
+
+DUPLICATE = "CPT code {code} appears 2 times on this bill. Unless each instance is a distinct service, this may be a duplicate charge."
+
+
+def test_same_problem_from_two_sources_merges_without_double_counting():
+    gpt = _finding(DUPLICATE.format(code="99213") + " You may be charged twice.", "GPT", 120.0, ["99213"])
+    stage2 = _finding(DUPLICATE.format(code="99213"), "PyCTAKES", 100.0, severity="High")
+    kept, merged = dedup_findings([gpt, stage2])
+    assert merged == 1 and kept == [gpt]
+    assert kept[0]["validated_by"] == "GPT, PyCTAKES"
+    assert kept[0]["severity"] == "High"
+    assert sum(k["estimated_savings"] for k in kept) == 120.0      # max, not 220
+
+
+def test_distinct_findings_on_the_same_code_stay_separate():
+    duplicate = _finding(DUPLICATE.format(code="99213"), "GPT", 120.0)
+    overcharge = _finding(
+        "CPT 99213 was billed at $400.00 for 1 unit(s). The Medicare fee schedule rate is $92.00 "
+        "per unit, so this charge is 4.3x the reference price.", "PyCTAKES", 124.0,
+    )
+    kept, merged = dedup_findings([duplicate, overcharge])
+    assert merged == 0 and len(kept) == 2
+
+
+def test_findings_about_different_codes_never_merge():
+    a = _finding(DUPLICATE.format(code="99213"), "GPT")
+    b = _finding(DUPLICATE.format(code="99214"), "PyCTAKES")
+    assert dedup_findings([a, b])[1] == 0
+
+
+def test_codeless_finding_does_not_bridge_different_codes():
+    a = _finding(DUPLICATE.format(code="99213"), "GPT")
+    bridge = _finding(DUPLICATE.format(code="this office visit"), "MedGemma")
+    c = _finding(DUPLICATE.format(code="99214"), "PyCTAKES")
+    kept, merged = dedup_findings([a, bridge, c])
+    assert merged == 1
+    assert kept == [a, c]
+
+
+def test_one_sided_codes_need_the_stricter_threshold():
+    coded = _finding("CPT code 99213 office visit may be a duplicate charge on this bill.", "GPT")
+    loose = _finding("The pharmacy charge may be a duplicate of the supply charge on this bill.", "MedGemma")
+    vectors = tfidf_matrix([coded["description"], loose["description"]])
+    similarity = float(vectors[0] @ vectors[1])
+    assert 0.35 <= similarity < 0.6
+    assert dedup_findings([coded, loose])[1] == 0
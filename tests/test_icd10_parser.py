@@ -0,0 +1,75 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.codesets.icd10 import BILLABLE, NOT_BILLABLE, ICD10Index, _parse_source, build_icd10_index  # noqa: E402
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_codes_file_descriptions_with_commas(tmp_path):
+    path = _write(tmp_path, "icd10cm_codes.txt", (
+        "A009    Cholera, unspecified\n"
+        "E119    Type 2 diabetes mellitus without complications\n"
+        "S0000XA Unspecified superficial injury of scalp, initial encounter\n"
+        "S0003XD Contusion of scalp, subsequent encounter\n"
+    ))
+    assert list(_parse_source(path)) == [("A009", 1), ("E119", 1), ("S0000XA", 1), ("S0003XD", 1)]
+
+
+def test_order_file_descriptions_with_commas(tmp_path):
+    path = _write(tmp_path, "icd10cm_order.txt", (
+        "00001 A00     0 Cholera                                                      Cholera\n"
+        "00002 A000    1 Cholera due to Vibrio cholerae 01, biovar cholerae           Cholera due to Vibrio cholerae 01, biovar cholerae\n"
+        "00004 A009    1 Cholera, unspecified                                         Cholera, unspecified\n"
+    ))
+    assert list(_parse_source(path)) == [("A00", 0), ("A000", 1), ("A009", 1)]
+
+
+def test_csv(tmp_path):
+    path = _write(tmp_path, "codes.csv", 'code,billable\nA00,0\n"A00.9",1\nE11.9,1\n')
+    assert list(_parse_source(path)) == [("A00", 0), ("A00.9", 1), ("E11.9", 1)]
+
+
+def test_index_from_codes_file(tmp_path):
+    source = _write(tmp_path, "icd10cm_codes.txt", (
+        "A009    Cholera, unspecified\n"
+        "S0000XA Unspecified superficial injury of scalp, initial encounter\n"
+    ))
+    out = str(tmp_path / "icd10cm.bin")
+    assert build_icd10_index(source, out) == 2
+    index = ICD10Index(out)
+    assert index.status("S00.00XA") == BILLABLE
+    assert index.status("A00.9") == BILLABLE
+    assert index.status("S00") == NOT_BILLABLE
+
+
+def test_seventh_character_codes_reach_the_index(tmp_path, monkeypatch):
+    import app.codesets
+    from app.services.biobert_service import BioBERTService, ExtractionResult
+    from app.services.code_validation_service import check_icd_validity
+    from app.services.rule_engine import RuleContext
+
+    source = _write(tmp_path, "icd10cm_codes.txt", (
+        "S0000XA Unspecified superficial injury of scalp, initial encounter\n"
+        "T148XXA Other injury of unspecified body region, initial encounter\n"
+    ))
+    out = str(tmp_path / "icd10cm.bin")
+    build_icd10_index(source, out)
+    index = ICD10Index(out)
+    monkeypatch.setattr(app.codesets, "get_icd10_index", lambda: index)
+
+    entities = ExtractionResult()
+    BioBERTService()._extract_codes("Dx: S00.00XA, T14.8XXA, S00.00XD", entities)
+    assert entities.icd_codes == ["S00.00XA", "S00.00XD", "T14.8XXA"]
+    ctx = RuleContext(gpt_result={}, entities=entities, result=None)
+    issues = check_icd_validity(ctx)
+    assert [(i.code, i.issue_type) for i in issues] == [("S00.00XD", "INVALID_CODE")]
+    assert "does not exist" in issues[0].description
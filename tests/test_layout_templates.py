@@ -0,0 +1,117 @@
+import os
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import app.models  # noqa: E402,F401
+from app.core.database import Base  # noqa: E402
+from app.models.layout_template import LayoutTemplate  # noqa: E402
+from app.repositories.layout_template_repository import LayoutTemplateRepository  # noqa: E402
+from app.services import layout_templates  # noqa: E402
+from app.services.layout_templates import LayoutTemplateStore  # noqa: E402
+
+_ITEMS = [
+    ("99213", "Office visit, established", "1", "$120.00", "$120.00"),
+    ("85025", "Complete blood count", "1", "$45.00", "$45.00"),
+    ("80053", "Metabolic panel", "1", "$60.00", "$60.00"),
+    ("J1100", "Dexamethasone injection", "1", "$20.00", "$20.00"),
+]
+
+
+def _right(page, y, text, right):
+    page.insert_text((right - fitz.get_text_length(text, fontsize=9), y), text, fontsize=9)
+
+
+def _statement(tmp_path, name, items):
+    doc = fitz.open()
+    page = doc.new_page()
+    for y, (code, description, qty, unit, total) in zip(
+        range(120, 400, 15), [("Code", "Description", "Qty", "Unit Price", "Charges")] + items
+    ):
+        page.insert_text((40, y), code, fontsize=9)
+        page.insert_text((130, y), description, fontsize=9)
+        page.insert_text((360, y), qty, fontsize=9)
+        _right(page, y, unit, 460)
+        _right(page, y, total, 540)
+    page.insert_text((130, 400), "Total charges", fontsize=9)
+    _right(page, 400, f"${sum(float(i[4][1:]) for i in items):.2f}", 540)
+    path = tmp_path / name
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'templates.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(layout_templates, "SessionLocal", factory)
+    return factory
+
+
+def _set_hits(factory, hits, failures=0):
+    db = factory()
+    template = db.query(LayoutTemplate).one()
+    template.hits, template.failures = hits, failures
+    db.commit()
+    db.close()
+
+
+def test_proven_template_passes_the_confidence_gate(tmp_path, session_factory):
+    store = LayoutTemplateStore()
+    learned = store.extract(_statement(tmp_path, "long.pdf", _ITEMS))
+    assert learned.layouts and learned.confidence >= 0.85
+
+    short = _statement(tmp_path, "short.pdf", _ITEMS[:2])
+    _set_hits(session_factory, 1)
+    young = store.extract(short)
+    assert young.template_hits and young.confidence < 0.85      # two rows: "few rows" penalty
+
+    _set_hits(session_factory, 5)
+    proven = store.extract(short)
+    assert proven.confidence == 0.85
+    assert "proven layout template" in proven.notes
+    db = session_factory()
+    assert db.query(LayoutTemplate).one().hits == 6
+    db.close()
+
+
+def test_proven_template_needs_the_printed_total(tmp_path, session_factory):
+    store = LayoutTemplateStore()
+    store.extract(_statement(tmp_path, "long.pdf", _ITEMS))
+    _set_hits(session_factory, 20)
+
+    path = _statement(tmp_path, "short.pdf", _ITEMS[:2])
+    doc = fitz.open(path)
+    doc[0].insert_text((130, 420), "Total charges  $999.00", fontsize=9)
+    doc.saveIncr()
+    doc.close()
+    assert store.extract(path).confidence < 0.85
+
+
+def test_concurrent_learning_leaves_caller_session_alone(tmp_path, session_factory, monkeypatch):
+    path = _statement(tmp_path, "long.pdf", _ITEMS)
+    LayoutTemplateStore().extract(path)
+
+    # Another worker stored the layout after this one looked it up
+    monkeypatch.setattr(LayoutTemplateRepository, "get_by_fingerprint", lambda self, fingerprint: None)
+    caller = session_factory()
+    pending = LayoutTemplate(fingerprint="f" * 40, header="pending", columns="{}")
+    caller.add(pending)
+
+    learned = layout_templates.template_stats()["learned"]
+    result = LayoutTemplateStore().extract(path)
+    assert result.line_items
+    assert layout_templates.template_stats()["learned"] == learned
+    assert pending in caller.new
+    caller.commit()
+    assert caller.query(LayoutTemplate).count() == 2
+    caller.close()
@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.services.biobert_service import ExtractionResult  # noqa: E402
+from app.services.code_validation_service import CodeIssue, ValidationResult  # noqa: E402
+from app.services.medgemma_payload import _ranked_codes, build_medgemma_payload  # noqa: E402
+
+
+def _pair_issue():
+    return CodeIssue(code="29880, 29870", issue_type="MISSING_MODIFIER", severity="Medium",
+                     description="NCCI edits bundle CPT 29870 into 29880.", confidence=0.88)
+
+
+def test_pair_codes_are_ranked_individually():
+    codes = _ranked_codes([], ValidationResult(issues=[_pair_issue()]))
+    assert codes == ["29880", "29870"]
+
+
+def test_pair_issue_selects_both_lines():
+    filler = "\n".join(f"Supply item {i:03d}    $12.00" for i in range(200))
+    bill_text = (
+        f"{filler}\n29880 Knee arthroscopy, meniscectomy $2,000.00\n{filler}\n"
+        f"29870 Diagnostic knee arthroscopy $600.00\n{filler}"
+    )
+    payload, stats = build_medgemma_payload(
+        {"detected_issues": []}, bill_text, ExtractionResult(), ValidationResult(issues=[_pair_issue()]),
+        excerpt_token_budget=400,
+    )
+    excerpt = json.loads(payload)["bill_text_excerpt"]
+    assert "Knee arthroscopy, meniscectomy" in excerpt
+    assert "Diagnostic knee arthroscopy" in excerpt
@@ -0,0 +1,87 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.services import ner_cache  # noqa: E402
+from app.services.biobert_service import BioBERTService, ExtractionResult, MedicalEntity  # noqa: E402
+from app.services.ner_cache import NERCache, make_key, normalize_text  # noqa: E402
+
+
+def _result(code="99213"):
+    return ExtractionResult(
+        entities=[MedicalEntity(text=code, label="CODE", start=4, end=9)],
+        cpt_codes=[code],
+    )
+
+
+def test_key_ignores_whitespace_but_not_model():
+    a = make_key("m1", normalize_text("CPT  99213\r\nOffice visit  \n\n\n\n$120.00"))
+    b = make_key("m1", normalize_text("CPT 99213\nOffice visit\n\n$120.00"))
+    assert a == b
+    assert make_key("m2", normalize_text("CPT 99213")) != make_key("m1", normalize_text("CPT 99213"))
+    assert make_key("m1", normalize_text("CPT 99214")) != make_key("m1", normalize_text("CPT 99213"))
+
+
+def test_disk_round_trip(tmp_path):
+    path = str(tmp_path / "ner.sqlite3")
+    NERCache(memory_entries=4, disk_path=path, disk_entries=10).put("k", _result())
+
+    fresh = NERCache(memory_entries=4, disk_path=path, disk_entries=10)
+    assert fresh.get("k") == _result()
+    assert fresh.get("k") == _result()
+    stats = fresh.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_ttl_expires_both_tiers(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ner_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "ner.sqlite3")
+    cache = NERCache(memory_entries=4, disk_path=path, disk_entries=10, ttl=60)
+    cache.put("k", _result())
+
+    now[0] += 30
+    assert cache.get("k") is not None
+    now[0] += 31
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+    # The disk row expired too, so a fresh process misses as well
+    assert NERCache(memory_entries=4, disk_path=path, disk_entries=10, ttl=60).get("k") is None
+
+
+def test_disk_hit_keeps_entry_age(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ner_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "ner.sqlite3")
+    NERCache(memory_entries=4, disk_path=path, disk_entries=10, ttl=60).put("k", _result())
+
+    now[0] += 50
+    cache = NERCache(memory_entries=4, disk_path=path, disk_entries=10, ttl=60)
+    assert cache.get("k") is not None       # disk hit, 50s old
+    now[0] += 20
+    assert cache.get("k") is None           # 70s old in memory too
+
+
+def test_evictions_counted_per_tier(tmp_path):
+    cache = NERCache(memory_entries=2, disk_path=str(tmp_path / "ner.sqlite3"), disk_entries=10)
+    for i in range(11):
+        cache.put(f"k{i}", _result())
+    stats = cache.stats()
+    assert stats["memory_evictions"] == 9
+    assert stats["disk_evictions"] == 2      # trimmed to 90% of the cap once over it
+    assert stats["memory_entries"] == 2
+
+
+def test_extraction_runs_on_original_text(monkeypatch):
+    monkeypatch.setattr(ner_cache, "_cache", NERCache(memory_entries=4, disk_path=None, disk_entries=0))
+    text = "Line  1:\r\n   CPT    99213   office visit"
+    result = BioBERTService().extract_entities(text)
+    entity = next(e for e in result.entities if e.text == "99213")
+    assert text[entity.start:entity.end] == "99213"
+
+    # Same statement, different spacing: served from the cache
+    BioBERTService().extract_entities("Line 1:\nCPT 99213 office visit")
+    assert ner_cache._cache.stats()["memory_hits"] == 1
@@ -0,0 +1,53 @@
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.utils.ocr import parse_tsv, preprocess_image  # noqa: E402
+
+_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def _tsv(*rows):
+    return "\n".join([_HEADER] + ["\t".join(str(v) for v in row) for row in rows]) + "\n"
+
+
+def test_parse_tsv_groups_words_into_lines():
+    result = parse_tsv(_tsv(
+        (1, 1, 0, 0, 0, 0, 0, 0, 800, 600, -1, ""),
+        (4, 1, 1, 1, 1, 0, 10, 10, 400, 20, -1, ""),
+        (5, 1, 1, 1, 1, 1, 10, 10, 40, 20, 90, "CPT"),
+        (5, 1, 1, 1, 1, 2, 60, 10, 60, 20, 80, "99213"),
+        (5, 1, 1, 1, 2, 1, 10, 40, 80, 20, 70, "$120.00"),
+        (5, 1, 1, 1, 2, 2, 100, 40, 10, 20, 95, " "),
+    ))
+    assert result.text == "CPT 99213\n$120.00"
+    assert result.words == 3
+    # Weighted by word length: (90*3 + 80*5 + 70*7) / 15
+    assert result.confidence == 77.3
+
+
+def test_parse_tsv_ignores_unknown_confidence():
+    result = parse_tsv(_tsv(
+        (5, 1, 1, 1, 1, 1, 0, 0, 10, 10, -1, "Total"),
+        (5, 1, 1, 1, 1, 2, 0, 0, 10, 10, "x", "due"),
+        (5, 1, 1, 1, 1, 3, 0, 0, 10, 10, 88, "$45"),
+    ))
+    assert result.text == "Total due $45"
+    assert result.words == 3
+    assert result.confidence == 88.0
+
+
+def test_parse_tsv_empty_output():
+    result = parse_tsv(_HEADER + "\n")
+    assert (result.text, result.words, result.confidence) == ("", 0, 0.0)
+
+
+def test_preprocess_upscales_small_photos():
+    out = preprocess_image(Image.new("RGB", (600, 400), "white"))
+    assert out.mode == "L"
+    assert out.size == (1800, 1200)
@@ -0,0 +1,78 @@
+import os
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.utils.page_triage import triage_pdf  # noqa: E402
+
+_ITEMS = [
+    "Itemized statement",
+    "03/14/2024  99213  Office visit, established patient   $120.00",
+    "03/14/2024  85025  Complete blood count                 $45.00",
+    "03/14/2024  80053  Comprehensive metabolic panel        $60.00",
+    "03/14/2024  J1100  Dexamethasone injection               $20.00",
+]
+_COUPON = [
+    "Please detach and return this portion with your payment.",
+    "Amount enclosed: ________   Make checks payable to General Hospital",
+]
+
+
+def _text_page(doc, lines):
+    page = doc.new_page()
+    for i, line in enumerate(lines):
+        page.insert_text((50, 72 + 14 * i), line, fontsize=9)
+
+
+def _scan_page(doc, rows):
+    """A page with no text layer, only dark bars like a scanned table."""
+    page = doc.new_page()
+    for i, width in enumerate(rows):
+        page.draw_rect(fitz.Rect(50, 80 + 30 * i, 50 + width, 95 + 30 * i), color=(0, 0, 0), fill=(0, 0, 0))
+
+
+def _pdf(tmp_path, build):
+    doc = fitz.open()
+    build(doc)
+    path = tmp_path / "bill.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_classifies_and_drops_pages(tmp_path):
+    def build(doc):
+        _text_page(doc, _ITEMS)                          # 0 line items
+        _text_page(doc, _COUPON)                         # 1 coupon
+        doc.new_page()                                   # 2 blank
+        _text_page(doc, _ITEMS)                          # 3 repeated copy of page 0
+        _text_page(doc, ["Total charges  $245.00", "Insurance paid  $0.00", "Patient balance due  $245.00"])
+        _scan_page(doc, [400, 250, 450, 300, 200])       # 5 scan
+        _scan_page(doc, [400, 250, 450, 300, 200])       # 6 same scan
+        _scan_page(doc, [150, 480, 120, 380, 440, 90])   # 7 different scan
+
+    triage = triage_pdf(_pdf(tmp_path, build))
+    kinds = [p.kind for p in triage.pages]
+    assert kinds == ["line_items", "boilerplate", "blank", "duplicate",
+                     "summary", "scanned", "duplicate", "scanned"]
+    assert triage.pages[3].duplicate_of == 0
+    assert triage.pages[6].duplicate_of == 5
+    assert triage.kept == [0, 4, 5, 7]
+    assert "99213" in triage.text and "detach" not in triage.text
+    assert triage.vision_pages() == [0, 5, 7, 4]
+    assert all(p.thumbnail is None for p in triage.pages)
+
+
+def test_keeps_document_when_nothing_looks_like_a_bill(tmp_path):
+    def build(doc):
+        _text_page(doc, ["Dear patient,", "Thank you for choosing General Hospital for your care."])
+        doc.new_page()
+
+    triage = triage_pdf(_pdf(tmp_path, build))
+    assert [p.kind for p in triage.pages] == ["summary", "blank"]
+    assert triage.kept == [0]
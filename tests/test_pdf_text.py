@@ -0,0 +1,52 @@
+import os
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.utils import pdf_text  # noqa: E402
+
+
+@pytest.fixture
+def statement_pdf(tmp_path):
+    path = tmp_path / "statement.pdf"
+    doc = fitz.open()
+    for text in ("CPT 99213 Office visit $120.00", "", "Total due $120.00"):
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_pymupdf_pages(statement_pdf):
+    result = pdf_text.extract_pdf_pages(statement_pdf)
+    assert result.engine == "pymupdf"
+    assert [p.page for p in result.pages] == [0, 1, 2]
+    assert "99213" in result.pages[0].text
+    assert result.pages[1].chars == 0
+
+
+def test_falls_back_to_pypdf2_when_pymupdf_fails(statement_pdf, monkeypatch):
+    def broken(path, parallel=None):
+        raise RuntimeError("cannot open")
+
+    monkeypatch.setattr(pdf_text, "extract_pages_pymupdf", broken)
+    result = pdf_text.extract_pdf_pages(statement_pdf)
+    assert result.engine == "pypdf2"
+    assert len(result.pages) == 3
+    assert "99213" in result.pages[0].text
+    assert "Total due" in result.text
+
+
+def test_falls_back_to_pypdf2_without_pymupdf(statement_pdf, monkeypatch):
+    def missing(path, parallel=None):
+        raise ImportError("No module named 'fitz'")
+
+    monkeypatch.setattr(pdf_text, "extract_pages_pymupdf", missing)
+    assert pdf_text.extract_pdf_pages(statement_pdf).engine == "pypdf2"
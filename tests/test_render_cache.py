@@ -0,0 +1,87 @@
+import os
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.utils import render_cache  # noqa: E402
+from app.utils.render_cache import RenderCache  # noqa: E402
+
+_HASH = "ab" * 32
+
+
+def _paths(cache, n):
+    return [cache.path_for(_HASH, page, 36, "png") for page in range(n)]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(tmp_path / ".renders", max_bytes=30)
+    a, b, c, d = _paths(cache, 4)
+    cache.put(a, b"a" * 10)
+    cache.put(b, b"b" * 10)
+    cache.put(c, b"c" * 10)
+    assert cache.get(a) == b"a" * 10      # a is now the most recent
+
+    cache.put(d, b"d" * 10)
+    assert not b.exists()
+    assert a.exists() and c.exists() and d.exists()
+    stats = cache.stats()
+    assert (stats["files"], stats["evictions"], stats["hits"]) == (3, 1, 1)
+
+
+def test_overwrite_counts_size_once(tmp_path):
+    cache = RenderCache(tmp_path / ".renders", max_bytes=25)
+    a, b = _paths(cache, 2)
+    cache.put(a, b"a" * 10)
+    cache.put(a, b"A" * 12)
+    cache.put(b, b"b" * 10)
+    assert cache.stats()["evictions"] == 0
+    assert a.read_bytes() == b"A" * 12
+
+
+def test_index_rebuilt_from_directory_by_mtime(tmp_path):
+    root = tmp_path / ".renders"
+    first = RenderCache(root, max_bytes=1024)
+    a, b, c = _paths(first, 3)
+    for path in (a, b, c):
+        first.put(path, bytes(10))
+    # Recency on disk: b oldest, then c, then a; temp files are not indexed
+    for age, path in ((300, b), (200, c), (100, a)):
+        os.utime(path, ns=(0, (1_000_000 - age) * 10**9))
+    (a.parent / ".render-partial").write_bytes(bytes(50))
+
+    restarted = RenderCache(root, max_bytes=25)
+    assert restarted.stats()["files"] == 3
+    restarted.put(restarted.path_for(_HASH, 9, 36, "png"), bytes(5))
+    assert not b.exists()
+    assert a.exists() and c.exists()
+
+
+@pytest.fixture
+def statement_pdf(tmp_path):
+    path = tmp_path / "statement.pdf"
+    doc = fitz.open()
+    for n in range(2):
+        doc.new_page(width=200, height=200).insert_text((20, 40), f"Page {n + 1}")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_render_pages_served_from_cache(tmp_path, statement_pdf, monkeypatch):
+    cache = RenderCache(tmp_path / ".renders", max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(render_cache, "get_render_cache", lambda: cache)
+
+    first = render_cache.render_pages(statement_pdf, [0, 1], dpi=36)
+    assert all(data.startswith(b"\x89PNG") for data in first)
+
+    def no_open(*args, **kwargs):
+        raise AssertionError("document opened on a cache hit")
+
+    monkeypatch.setattr(fitz, "open", no_open)
+    assert render_cache.render_pages(statement_pdf, [0, 1], dpi=36) == first
+    assert (cache.hits, cache.misses) == (2, 2)
@@ -0,0 +1,69 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import app.models  # noqa: E402,F401
+from app.core.database import Base  # noqa: E402
+from app.jobs import revalidation_job  # noqa: E402
+from app.models.bill import Bill, BillStatus  # noqa: E402
+from app.models.finding import Finding, FindingSeverity, FindingType  # noqa: E402
+from app.models.line_item import LineItem  # noqa: E402
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bills.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(revalidation_job, "SessionLocal", factory)
+    return factory
+
+
+def _bill(db, *codes):
+    bill = Bill(patient_id=1, file_path="k", file_name="bill.pdf", file_type="pdf", status=BillStatus.COMPLETED)
+    db.add(bill)
+    db.flush()
+    for code in codes:
+        db.add(LineItem(bill_id=bill.id, description="Office visit", code=code,
+                        quantity=1, unit_price=120.0, total_price=120.0))
+    return bill
+
+
+def _finding(db, bill, explanation, validated_by):
+    db.add(Finding(
+        bill_id=bill.id, type=FindingType.DUPLICATE_CHARGE, severity=FindingSeverity.MEDIUM,
+        confidence=0.8, estimated_savings=250.0, explanation=explanation,
+        recommended_action="Ask for a corrected bill.", validated_by=validated_by,
+    ))
+
+
+def test_counts_bills_without_line_items(session_factory):
+    db = session_factory()
+    _bill(db, "99213")
+    _bill(db)
+    db.commit()
+
+    report = revalidation_job.revalidate_completed_bills()
+    assert report.bills == 2
+    assert report.line_items == 1
+
+
+def test_deduped_counts_only_folded_candidates(session_factory):
+    db = session_factory()
+    bill = _bill(db, "99213", "99213")
+    # Two stored findings that the dedup pass merges with each other, not with any candidate
+    text = "The facility fee appears to be charged twice for the same emergency room visit"
+    _finding(db, bill, f"{text} (Affected: Facility fee)", "GPT")
+    _finding(db, bill, f"{text}. (Affected: Facility fee)", "MedGemma")
+    db.commit()
+
+    report = revalidation_job.revalidate_completed_bills()
+    assert report.inserted == 1          # the duplicate 99213 line
+    assert report.deduped == 0
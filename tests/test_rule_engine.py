@@ -0,0 +1,49 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.services.rule_engine import RuleContext, RuleSet  # noqa: E402
+
+
+def _rules():
+    rules = RuleSet("test")
+
+    @rules.item_rule("every_item")
+    def every_item(ctx, item):
+        return item.code
+
+    @rules.bill_rule("fails", where=lambda ctx: bool(ctx.codes))
+    def fails(ctx):
+        raise RuntimeError("boom")
+
+    return rules
+
+
+def _context():
+    items = [{"code": f"9921{i % 5}", "total_price": 10} for i in range(20)]
+    return RuleContext(gpt_result={"line_items": items}, entities=None, result=None)
+
+
+def test_counters_are_exact_under_concurrent_runs():
+    rules = _rules()
+    threads, runs = 8, 50
+
+    def worker():
+        for _ in range(runs):
+            rules.run(_context())
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    stats = rules.stats()
+    assert stats["every_item"]["calls"] == threads * runs * 20
+    assert stats["every_item"]["hits"] == threads * runs * 20
+    assert stats["fails"] == dict(stats["fails"], calls=threads * runs, errors=threads * runs, hits=0)
+
@@ -0,0 +1,47 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import app.codesets  # noqa: E402
+from app.services.code_validation_service import ValidationResult  # noqa: E402
+from app.services.stage3_triage import plan_stage3  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_tables(monkeypatch):
+    monkeypatch.setattr(app.codesets, "get_mue_table", lambda: None)
+    monkeypatch.setattr(app.codesets, "get_fee_schedule", lambda: None)
+
+
+def _issue(description, affected):
+    return {"description": description, "affected_items": affected, "confidence": 0.95, "estimated_savings": 40.0}
+
+
+def _plan(issue, validated):
+    return plan_stage3({"detected_issues": [issue]}, ValidationResult(validated_codes=validated))
+
+
+def test_pricing_issue_is_not_a_stage2_disagreement():
+    plan = _plan(_issue("CPT 99213 was billed at $300; the typical range is $90-$150.", ["99213"]), ["99213"])
+    assert plan.skipped == [0]
+
+
+def test_duplicate_claim_on_a_clean_validated_code_is_sent():
+    plan = _plan(_issue("CPT 99213 appears twice; this may be a duplicate charge.", ["99213"]), ["99213"])
+    assert plan.reasons == {0: ["stage2_disagrees"]}
+
+
+def test_code_stage2_did_not_validate_is_not_a_disagreement():
+    plan = _plan(_issue("HCPCS J1100 may be a duplicate charge.", ["J1100"]), ["99213"])
+    assert plan.skipped == [0]
+
+
+def test_overcharge_counts_once_the_fee_schedule_is_installed(monkeypatch):
+    monkeypatch.setattr(app.codesets, "get_fee_schedule", lambda: object())
+    plan = _plan(_issue("CPT 99213 looks overcharged at $300.", ["99213"]), ["99213"])
+    assert plan.reasons == {0: ["stage2_disagrees"]}
@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.core.config import settings  # noqa: E402
+from app.storage import cache as storage_cache  # noqa: E402
+from app.storage.cache import ReadThroughCache  # noqa: E402
+from app.storage.s3 import CACHE_DIRNAME, S3StorageAdapter  # noqa: E402
+
+
+class StubS3Client:
+    """The subset of the boto3 S3 client the adapter calls, backed by a dict."""
+
+    def __init__(self):
+        self.objects = {}
+        self.downloads = 0
+
+    def upload_file(self, filename, bucket, key):
+        self.objects[(bucket, key)] = Path(filename).read_bytes()
+
+    def download_file(self, bucket, key, filename):
+        self.downloads += 1
+        Path(filename).write_bytes(self.objects[(bucket, key)])
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+@pytest.fixture
+def s3_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", "bills")
+    monkeypatch.setattr(settings, "S3_PREFIX", "uploads/")
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "node-a"))
+    return tmp_path
+
+
+def _source(tmp_path, data=b"%PDF-1.4 bill"):
+    path = tmp_path / "incoming.pdf"
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_store_uploads_and_seeds_cache(s3_settings):
+    client = StubS3Client()
+    adapter = S3StorageAdapter(client=client)
+    assert adapter.store(_source(s3_settings), "k1.pdf", move=True) == "k1.pdf"
+    assert client.objects == {("bills", "uploads/k1.pdf"): b"%PDF-1.4 bill"}
+    assert not (s3_settings / "incoming.pdf").exists()
+
+    local = adapter.get_local_path("k1.pdf")
+    assert Path(local).read_bytes() == b"%PDF-1.4 bill"
+    assert CACHE_DIRNAME in local
+    assert client.downloads == 0
+
+
+def test_other_node_downloads_once(s3_settings, monkeypatch):
+    client = StubS3Client()
+    S3StorageAdapter(client=client).store(_source(s3_settings), "k1.pdf")
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(s3_settings / "node-b"))
+    other = S3StorageAdapter(client=client)
+    first = other.get_local_path("k1.pdf")
+    assert other.get_local_path("k1.pdf") == first
+    assert client.downloads == 1
+    assert (other.cache.hits, other.cache.misses) == (1, 1)
+
+    other.delete("k1.pdf")
+    assert not client.objects
+    assert not Path(first).exists()
+
+
+def test_keys_are_checked_and_legacy_paths_served_locally(s3_settings):
+    adapter = S3StorageAdapter(client=StubS3Client())
+    with pytest.raises(ValueError):
+        adapter.get_local_path("../etc/passwd")
+
+    legacy = Path(settings.UPLOAD_DIR) / "old-upload.pdf"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b"old")
+    assert adapter.get_local_path("old-upload.pdf") == str(legacy)
+
+
+def test_requires_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", None)
+    with pytest.raises(ValueError):
+        S3StorageAdapter(client=StubS3Client())
+
+
+def test_concurrent_misses_share_one_download(tmp_path):
+    cache = ReadThroughCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    started = threading.Event()
+    fetches = []
+
+    def fetch(tmp):
+        fetches.append(tmp)
+        started.set()
+        time.sleep(0.05)
+        Path(tmp).write_bytes(b"data")
+
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(cache.get("k.pdf", fetch))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(fetches) == 1
+    assert len(set(paths)) == 1
+    assert (cache.hits, cache.misses) == (7, 1)
+    assert cache._key_locks == {}
+
+
+def test_failed_fetch_leaves_nothing_behind(tmp_path):
+    cache = ReadThroughCache(tmp_path / "cache", max_bytes=1024 * 1024)
+
+    def broken(tmp):
+        Path(tmp).write_bytes(b"partial")
+        raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        cache.get("k.pdf", broken)
+    assert [p for p in (tmp_path / "cache").rglob("*") if p.is_file()] == []
+    assert cache._key_locks == {}
+    assert Path(cache.get("k.pdf", lambda tmp: Path(tmp).write_bytes(b"ok"))).read_bytes() == b"ok"
+
+
+def test_key_locks_do_not_accumulate(tmp_path):
+    cache = ReadThroughCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    for n in range(50):
+        cache.get(f"k{n}.pdf", lambda tmp: Path(tmp).write_bytes(b"x"))
+    assert cache._key_locks == {}
+
+
+def test_evicts_least_recently_used_but_not_recent_files(tmp_path, monkeypatch):
+    cache = ReadThroughCache(tmp_path / "cache", max_bytes=25)
+    a = cache.get("a.pdf", lambda tmp: Path(tmp).write_bytes(bytes(10)))
+    b = cache.get("b.pdf", lambda tmp: Path(tmp).write_bytes(bytes(10)))
+    cache.get("c.pdf", lambda tmp: Path(tmp).write_bytes(bytes(10)))
+    assert cache.stats()["evictions"] == 0            # all used within _MIN_AGE_S
+
+    old = time.time() - 2 * storage_cache._MIN_AGE_S
+    for path in (a, b):
+        os.utime(path, (old, old))
+    cache.get("d.pdf", lambda tmp: Path(tmp).write_bytes(bytes(10)))
+    assert not Path(a).exists() and not Path(b).exists()
+    assert cache.stats()["files"] == 2
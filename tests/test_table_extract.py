@@ -0,0 +1,61 @@
+import os
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.services.rule_engine import ParsedItem  # noqa: E402
+from app.utils.table_extract import extract_line_items, format_table  # noqa: E402
+
+
+def _row(page, y, code, description, qty, unit, total):
+    page.insert_text((40, y), code, fontsize=9)
+    page.insert_text((130, y), description, fontsize=9)
+    page.insert_text((360, y), qty, fontsize=9)
+    for text, right in ((unit, 460), (total, 540)):
+        page.insert_text((right - fitz.get_text_length(text, fontsize=9), y), text, fontsize=9)
+
+
+@pytest.fixture
+def statement_pdf(tmp_path):
+    doc = fitz.open()
+    page = doc.new_page()
+    _row(page, 100, "Code", "Description", "Qty", "Unit Price", "Charges")
+    _row(page, 120, "99213-25", "Office visit, established", "1", "$120.00", "$120.00")
+    _row(page, 135, "97110", "Therapeutic exercise", "2", "$45.00", "$90.00")
+    _row(page, 150, "97530 -59", "Therapeutic activities", "1", "$95.00", "$95.00")
+    _row(page, 165, "J1100-JW-XU", "Dexamethasone injection", "1", "$20.00", "$20.00")
+    page.insert_text((130, 190), "Total charges", fontsize=9)
+    page.insert_text((540 - fitz.get_text_length("$325.00", fontsize=9), 190), "$325.00", fontsize=9)
+    path = tmp_path / "statement.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_modifiers_kept_on_items(statement_pdf):
+    result = extract_line_items(statement_pdf)
+    items = [(i["code"], i["modifier"], i["description"]) for i in result.line_items]
+    assert items == [
+        ("99213", "25", "Office visit, established"),
+        ("97110", "", "Therapeutic exercise"),
+        ("97530", "59", "Therapeutic activities"),
+        ("J1100", "JW-XU", "Dexamethasone injection"),
+    ]
+    assert "items add up to printed total" in result.notes
+
+    # The rules see them as modifiers of the base code
+    assert ParsedItem.parse(0, result.line_items[2]).modifiers == {"59"}
+    assert ParsedItem.parse(0, result.line_items[3]).modifiers == {"JW", "XU"}
+
+
+def test_format_table_shows_modifiers(statement_pdf):
+    table = format_table(extract_line_items(statement_pdf).line_items)
+    assert "| 99213-25 | Office visit, established | 1 | 120.00 | 120.00" in table
+    assert "| 97110 | Therapeutic exercise | 2 | 45.00 | 90.00" in table
+    assert "| 97530-59 |" in table
+    assert "| J1100-JW-XU |" in table